@@ -0,0 +1,161 @@
+import pandas as pd
+
+# Suppliers selling non school-specific uniforms, the baseline of the price comparison
+GENERIC_SUPPLIERS = ["asda"]
+
+# Schools are keyed on their URN, or on their store page for the suppliers that don't show URNs
+SCHOOL_KEY = "COALESCE(urn, store_page)"
+
+
+def create_aggregates(connection):
+    """
+    Creates the aggregate tables and the comparison view, returns whether they were new
+    (and so have to be filled for every school).
+
+    Args:
+    - connection: Connection to the store's database.
+    """
+    exists = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'school_prices'"
+    ).fetchone()
+
+    # Stores created when the aggregates were keyed on URNs only are rebuilt
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(school_prices)")}
+    if exists is not None and "school" not in columns:
+        connection.execute("DROP VIEW IF EXISTS price_comparison")
+        connection.execute("DROP TABLE school_prices")
+        exists = None
+
+    connection.execute(f"CREATE INDEX IF NOT EXISTS items_school ON items ({SCHOOL_KEY})")
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS school_prices (
+            school TEXT NOT NULL,
+            category TEXT NOT NULL,
+            supplier TEXT NOT NULL,
+            items INTEGER NOT NULL,
+            min_price REAL,
+            median_price REAL,
+            max_price REAL,
+            PRIMARY KEY (school, category, supplier)
+        )
+    """)
+    connection.execute("CREATE INDEX IF NOT EXISTS school_prices_category ON school_prices (category, supplier)")
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS generic_prices (
+            category TEXT PRIMARY KEY,
+            items INTEGER NOT NULL,
+            min_price REAL,
+            median_price REAL,
+            max_price REAL
+        )
+    """)
+    # The delta is computed when queried, so a new generic crawl doesn't touch the schools
+    connection.execute("""
+        CREATE VIEW IF NOT EXISTS price_comparison AS
+        SELECT
+            s.school, s.category, s.supplier, s.items, s.min_price, s.median_price, s.max_price,
+            g.median_price AS generic_median_price,
+            s.median_price - g.median_price AS delta,
+            s.median_price / g.median_price AS ratio
+        FROM school_prices s
+        LEFT JOIN generic_prices g ON g.category = s.category
+    """)
+
+    return exists is None
+
+
+def _summarise(prices, keys):
+    grouped = prices.groupby(keys)["price"]
+    return pd.DataFrame({
+        "items": grouped.size(),
+        "min_price": grouped.min(),
+        "median_price": grouped.median(),
+        "max_price": grouped.max(),
+    }).reset_index()
+
+
+def affected_schools(connection, supplier):
+    """
+    Returns the keys (see `SCHOOL_KEY`) of the schools a supplier currently has rows for.
+
+    Args:
+    - connection: Connection to the store's database.
+    - supplier: The supplier.
+    """
+    rows = connection.execute(
+        f"SELECT DISTINCT {SCHOOL_KEY} FROM items WHERE supplier = ? AND {SCHOOL_KEY} IS NOT NULL", (supplier,)
+    )
+    return {school for school, in rows}
+
+
+def refresh_schools(connection, schools):
+    """
+    Recomputes the aggregates of the given schools only, from their rows of every supplier.
+
+    Args:
+    - connection: Connection to the store's database.
+    - schools: The keys of the schools to recompute, see `SCHOOL_KEY`.
+    """
+    connection.execute("DROP TABLE IF EXISTS temp.refreshed")
+    connection.execute("CREATE TEMP TABLE refreshed (school TEXT PRIMARY KEY)")
+    connection.executemany("INSERT OR IGNORE INTO refreshed VALUES (?)", [(school,) for school in schools])
+
+    connection.execute("DELETE FROM school_prices WHERE school IN (SELECT school FROM refreshed)")
+
+    prices = pd.read_sql_query(
+        f"""
+        SELECT {SCHOOL_KEY} AS school, category, supplier, price FROM items
+        WHERE {SCHOOL_KEY} IN (SELECT school FROM refreshed) AND price IS NOT NULL
+        """,
+        connection,
+    )
+    if prices.empty:
+        return 0
+
+    rows = _summarise(prices, ["school", "category", "supplier"])
+    connection.executemany(
+        "INSERT INTO school_prices VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows.itertuples(index=False, name=None),
+    )
+    return len(rows)
+
+
+def refresh_all_schools(connection):
+    """
+    Recomputes the aggregates of every school.
+
+    Args:
+    - connection: Connection to the store's database.
+    """
+    schools = [
+        school for school, in connection.execute(f"SELECT DISTINCT {SCHOOL_KEY} FROM items WHERE {SCHOOL_KEY} IS NOT NULL")
+    ]
+    return refresh_schools(connection, schools)
+
+
+def refresh_generic(connection):
+    """
+    Recomputes the prices of the generic suppliers per category.
+
+    Args:
+    - connection: Connection to the store's database.
+    """
+    connection.execute("DELETE FROM generic_prices")
+
+    prices = pd.read_sql_query(
+        f"""
+        SELECT category, price FROM items
+        WHERE supplier IN ({', '.join('?' * len(GENERIC_SUPPLIERS))}) AND price IS NOT NULL
+        """,
+        connection,
+        params=GENERIC_SUPPLIERS,
+    )
+    if prices.empty:
+        return 0
+
+    rows = _summarise(prices, ["category"])
+    connection.executemany(
+        "INSERT INTO generic_prices VALUES (?, ?, ?, ?, ?)",
+        rows.itertuples(index=False, name=None),
+    )
+    return len(rows)
@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRAPER_FILE = os.path.join(PACKAGE_DIR, "scraper.py")
+COMMANDS_FILE = os.path.abspath(__file__)
+
+# Methods of `ManagedDriver` that aren't browser commands
+NOT_COMMANDS = {"recycle_if_needed", "record_navigation", "restart", "is_alive", "rss_mb", "save_cookies"}
+
+# Driver attributes holding objects whose methods are commands, e.g. `driver.switch_to.window(...)`
+NAMESPACES = {"switch_to"}
+
+
+def is_element(value):
+    """
+    Returns whether a value is a WebElement (or a fake or wrapped one).
+    """
+    return hasattr(value, "find_element") and hasattr(value, "get_attribute")
+
+
+def call_stack():
+    """
+    Returns the frames of the package that led to a command, outermost first, and the
+    scraper method and line that issued it, `(None, None)` if no scraper code did.
+    """
+    frames = []
+    caller = (None, None)
+
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PACKAGE_DIR) and filename != COMMANDS_FILE:
+            frames.append(f"{frame.f_code.co_name}:{frame.f_lineno}")
+            if caller[0] is None and filename == SCRAPER_FILE:
+                caller = (frame.f_code.co_name, frame.f_lineno)
+        frame = frame.f_back
+
+    return ";".join(reversed(frames)), caller
+
+
+def unwrap(value):
+    """
+    Returns the wrapped object of a `CommandProxy` (or of a list of them), e.g. to pass
+    an element to `execute_script`.
+    """
+    if isinstance(value, CommandProxy):
+        return value._target
+    if isinstance(value, list):
+        return [unwrap(item) for item in value]
+    return value
+
+
+class CommandProxy:
+    """
+    Wraps a driver, an element or a namespace such as `switch_to`, and reports every
+    command made through it, and through the elements it returned, to an observer.
+
+    Method calls and attribute reads (e.g. `element.text` or `driver.title`) are commands.
+    Plain attributes of wrapper objects (e.g. `ManagedDriver.max_pages`) and their
+    methods that aren't commands pass through.
+
+    The observer is called once per command as `observe(command, args, started, latency,
+    result, error, stack, caller)`: element commands are prefixed with "element.", the
+    result is the unwrapped one, error is the exception raised (then re-raised) or None,
+    and stack and caller are given by `call_stack`.
+    """
+
+    def __init__(self, target, observe, prefix=""):
+        self._target = target
+        self._observe = observe
+        self._prefix = prefix
+
+    def _wrap(self, value):
+        if is_element(value) and not isinstance(value, CommandProxy):
+            return CommandProxy(value, self._observe, "element.")
+        if isinstance(value, list) and value and is_element(value[0]):
+            return [self._wrap(item) for item in value]
+        return value
+
+    def _report(self, name, args, started, result=None, error=None):
+        latency = time.perf_counter() - started
+        stack, caller = call_stack()
+        self._observe(self._prefix + name, args, started, latency, result, error, stack, caller)
+        return self._wrap(result)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name in NOT_COMMANDS or name in getattr(self._target, "__dict__", {}):
+            return getattr(self._target, name)
+        if name in NAMESPACES:
+            return CommandProxy(getattr(self._target, name), self._observe, f"{name}.")
+
+        started = time.perf_counter()
+        try:
+            value = getattr(self._target, name)
+        except Exception as e:
+            self._report(name, (), started, error=e)
+            raise
+
+        if not callable(value):
+            return self._report(name, (), started, value)
+
+        def command(*args, **kwargs):
+            args = [unwrap(arg) for arg in args]
+            started = time.perf_counter()
+            try:
+                result = value(*args, **kwargs)
+            except Exception as e:
+                # Failed lookups cost a round trip as well
+                self._report(name, args, started, error=e)
+                raise
+            return self._report(name, args, started, result)
+
+        return command
+
+    def __eq__(self, other):
+        return self._target == unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
@@ -0,0 +1,109 @@
+import geopandas as gpd
+import pandas as pd
+
+# Coordinates of the schools register (Get Information About Schools) are British National Grid
+BRITISH_NATIONAL_GRID = "EPSG:27700"
+
+
+class CoverageIndex:
+    """
+    Spatial index of the schools register against region boundaries, for supplier
+    coverage analyses.
+
+    Every school of the register is assigned to its region once, with a single spatial
+    join over the STRtree of the boundaries. Coverage queries are then plain joins on
+    the URN, fast enough to re-run interactively for any set of scraped schools.
+
+    Attributes:
+    - schools: GeoDataFrame of the register's schools (points), with their region.
+    - boundaries: GeoDataFrame of the region boundaries (polygons).
+    - region_column: The column of `boundaries` naming the regions.
+    """
+
+    def __init__(self, schools, boundaries, region_column):
+        boundaries = boundaries[[region_column, "geometry"]].to_crs(schools.crs)
+
+        joined = gpd.sjoin(schools, boundaries, how="left", predicate="within")
+        # Schools on a shared border fall in both regions, keep one
+        joined = joined[~joined.index.duplicated(keep="first")]
+
+        self.schools = joined.drop(columns="index_right")
+        self.boundaries = boundaries
+        self.region_column = region_column
+
+    @classmethod
+    def from_files(cls, register_path, boundaries_path, region_column, urn_column="URN",
+                   x_column="Easting", y_column="Northing", crs=BRITISH_NATIONAL_GRID):
+        """
+        Builds the index from a schools register CSV and a boundaries file (any format
+        geopandas reads, e.g. GeoPackage, shapefile or GeoJSON).
+
+        Args:
+        - register_path: Path of the schools register CSV.
+        - boundaries_path: Path of the boundaries file.
+        - region_column: The column of the boundaries naming the regions.
+        - urn_column: The column of the register holding the URN.
+        - x_column: The column of the register holding the x coordinate.
+        - y_column: The column of the register holding the y coordinate.
+        - crs: The coordinate reference system of the register's coordinates.
+        """
+        register = pd.read_csv(register_path, encoding_errors="replace", low_memory=False)
+        register = register.dropna(subset=[x_column, y_column]).rename(columns={urn_column: "urn"})
+        register["urn"] = register["urn"].astype(str)
+
+        schools = gpd.GeoDataFrame(
+            register,
+            geometry=gpd.points_from_xy(register[x_column], register[y_column]),
+            crs=crs,
+        )
+
+        return cls(schools, gpd.read_file(boundaries_path), region_column)
+
+    def _matched(self, scraped):
+        scraped = scraped.dropna(subset=["urn"])[["urn", "supplier"]].drop_duplicates()
+        scraped = scraped.assign(urn=scraped["urn"].astype(str).str.replace(r"\.0$", "", regex=True))
+
+        return scraped.merge(self.schools[["urn", self.region_column]], on="urn", how="inner")
+
+    def coverage(self, scraped):
+        """
+        Returns the number of schools covered by each supplier in every region, with the
+        number of schools, of covered schools and of suppliers of each region.
+
+        Args:
+        - scraped: DataFrame of the scraped schools with `supplier` and `urn` columns.
+        """
+        matched = self._matched(scraped)
+        region = self.region_column
+
+        per_supplier = matched.pivot_table(index=region, columns="supplier", values="urn", aggfunc="count", fill_value=0)
+
+        summary = pd.DataFrame({
+            "schools": self.schools.groupby(region).size(),
+            "covered_schools": matched.groupby(region)["urn"].nunique(),
+            "suppliers": matched.groupby(region)["supplier"].nunique(),
+        })
+        summary = summary.join(per_supplier).fillna(0)
+        summary["coverage"] = summary["covered_schools"] / summary["schools"]
+
+        return summary.sort_values("coverage")
+
+    def uncovered(self, scraped):
+        """
+        Returns the schools of the register that no supplier was matched to.
+
+        Args:
+        - scraped: DataFrame of the scraped schools with `supplier` and `urn` columns.
+        """
+        covered = set(self._matched(scraped)["urn"])
+        return self.schools[~self.schools["urn"].isin(covered)]
+
+    def schools_within(self, geometry):
+        """
+        Returns the schools of the register inside a geometry (e.g. a catchment drawn on
+        a map), using the STRtree of the school points.
+
+        Args:
+        - geometry: A shapely geometry in the register's coordinate reference system.
+        """
+        return self.schools.iloc[self.schools.sindex.query(geometry, predicate="contains")]
@@ -0,0 +1,411 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+from .ids import assign_ids
+from .interning import write_variants
+from .records import DEPTHS, RECORD_TYPES
+from .results import ScrapeResult
+from .validation import Validator
+
+NEXT_DEPTH = {"schools": "products", "products": "variants"}
+
+# The columns identifying a row of every depth, and the order it is exported in
+EXPORT_KEYS = {
+    "schools": ["schoolsupplier_id"],
+    "products": ["id", "schoolsupplier_id"],
+    "variants": ["product_id", "id"],
+}
+
+# The depth, key column and referencing column of the parent of a row
+PARENT_KEYS = {
+    "products": ("schools", "schoolsupplier_id", "schoolsupplier_id"),
+    "variants": ("products", "id", "product_id"),
+}
+
+
+class JobQueue:
+    """
+    Shared queue of crawl jobs with leases and heartbeats, backed by a SQLite database.
+
+    A job scrapes one unit of work of a supplier and is stored as JSON:
+    - depth "schools": the school list of the supplier (no payload).
+    - depth "products": the products of one school (the school as payload).
+    - depth "variants": the variants of one product (the product as payload).
+
+    A leased job belongs to its worker until the lease expires, workers keep it alive with
+    `heartbeat`. Jobs whose worker died are handed out again once their lease expires.
+    Completing a job stores its rows in the `results` table and queues the jobs of the
+    next depth in the same transaction.
+
+    Attributes:
+    - path: Path of the SQLite database, on storage that every worker can reach.
+    - lease_seconds: How long a job stays leased without a heartbeat.
+    - max_attempts: How many times a job is tried before it is marked as failed.
+    """
+
+    def __init__(self, path, lease_seconds=300, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+        with self._transaction() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    supplier TEXT NOT NULL,
+                    depth TEXT NOT NULL,
+                    target_depth TEXT NOT NULL,
+                    payload TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires)")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id INTEGER NOT NULL,
+                    supplier TEXT NOT NULL,
+                    depth TEXT NOT NULL,
+                    row TEXT
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS results_supplier ON results (supplier, depth)")
+            # The products whose variants were already queued, a product can be sold to several schools
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS queued_products (
+                    supplier TEXT NOT NULL,
+                    product_id INTEGER NOT NULL,
+                    PRIMARY KEY (supplier, product_id)
+                )
+            """)
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads, the heartbeat runs in its own
+        if getattr(self._local, "connection", None) is None:
+            self._local.connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        return self._local.connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def put(self, supplier, depth="schools", payload=None, target_depth="variants"):
+        """
+        Queues a job, returns its id.
+
+        Args:
+        - supplier: The supplier to scrape data from.
+        - depth: The depth of the job, "schools", "products" or "variants".
+        - payload: The school (products job) or the product (variants job) to scrape.
+        - target_depth: The deepest depth the jobs created from this one go to.
+        """
+        if depth not in DEPTHS or target_depth not in DEPTHS:
+            raise ValueError("Invalid depth.")
+
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "INSERT INTO jobs (supplier, depth, target_depth, payload) VALUES (?, ?, ?, ?)",
+                (supplier, depth, target_depth, json.dumps(payload)),
+            )
+            return cursor.lastrowid
+
+    def lease(self, worker):
+        """
+        Leases the oldest pending job (or one whose lease expired), returns None if there
+        is no job to run.
+
+        Args:
+        - worker: The id of the worker leasing the job.
+        """
+        now = time.time()
+
+        with self._transaction() as connection:
+            while True:
+                row = connection.execute(
+                    """
+                    SELECT id, supplier, depth, target_depth, payload, attempts FROM jobs
+                    WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                    ORDER BY id LIMIT 1
+                    """,
+                    (now,),
+                ).fetchone()
+
+                if row is None:
+                    return None
+
+                job_id, supplier, depth, target_depth, payload, attempts = row
+
+                if attempts < self.max_attempts:
+                    break
+
+                # The job kept losing its worker, give up on it
+                connection.execute(
+                    "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'Lease expired') WHERE id = ?",
+                    (job_id,),
+                )
+
+            connection.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, now + self.lease_seconds, job_id),
+            )
+
+        return {
+            "id": job_id,
+            "supplier": supplier,
+            "depth": depth,
+            "target_depth": target_depth,
+            "payload": json.loads(payload),
+        }
+
+    def heartbeat(self, job, worker):
+        """
+        Extends the lease of a job, returns False if the worker lost the lease.
+
+        Args:
+        - job: The leased job.
+        - worker: The id of the worker holding the lease.
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, job["id"], worker),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job, worker, rows, follow=True):
+        """
+        Stores the rows scraped by a job and queues the jobs of the next depth.
+
+        Rows carry their stable ids (see `scrapplier.ids`), so the rows of every worker
+        merge without collisions. The variants of a product are only queued once, however
+        many schools it is sold to. Returns False (and stores nothing) if the worker lost
+        the lease in the meantime.
+
+        Args:
+        - job: The leased job.
+        - worker: The id of the worker holding the lease.
+        - rows: The schools, products or variants scraped by the job.
+        - follow: Whether to queue jobs of the next depth, False when the supplier isn't
+          scraped any deeper.
+        """
+        depth = job["depth"]
+        next_depth = NEXT_DEPTH.get(depth) if follow else None
+        if next_depth is not None and DEPTHS.index(next_depth) > DEPTHS.index(job["target_depth"]):
+            next_depth = None
+
+        with self._transaction() as connection:
+            owner = connection.execute(
+                "SELECT worker FROM jobs WHERE id = ? AND status = 'leased'", (job["id"],)
+            ).fetchone()
+            if owner is None or owner[0] != worker:
+                return False
+
+            for row in rows:
+                connection.execute(
+                    "INSERT INTO results (job_id, supplier, depth, row) VALUES (?, ?, ?, ?)",
+                    (job["id"], job["supplier"], depth, json.dumps(row)),
+                )
+
+                if next_depth == "variants" and not connection.execute(
+                    "INSERT OR IGNORE INTO queued_products VALUES (?, ?)", (job["supplier"], row["id"])
+                ).rowcount:
+                    continue
+
+                if next_depth is not None:
+                    connection.execute(
+                        "INSERT INTO jobs (supplier, depth, target_depth, payload) VALUES (?, ?, ?, ?)",
+                        (job["supplier"], next_depth, job["target_depth"], json.dumps(row)),
+                    )
+
+            connection.execute("UPDATE jobs SET status = 'done', error = NULL WHERE id = ?", (job["id"],))
+
+        return True
+
+    def fail(self, job, worker, error):
+        """
+        Releases a job that raised, it is retried until it reaches `max_attempts`.
+
+        Args:
+        - job: The leased job.
+        - worker: The id of the worker holding the lease.
+        - error: The error raised by the job.
+        """
+        with self._transaction() as connection:
+            connection.execute(
+                """
+                UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    worker = NULL, lease_expires = NULL, error = ?
+                WHERE id = ? AND worker = ?
+                """,
+                (self.max_attempts, str(error), job["id"], worker),
+            )
+
+    def counts(self):
+        """
+        Returns the number of jobs per status.
+        """
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def export(self, supplier, output_dir=".", validate=True):
+        """
+        Writes the results of a supplier to `<supplier>_<depth>.csv` files and returns
+        them as a `ScrapeResult`. Rows scraped more than once (e.g. by a job that was
+        retried) are kept once, the latest wins.
+
+        Args:
+        - supplier: The supplier to export.
+        - output_dir: The directory to write the files to, None to only return the rows.
+        - validate: Whether to quarantine the invalid rows, see `Validator`.
+        """
+        validator = Validator(supplier, output_dir) if validate else None
+        frames = {}
+
+        for depth in DEPTHS:
+            rows = self._connection().execute(
+                "SELECT row FROM results WHERE supplier = ? AND depth = ? AND row IS NOT NULL ORDER BY id",
+                (supplier, depth),
+            ).fetchall()
+
+            if rows:
+                frame = pd.DataFrame([json.loads(row) for row, in rows], columns=RECORD_TYPES[depth].__slots__)
+
+                # Jobs finish in any order, the flat file builder expects sorted ids
+                keys = EXPORT_KEYS[depth]
+                frame = frame.drop_duplicates(keys, keep="last").sort_values(keys)
+
+                if validator is not None:
+                    # The children of quarantined rows would be orphans
+                    parent = PARENT_KEYS.get(depth)
+                    if parent is not None and parent[0] in frames:
+                        parent_depth, parent_key, key = parent
+                        frame = frame[frame[key].isin(frames[parent_depth][parent_key])]
+                    frame = validator.check(frame, depth)
+                frames[depth] = frame
+
+                if output_dir is None:
+                    continue
+                if depth == "variants":
+                    write_variants(frame, supplier, output_dir)
+                else:
+                    frame.to_csv(os.path.join(output_dir, f"{supplier}_{depth}.csv"), index=False)
+
+        if validator is not None:
+            validator.write_stats()
+
+        return ScrapeResult(
+            supplier,
+            list(frames)[-1] if frames else None,
+            frames,
+            quality=validator.summary() if validator is not None else None,
+            quarantine=validator.quarantine() if validator is not None else None,
+            output_dir=output_dir,
+        )
+
+
+class Worker:
+    """
+    Pulls jobs from a `JobQueue` and runs them with a `Scraper`. Any number of workers,
+    on any number of machines, can share the same queue.
+
+    Attributes:
+    - queue: The shared `JobQueue`.
+    - scraper: The `Scraper` whose browser runs the jobs.
+    - worker_id: Unique id of the worker, defaults to the hostname and a random suffix.
+    - poll_seconds: How long to wait before polling again when other workers are busy.
+    """
+
+    def __init__(self, queue, scraper, worker_id=None, poll_seconds=5):
+        self.queue = queue
+        self.scraper = scraper
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.poll_seconds = poll_seconds
+        self._ready = set()
+
+    def _keep_alive(self, job, stop):
+        while not stop.wait(self.queue.lease_seconds / 3):
+            if not self.queue.heartbeat(job, self.worker_id):
+                return
+
+    def run_job(self, job):
+        """
+        Runs one job and stores its results.
+
+        Args:
+        - job: The leased job.
+        """
+        driver = self.scraper.driver
+        supplier = job["supplier"]
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_alive, args=(job, stop), daemon=True)
+        heartbeat.start()
+
+        try:
+            # Logins and cookie banners only have to be handled once per browser
+            if supplier not in self._ready:
+                self.scraper._setup(driver, supplier)
+                self._ready.add(supplier)
+
+            stage = self.scraper._stage(supplier, job["depth"])
+            if job["depth"] == "schools":
+                records = assign_ids(supplier, stage(driver))
+            else:
+                # The payload is the school (products job) or the product (variants job)
+                parent_depth = DEPTHS[DEPTHS.index(job["depth"]) - 1]
+                parent = RECORD_TYPES[parent_depth](**job["payload"])
+                records = assign_ids(supplier, stage(driver, parent), parent)
+
+            rows = [record.to_dict() for record in records]
+        except Exception as e:
+            self.queue.fail(job, self.worker_id, e)
+            print(f"Job {job['id']} ({supplier} {job['depth']}) failed: {e}")
+            return False
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        next_depth = NEXT_DEPTH.get(job["depth"])
+        follow = next_depth is not None and self.scraper._stage(supplier, next_depth) is not None
+
+        return self.queue.complete(job, self.worker_id, rows, follow=follow)
+
+    def run(self, stop_when_empty=True):
+        """
+        Runs jobs until the queue is drained.
+
+        Args:
+        - stop_when_empty: Whether to return once no job is pending or leased, otherwise
+          keep polling for new jobs forever.
+        """
+        while True:
+            job = self.queue.lease(self.worker_id)
+
+            if job is None:
+                counts = self.queue.counts()
+                if stop_when_empty and not counts.get("pending") and not counts.get("leased"):
+                    return
+                time.sleep(self.poll_seconds)
+                continue
+
+            self.run_job(job)
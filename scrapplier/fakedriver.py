@@ -0,0 +1,627 @@
+import hashlib
+import itertools
+import json
+import os
+import re
+from functools import lru_cache
+from urllib.parse import urldefrag, urljoin
+from xml.sax.saxutils import escape
+
+from cssselect import HTMLTranslator, SelectorError
+from lxml import etree, html
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    JavascriptException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.common.timeouts import Timeouts
+
+from .tabs import LOADED_SCRIPT, NAVIGATE_SCRIPT
+from .variants import ENUMERATE_SCRIPT
+
+FIXTURES_FILE = "fixtures.json"
+
+EMPTY_PAGE = "<html><head><title>404 Not Found</title></head><body></body></html>"
+
+# Elements never rendered, and elements whose text starts on a new line
+INVISIBLE_TAGS = {"head", "script", "style", "template", "noscript", "title", "meta", "link"}
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset", "figcaption", "figure",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "option",
+    "p", "pre", "section", "table", "tr", "ul",
+}
+WHITESPACE = re.compile(r"\s+")
+HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.IGNORECASE)
+
+# Attributes read as properties by Selenium: URLs are resolved, booleans are "true" or None
+URL_ATTRIBUTES = {"href", "src", "action"}
+BOOLEAN_ATTRIBUTES = {"checked", "selected", "disabled", "multiple", "hidden", "readonly", "required"}
+
+# Keys such as Keys.END are characters of the Unicode private use area
+SPECIAL_KEYS = re.compile("[\ue000-\uf8ff]")
+SCROLL_KEYS = {Keys.PAGE_DOWN, Keys.END, Keys.ARROW_DOWN}
+
+TRANSLATOR = HTMLTranslator()
+
+
+@lru_cache(maxsize=4096)
+def _compile(by, value):
+    try:
+        if by == By.XPATH:
+            expression = value
+        elif by == By.CSS_SELECTOR:
+            expression = TRANSLATOR.css_to_xpath(value, prefix="descendant::")
+        elif by == By.ID:
+            expression = f"descendant::*[@id={TRANSLATOR.xpath_literal(value)}]"
+        elif by == By.NAME:
+            expression = f"descendant::*[@name={TRANSLATOR.xpath_literal(value)}]"
+        elif by == By.TAG_NAME:
+            expression = TRANSLATOR.css_to_xpath(value, prefix="descendant::")
+        elif by == By.CLASS_NAME:
+            expression = TRANSLATOR.css_to_xpath(f".{value}", prefix="descendant::")
+        elif by in (By.LINK_TEXT, By.PARTIAL_LINK_TEXT):
+            expression = "descendant::a"
+        else:
+            raise InvalidSelectorException(f"Unsupported locator strategy: {by}")
+        return etree.XPath(expression)
+    except (SelectorError, etree.XPathSyntaxError) as e:
+        raise InvalidSelectorException(f"Invalid selector {value!r}: {e}")
+
+
+def _hidden(element):
+    if not isinstance(element.tag, str):
+        return True
+    if element.tag in INVISIBLE_TAGS or element.get("hidden") is not None:
+        return True
+    if element.tag == "input" and (element.get("type") or "").lower() == "hidden":
+        return True
+    return bool(HIDDEN_STYLE.search(element.get("style") or ""))
+
+
+def _displayed(element):
+    return not any(_hidden(node) for node in itertools.chain([element], element.iterancestors()))
+
+
+def _text(element):
+    """
+    Returns the rendered text of an element, as Selenium's `text`: hidden elements are
+    left out, block elements start on a new line and spaces are collapsed.
+    """
+    parts = []
+
+    def walk(node):
+        if _hidden(node):
+            return
+        block = node.tag in BLOCK_TAGS
+        if block:
+            parts.append("\n")
+        if node.tag == "br":
+            parts.append("\n")
+        # Line breaks of the source are spaces, only blocks and <br> break lines
+        if node.text:
+            parts.append(WHITESPACE.sub(" ", node.text))
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(WHITESPACE.sub(" ", child.tail))
+        if block:
+            parts.append("\n")
+
+    walk(element)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _find(driver, context, by, value):
+    results = [node for node in _compile(by, value)(context) if isinstance(node, etree._Element) and isinstance(node.tag, str)]
+
+    if by == By.LINK_TEXT:
+        results = [node for node in results if _text(node) == value]
+    elif by == By.PARTIAL_LINK_TEXT:
+        results = [node for node in results if value in _text(node)]
+
+    return [FakeElement(driver, node) for node in results]
+
+
+class FakeElement:
+    """
+    An element of a page loaded by `FakeDriver`, with the part of Selenium's WebElement
+    used by the scraper. When the page is replaced by a saved state, the element is the
+    one at the same place in the new page, or stale if there is none.
+
+    Attributes:
+    - element: The lxml element.
+    """
+
+    def __init__(self, driver, element):
+        self._driver = driver
+        self._document = driver._window.document
+        self.element = element
+
+    def __eq__(self, other):
+        return isinstance(other, FakeElement) and other.element is self.element
+
+    def __hash__(self):
+        return hash(self.element)
+
+    def __repr__(self):
+        return f"FakeElement(<{self.element.tag}>)"
+
+    def _check(self):
+        document = self._driver._window.document
+        if document is not self._document:
+            # Saved states stand for a page updated in place: the element is found again at
+            # the same place in the new page, unless the page changed there
+            found = document.xpath(self._document.getpath(self.element))
+            if not found or found[0].tag != self.element.tag:
+                raise StaleElementReferenceException("The element isn't on the page anymore.")
+            self._document, self.element = document, found[0]
+        return self.element
+
+    @property
+    def id(self):
+        return str(id(self.element))
+
+    @property
+    def tag_name(self):
+        return self._check().tag
+
+    @property
+    def text(self):
+        element = self._check()
+        return _text(element) if _displayed(element) else ""
+
+    @property
+    def size(self):
+        return {"height": 0, "width": 0}
+
+    @property
+    def location(self):
+        return {"x": 0, "y": 0}
+
+    @property
+    def rect(self):
+        return {"x": 0, "y": 0, "height": 0, "width": 0}
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element matches {by} {value!r}.")
+        return elements[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        return _find(self._driver, self._check(), by, value)
+
+    def get_dom_attribute(self, name):
+        return self._check().get(name)
+
+    def get_property(self, name):
+        return self.get_attribute(name)
+
+    def get_attribute(self, name):
+        element = self._check()
+
+        if name == "innerHTML":
+            return escape(element.text or "") + "".join(html.tostring(child, encoding="unicode") for child in element)
+        if name == "outerHTML":
+            return html.tostring(element, encoding="unicode", with_tail=False)
+        if name == "textContent":
+            return element.text_content()
+        if name == "innerText":
+            return _text(element)
+        if name == "text" and element.tag in ("a", "option", "title"):
+            return " ".join(element.text_content().split()) if element.tag == "option" else element.text_content()
+        if name in ("class", "className"):
+            return element.get("class")
+        if name in BOOLEAN_ATTRIBUTES:
+            return "true" if element.get(name) is not None else None
+        if name == "value" and element.tag == "option" and element.get("value") is None:
+            return " ".join(element.text_content().split())
+
+        value = element.get(name)
+        if value is not None and name in URL_ATTRIBUTES:
+            return urljoin(self._driver._base_url(), value.strip())
+        return value
+
+    def value_of_css_property(self, name):
+        style = self._check().get("style") or ""
+        match = re.search(rf"(?:^|;)\s*{re.escape(name)}\s*:\s*([^;]+)", style)
+        return match.group(1).strip() if match else ""
+
+    def is_displayed(self):
+        return _displayed(self._check())
+
+    def is_enabled(self):
+        return self._check().get("disabled") is None
+
+    def is_selected(self):
+        element = self._check()
+        return element.get("selected") is not None or element.get("checked") is not None
+
+    def click(self):
+        self._driver._click(self._check())
+
+    def send_keys(self, *values):
+        element = self._check()
+        keys = "".join(str(value) for value in values)
+
+        if element.tag in ("input", "textarea"):
+            element.set("value", (element.get("value") or "") + SPECIAL_KEYS.sub("", keys))
+        elif SCROLL_KEYS & set(keys):
+            self._driver._event("scroll")
+
+    def clear(self):
+        self._check().set("value", "")
+
+
+class _Window:
+    def __init__(self):
+        self.url = "about:blank"
+        self.document = html.document_fromstring(EMPTY_PAGE).getroottree()
+        self.history = []
+        self.events = {}
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        if handle not in self._driver._windows:
+            raise NoSuchWindowException(f"No window {handle}.")
+        self._driver._handle = handle
+
+    def new_window(self, type_hint=None):
+        handle = f"window-{next(self._driver._handles)}"
+        self._driver._windows[handle] = _Window()
+        self._driver._handle = handle
+
+    def default_content(self):
+        pass
+
+    def frame(self, frame_reference):
+        pass
+
+
+class FakeDriver:
+    """
+    In-process stand-in for the Chrome driver, serving saved pages parsed with lxml, so
+    that the extraction code of the suppliers runs in milliseconds without a browser,
+    e.g. for regression tests of selectors and for profiling extractors.
+
+    It implements the part of the WebDriver API the scraper uses: navigation, CSS, XPath,
+    id, name, tag, class and link text lookups, attributes, rendered text, clicks on links
+    and options (so Selenium's `Select` works), typing, tabs and cookies. Pages don't run
+    JavaScript: the scripts of the scraper (tab loading, "load more" clicks, scrolling
+    and the variant enumeration of `enumerate_variants`) are emulated in Python, and
+    pages reacting to a click or a scroll are given as saved states.
+
+    A URL missing from the fixtures loads an empty page, like a 404, and is added to
+    `missing`. Waiting for a change that no saved state provides lasts the wait's full
+    timeout, as in a browser.
+
+    Attributes:
+    - pages: Dict of URL to the HTML of the page.
+    - states: Dict of URL to a dict of event to the HTML of the page after it (or list of
+      HTMLs, one per repetition of the event). Events are "scroll" or the CSS selector of
+      the clicked element.
+    - strict: Whether to raise on URLs missing from the fixtures instead.
+    - scripts: Dict of other scripts to the Python functions standing in for them, called
+      with the driver and the script's arguments.
+    - missing: The URLs loaded that weren't in the fixtures.
+    """
+
+    def __init__(self, pages, states=None, strict=False, scripts=None):
+        self.pages = {self._key(url): page for url, page in pages.items()}
+        self.states = {self._key(url): events for url, events in (states or {}).items()}
+        self.strict = strict
+        self.scripts = scripts or {}
+        self.missing = []
+
+        self._cookies = []
+        self._timeouts = Timeouts(implicit_wait=0, page_load=300, script=30)
+        self._handles = itertools.count(1)
+        self._handle = "window-0"
+        self._windows = {self._handle: _Window()}
+        self.switch_to = _SwitchTo(self)
+
+    @classmethod
+    def from_directory(cls, directory, strict=False):
+        """
+        Returns a driver serving the pages saved in a fixtures directory, see `save_fixture`.
+
+        Args:
+        - directory: The directory of the saved pages and of their `fixtures.json` index.
+        - strict: Whether to raise on URLs missing from the fixtures.
+        """
+        with open(os.path.join(directory, FIXTURES_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+
+        def read(name):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                return f.read()
+
+        pages = {url: read(name) for url, name in index.get("pages", {}).items()}
+        states = {
+            url: {
+                event: [read(name) for name in names] if isinstance(names, list) else read(names)
+                for event, names in events.items()
+            }
+            for url, events in index.get("states", {}).items()
+        }
+        return cls(pages, states, strict=strict)
+
+    @staticmethod
+    def _key(url):
+        return urldefrag(url)[0].rstrip("/")
+
+    @property
+    def _window(self):
+        if self._handle not in self._windows:
+            raise NoSuchWindowException("The current window was closed.")
+        return self._windows[self._handle]
+
+    def _base_url(self):
+        base = self._window.document.find(".//base[@href]")
+        return self._window.url if base is None else urljoin(self._window.url, base.get("href"))
+
+    def _load(self, page):
+        try:
+            return html.document_fromstring(page).getroottree()
+        except etree.ParserError:
+            return html.document_fromstring(EMPTY_PAGE).getroottree()
+
+    def _event(self, event, element=None):
+        """
+        Replaces the page by its saved state after an event, returns whether it had one.
+        """
+        window = self._window
+        events = self.states.get(self._key(window.url), {})
+
+        for name, pages in events.items():
+            if element is None:
+                if name != event:
+                    continue
+            elif name == "scroll" or element not in _compile(By.CSS_SELECTOR, name)(window.document):
+                continue
+
+            # Repeated events go through the list of states, and stay on the last one
+            count = window.events.get(name, 0)
+            window.events[name] = count + 1
+            if isinstance(pages, list):
+                if count >= len(pages):
+                    return False
+                pages = pages[count]
+
+            window.document = self._load(pages)
+            return True
+
+        return False
+
+    def _toggle(self, element):
+        if element.tag == "option":
+            select = next(element.iterancestors("select"), None)
+            multiple = select is not None and select.get("multiple") is not None
+            if multiple and element.get("selected") is not None:
+                del element.attrib["selected"]
+            else:
+                if select is not None and not multiple:
+                    for option in select.iter("option"):
+                        option.attrib.pop("selected", None)
+                element.set("selected", "selected")
+        elif element.tag == "input" and (element.get("type") or "").lower() in ("checkbox", "radio"):
+            if element.get("checked") is None:
+                element.set("checked", "checked")
+            else:
+                del element.attrib["checked"]
+
+    def _click(self, element):
+        self._toggle(element)
+
+        path = element.getroottree().getpath(element)
+        if self._event("click", element):
+            # The saved state is the page before the option or the box was clicked, as
+            # the browser keeps them
+            found = self._window.document.xpath(path)
+            if found and found[0].tag == element.tag and found[0].tag in ("option", "input"):
+                self._toggle(found[0])
+            return
+
+        link = next((node for node in itertools.chain([element], element.iterancestors()) if node.tag == "a"), None)
+        if link is not None and link.get("href") and not link.get("href").startswith(("#", "javascript:")):
+            self.get(urljoin(self._base_url(), link.get("href")))
+
+    def get(self, url):
+        window = self._window
+        page = self.pages.get(self._key(url))
+
+        if page is None:
+            if self.strict:
+                raise WebDriverException(f"No saved page for {url}.")
+            self.missing.append(url)
+            page = EMPTY_PAGE
+
+        if window.url != "about:blank":
+            window.history.append(window.url)
+        window.url = url
+        window.document = self._load(page)
+        window.events = {}
+
+    def back(self):
+        window = self._window
+        if window.history:
+            url = window.history.pop()
+            self.get(url)
+            window.history.pop()
+
+    def refresh(self):
+        self.get(self._window.url)
+
+    @property
+    def current_url(self):
+        return self._window.url
+
+    @property
+    def title(self):
+        title = self._window.document.find(".//title")
+        return "" if title is None else " ".join(title.text_content().split())
+
+    @property
+    def page_source(self):
+        return html.tostring(self._window.document, encoding="unicode")
+
+    @property
+    def window_handles(self):
+        return list(self._windows)
+
+    @property
+    def current_window_handle(self):
+        return self._handle
+
+    def close(self):
+        self._windows.pop(self._handle, None)
+
+    def quit(self):
+        self._windows = {}
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element matches {by} {value!r}.")
+        return elements[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        return _find(self, self._window.document, by, value)
+
+    def execute_script(self, script, *args):
+        if script in self.scripts:
+            return self.scripts[script](self, *args)
+        if script == LOADED_SCRIPT:
+            return True
+        if script == NAVIGATE_SCRIPT:
+            return self.get(args[0])
+        if script.strip() == "arguments[0].click();":
+            return args[0].click()
+        if "scrollTo" in script:
+            return self._event("scroll")
+        if "scrollHeight" in script:
+            # Grows with the page, like the height of a page whose listing grows
+            return sum(1 for _ in self._window.document.iter())
+        raise JavascriptException(f"The fake driver can't run the script: {script[:80]}")
+
+    def execute_async_script(self, script, *args):
+        if script in self.scripts:
+            return self.scripts[script](self, *args)
+        if script == ENUMERATE_SCRIPT:
+            return self._enumerate_variants(args[0])
+        raise JavascriptException(f"The fake driver can't run the script: {script[:80]}")
+
+    def _read(self, field):
+        elements = _compile(By.CSS_SELECTOR, field["selector"])(self._window.document)
+
+        def value(element):
+            return element.get(field["attribute"]) if field["attribute"] else _text(element).strip()
+
+        if field["multiple"]:
+            return [value(element) for element in elements if value(element)]
+        return value(elements[0]) if elements else None
+
+    def _enumerate_variants(self, config):
+        """
+        Runs `ENUMERATE_SCRIPT` in Python: selects every option, replaying the saved state of
+        its click if there is one, and reads the fields of the variant.
+        """
+        find_options = lambda: [
+            option for select in _compile(By.CSS_SELECTOR, config["select"])(self._window.document)[:1]
+            for option in select.iter("option")
+        ]
+
+        variants = []
+        for index in range(len(find_options())):
+            # The page may have been replaced by the state of the last option
+            options = find_options()
+            if index >= len(options):
+                break
+
+            option = options[index]
+            text = " ".join(option.text_content().split())
+            if not option.get("value", text) or option.get("disabled") is not None:
+                continue
+
+            size = option.get(config["sizeAttribute"]) if config["sizeAttribute"] else text
+            self._click(option)
+
+            variant = {"size": size, "option": option.get("value", text)}
+            for name, description in config["fields"].items():
+                variant[name] = self._read(description)
+            variants.append(variant)
+
+        return variants
+
+    def get_cookies(self):
+        return list(self._cookies)
+
+    def add_cookie(self, cookie):
+        self._cookies.append(dict(cookie))
+
+    def delete_all_cookies(self):
+        self._cookies = []
+
+    @property
+    def timeouts(self):
+        return Timeouts(
+            implicit_wait=self._timeouts.implicit_wait,
+            page_load=self._timeouts.page_load,
+            script=self._timeouts.script,
+        )
+
+    def set_script_timeout(self, seconds):
+        self._timeouts.script = seconds
+
+    def set_page_load_timeout(self, seconds):
+        self._timeouts.page_load = seconds
+
+    def implicitly_wait(self, seconds):
+        self._timeouts.implicit_wait = seconds
+
+
+def save_fixture(driver, directory, url=None, event=None):
+    """
+    Saves the page loaded in a driver (e.g. a real Chrome) as a fixture of `FakeDriver`,
+    returns the name of its file.
+
+    Args:
+    - driver: The driver, on the page to save.
+    - directory: The fixtures directory.
+    - url: The URL the page is served at, defaults to the driver's current URL.
+    - event: Save the page as the state of its URL after this event ("scroll" or the CSS
+      selector of the clicked element) instead. Saving the same event again adds a state.
+    """
+    url = url or driver.current_url
+    os.makedirs(directory, exist_ok=True)
+
+    path = os.path.join(directory, FIXTURES_FILE)
+    index = {"pages": {}, "states": {}}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+
+    key = url if event is None else f"{url} {event} {len(index['states'].get(url, {}).get(event, []))}"
+    name = f"{hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()}.html"
+    with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+        f.write(driver.page_source)
+
+    if event is None:
+        index["pages"][url] = name
+    else:
+        index["states"].setdefault(url, {}).setdefault(event, []).append(name)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+
+    return name
@@ -0,0 +1,163 @@
+import os
+
+import pandas as pd
+
+from .interning import DICTIONARY_FIELDS, expand_variants, read_dictionaries
+
+SCHOOL_COLUMNS = {
+    "schoolsupplier_id": "schoolsupplier_id",
+    "name": "school_name",
+    "store_page": "store_page",
+    "urn": "urn",
+}
+
+PRODUCT_COLUMNS = {
+    "id": "product_id",
+    "schoolsupplier_id": "schoolsupplier_id",
+    "name": "product_name",
+    "url": "product_url",
+    "price": "product_price",
+    "image": "image",
+    "label": "label",
+}
+
+VARIANT_COLUMNS = {
+    "id": "variant_id",
+    "product_id": "product_id",
+    "size": "size",
+    "option": "option",
+    "price": "variant_price",
+    "description": "description",
+    "description_icon_alts": "description_icon_alts",
+    "colors": "colors",
+}
+
+FLAT_COLUMNS = (
+    ["supplier"]
+    + list(SCHOOL_COLUMNS.values())
+    + [column for column in PRODUCT_COLUMNS.values() if column != "schoolsupplier_id"]
+    + [column for column in VARIANT_COLUMNS.values() if column != "product_id"]
+)
+
+
+def _read_chunks(path, columns, chunksize, dtype=None):
+    if not os.path.exists(path):
+        return iter(())
+
+    chunks = pd.read_csv(path, chunksize=chunksize, usecols=lambda column: column in columns, dtype=dtype)
+    return (chunk.rename(columns=columns) for chunk in chunks)
+
+
+def _merge_sorted(parents, children, key):
+    """
+    Left joins two chunked tables that are both sorted by `key`, e.g. products sorted by
+    id and variants sorted by product id. Only the children of the current parent chunk
+    are kept in memory.
+
+    Args:
+    - parents: Iterator of parent chunks, a key can repeat (e.g. a product sold to
+      several schools) even across chunks.
+    - children: Iterator of child chunks.
+    - key: The column to join on.
+    """
+    buffer = None
+    last = None
+    exhausted = False
+
+    for parent in parents:
+        if parent.empty:
+            continue
+
+        if not parent[key].is_monotonic_increasing or (last is not None and parent[key].iloc[0] < last):
+            raise ValueError(f"The parent table isn't sorted by {key}.")
+        last = parent[key].iloc[-1]
+
+        # Read children until one belongs to a later parent chunk
+        while not exhausted and (buffer is None or buffer.empty or buffer[key].iloc[-1] <= last):
+            try:
+                chunk = next(children)
+            except StopIteration:
+                exhausted = True
+                break
+
+            if not chunk[key].is_monotonic_increasing or (
+                buffer is not None and not buffer.empty and chunk[key].iloc[0] < buffer[key].iloc[-1]
+            ):
+                raise ValueError(f"The child table isn't sorted by {key}.")
+
+            buffer = chunk if buffer is None else pd.concat([buffer, chunk], ignore_index=True)
+
+        if buffer is None:
+            yield parent
+            continue
+
+        ready = buffer[buffer[key] <= last]
+        # The next parent chunk may start with the same key
+        buffer = buffer[buffer[key] >= last]
+
+        yield parent.merge(ready, how="left", on=key)
+
+
+def iter_flat_chunks(supplier, input_dir=".", chunksize=50000):
+    """
+    Yields the flat file rows of a supplier (one row per variant, or per product for
+    suppliers scraped down to products) chunk by chunk, from its `<supplier>_<depth>.csv`
+    files. Yields nothing if the supplier has no schools or products.
+
+    Args:
+    - supplier: The supplier to read.
+    - input_dir: The directory containing the scraped CSV files.
+    - chunksize: The number of rows read at once.
+    """
+    path = lambda depth: os.path.join(input_dir, f"{supplier}_{depth}.csv")
+
+    if not os.path.exists(path("schools")) or not os.path.exists(path("products")):
+        print(f"Skipping {supplier}, it has no schools or products.")
+        return
+
+    schools = pd.read_csv(path("schools"), usecols=lambda column: column in SCHOOL_COLUMNS)
+    schools = schools.rename(columns=SCHOOL_COLUMNS)
+
+    products = _read_chunks(path("products"), PRODUCT_COLUMNS, chunksize)
+
+    # Descriptions, icon sets and colour sets are stored once, in dictionary tables
+    references = {column: column for column, table in DICTIONARY_FIELDS.values()}
+    dictionaries = read_dictionaries(supplier, input_dir)
+    variants = _read_chunks(path("variants"), {**VARIANT_COLUMNS, **references}, chunksize, dtype=dict.fromkeys(references, str))
+    variants = (expand_variants(chunk, dictionaries) for chunk in variants)
+
+    for chunk in _merge_sorted(products, variants, "product_id"):
+        chunk = chunk.merge(schools, how="left", on="schoolsupplier_id")
+        chunk["supplier"] = supplier
+        yield chunk.reindex(columns=FLAT_COLUMNS)
+
+
+def build_flat_file(suppliers, output_path, input_dir=".", chunksize=50000):
+    """
+    Builds the flat file (one row per variant, or per product for suppliers scraped down
+    to products) from the `<supplier>_<depth>.csv` files, without loading them whole.
+
+    Products are streamed in chunks and joined with the variants of the chunk only, which
+    relies on the scraper writing products sorted by id and variants sorted by product id.
+    Schools are small and kept in memory for one supplier at a time. The output is
+    appended chunk by chunk, so memory stays bounded however many suppliers are joined.
+
+    Args:
+    - suppliers: The suppliers to include.
+    - output_path: Path of the flat file CSV.
+    - input_dir: The directory containing the scraped CSV files.
+    - chunksize: The number of rows read at once.
+    """
+    rows = 0
+    header = True
+
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+    for supplier in suppliers:
+        for chunk in iter_flat_chunks(supplier, input_dir=input_dir, chunksize=chunksize):
+            chunk.to_csv(output_path, mode="a", header=header, index=False)
+            header = False
+            rows += len(chunk)
+
+    return rows
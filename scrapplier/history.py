@@ -0,0 +1,219 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from .ids import canonical_url
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class PriceHistory:
+    """
+    Append-only price history of the scraped products and variants, stored in SQLite.
+
+    Every (supplier, product, variant) has one row per period during which its price and
+    availability stayed the same, valid from `valid_from` until `valid_to` (None while it
+    is still current). A crawl only writes rows for the prices that changed, so the store
+    grows with the number of changes rather than with the number of crawls.
+
+    Products are keyed by their canonical URL (see `canonical_url`) and variants by their
+    size. Products scraped without variants use an empty variant key. The time every
+    product was last crawled is kept too, to tell pages that didn't change from pages that
+    weren't crawled, along with the URL it was crawled at, as the canonical URL isn't
+    always one the supplier serves.
+
+    Attributes:
+    - path: Path of the SQLite database.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS price_history (
+                    supplier TEXT NOT NULL,
+                    product_key TEXT NOT NULL,
+                    variant_key TEXT NOT NULL,
+                    price TEXT,
+                    available INTEGER NOT NULL,
+                    valid_from TEXT NOT NULL,
+                    valid_to TEXT
+                )
+            """)
+            self.connection.execute("""
+                CREATE INDEX IF NOT EXISTS price_history_key
+                ON price_history (supplier, product_key, variant_key, valid_from)
+            """)
+            self.connection.execute("""
+                CREATE INDEX IF NOT EXISTS price_history_validity
+                ON price_history (valid_from, valid_to)
+            """)
+            # When every product page was last crawled, changed or not, and at which URL
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS last_seen (
+                    supplier TEXT NOT NULL,
+                    product_key TEXT NOT NULL,
+                    seen_at TEXT NOT NULL,
+                    url TEXT,
+                    PRIMARY KEY (supplier, product_key)
+                )
+            """)
+            # Histories created before the URLs were kept
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(last_seen)")]
+            if "url" not in columns:
+                self.connection.execute("ALTER TABLE last_seen ADD COLUMN url TEXT")
+
+    def record(self, supplier, observations, observed_at=None, complete=True, crawled=(), urls=None):
+        """
+        Records the prices observed by a crawl, returns the number of changes written.
+
+        Args:
+        - supplier: The supplier the prices were scraped from.
+        - observations: Iterable of (product_key, variant_key, price) tuples.
+        - observed_at: ISO timestamp of the crawl, defaults to now.
+        - complete: Whether the crawl covered the whole supplier. Keys that weren't
+          observed by a complete crawl are recorded as unavailable.
+        - crawled: Product keys whose page was crawled without any price observed, e.g. no
+          variant was found on it. Their prices are left as they were and they count as seen.
+        - urls: Optional dict of product key to the URL its page was crawled at, kept to
+          revisit the page. Pages without one keep the URL recorded before.
+        """
+        observed_at = observed_at or _now()
+        urls = urls or {}
+
+        current = {
+            (product_key, variant_key): (rowid, price, available)
+            for rowid, product_key, variant_key, price, available in self.connection.execute(
+                """
+                SELECT rowid, product_key, variant_key, price, available FROM price_history
+                WHERE supplier = ? AND valid_to IS NULL
+                """,
+                (supplier,),
+            )
+        }
+
+        closed = []
+        opened = []
+        seen = set()
+
+        for product_key, variant_key, price in observations:
+            key = (product_key, variant_key or "")
+            if key in seen:
+                continue
+            seen.add(key)
+
+            previous = current.get(key)
+            if previous is not None:
+                if previous[1] == price and previous[2]:
+                    continue
+                closed.append(previous[0])
+
+            opened.append((supplier, key[0], key[1], price, 1, observed_at))
+
+        if complete:
+            for key, (rowid, price, available) in current.items():
+                if key not in seen and key[0] not in crawled and available:
+                    closed.append(rowid)
+                    opened.append((supplier, key[0], key[1], price, 0, observed_at))
+
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE price_history SET valid_to = ? WHERE rowid = ?",
+                [(observed_at, rowid) for rowid in closed],
+            )
+            self.connection.executemany(
+                """
+                INSERT INTO price_history (supplier, product_key, variant_key, price, available, valid_from)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                opened,
+            )
+            self.connection.executemany(
+                """
+                INSERT INTO last_seen (supplier, product_key, seen_at, url) VALUES (?, ?, ?, ?)
+                ON CONFLICT (supplier, product_key)
+                DO UPDATE SET seen_at = excluded.seen_at, url = COALESCE(excluded.url, url)
+                """,
+                [
+                    (supplier, product_key, observed_at, urls.get(product_key))
+                    for product_key in {key[0] for key in seen} | set(crawled)
+                ],
+            )
+
+        return len(opened)
+
+    def record_crawl(self, supplier, products, variants=None, observed_at=None, complete=True):
+        """
+        Records the products (and variants, if scraped) of a crawl.
+
+        Args:
+        - supplier: The supplier the data was scraped from.
+        - products: The `Product` records of the crawl.
+        - variants: The `Variant` records of the crawl, if it went down to variants.
+        - observed_at: ISO timestamp of the crawl, defaults to now.
+        - complete: Whether the crawl covered the whole supplier.
+        """
+        urls = {canonical_url(product.url): product.url for product in products}
+
+        if variants is None:
+            observations = [(canonical_url(product.url), "", product.price) for product in products]
+            crawled = set()
+        else:
+            keys = {product.id: canonical_url(product.url) for product in products}
+            observations = [(keys[variant.product_id], variant.size, variant.price) for variant in variants]
+            # Products whose variant stage found nothing were still crawled
+            crawled = set(keys.values()) - {product_key for product_key, _, _ in observations}
+
+        return self.record(supplier, observations, observed_at=observed_at, complete=complete, crawled=crawled, urls=urls)
+
+    def _query(self, where, params):
+        return pd.read_sql_query(
+            f"SELECT * FROM price_history WHERE {where} ORDER BY supplier, product_key, variant_key, valid_from",
+            self.connection,
+            params=params,
+        )
+
+    def as_of(self, when, supplier=None):
+        """
+        Returns the prices that were current at a point in time.
+
+        Args:
+        - when: ISO timestamp.
+        - supplier: Only return the prices of this supplier.
+        """
+        where = "valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)"
+        params = [when, when]
+
+        if supplier is not None:
+            where += " AND supplier = ?"
+            params.append(supplier)
+
+        return self._query(where, params)
+
+    def between(self, start, end, supplier=None, product_key=None):
+        """
+        Returns every price that was current at some point between two timestamps.
+
+        Args:
+        - start: ISO timestamp of the start of the range.
+        - end: ISO timestamp of the end of the range.
+        - supplier: Only return the prices of this supplier.
+        - product_key: Only return the prices of this product (its canonical URL).
+        """
+        where = "valid_from < ? AND (valid_to IS NULL OR valid_to > ?)"
+        params = [end, start]
+
+        if supplier is not None:
+            where += " AND supplier = ?"
+            params.append(supplier)
+
+        if product_key is not None:
+            where += " AND product_key = ?"
+            params.append(product_key)
+
+        return self._query(where, params)
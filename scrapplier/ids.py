@@ -0,0 +1,109 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .records import School, Product
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_ga", "ref", "srsltid"}
+
+
+def canonical_url(url):
+    """
+    Returns the canonical form of a URL, so that the links to a page found on different
+    pages of a supplier (or on different crawls) are equal: lowercase scheme and host,
+    no "www.", default port, fragment, tracking parameters or trailing slash, and sorted
+    query parameters.
+
+    Args:
+    - url: The URL.
+    """
+    if not url:
+        return url
+
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port is not None and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/") or "/"
+
+    query = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith("utm_")
+    ]
+
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+
+def stable_id(*parts):
+    """
+    Returns a 63-bit integer derived from the parts, the same on every machine and every
+    run. Collisions are negligible below billions of ids.
+
+    Args:
+    - parts: The strings identifying the record, None is treated as "".
+    """
+    key = "\x1f".join("" if part is None else str(part) for part in parts)
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def school_id(supplier, store_page):
+    """
+    Returns the id of a school of a supplier, from its store page.
+
+    Args:
+    - supplier: The supplier.
+    - store_page: The URL of the school's page on the supplier website.
+    """
+    return stable_id("school", supplier, canonical_url(store_page))
+
+
+def product_id(supplier, url):
+    """
+    Returns the id of a product of a supplier, from its URL. Products sold to several
+    schools of a supplier have the same id.
+
+    Args:
+    - supplier: The supplier.
+    - url: The URL of the product page.
+    """
+    return stable_id("product", supplier, canonical_url(url))
+
+
+def variant_id(supplier, product_url, size, option=None):
+    """
+    Returns the id of a variant of a product, from the product's URL, the variant's size
+    and the option it was picked with, so that the colours of a size have their own ids.
+
+    Args:
+    - supplier: The supplier.
+    - product_url: The URL of the product page.
+    - size: The size of the variant.
+    - option: The value of the variant's option on the product page, if known.
+    """
+    return stable_id("variant", supplier, canonical_url(product_url), size, option)
+
+
+def assign_ids(supplier, records, parent=None):
+    """
+    Sets the stable ids of scraped records, and their parent's id.
+
+    Args:
+    - supplier: The supplier the records were scraped from.
+    - records: `School`, `Product` or `Variant` records, all of the same type.
+    - parent: The school of the products, or the product of the variants.
+    """
+    for record in records:
+        if isinstance(record, School):
+            record.schoolsupplier_id = school_id(supplier, record.store_page)
+        elif isinstance(record, Product):
+            record.schoolsupplier_id = parent.schoolsupplier_id
+            record.id = product_id(supplier, record.url)
+        else:
+            record.product_id = parent.id
+            record.id = variant_id(supplier, parent.url, record.size, record.option)
+    return records
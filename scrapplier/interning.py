@@ -0,0 +1,131 @@
+import hashlib
+import os
+
+import pandas as pd
+
+# Variant fields repeated for every size of a product, the column referencing them and
+# the dictionary table they are stored in
+DICTIONARY_FIELDS = {
+    "description": ("description_id", "descriptions"),
+    "description_icon_alts": ("icon_set_id", "icon_sets"),
+    "colors": ("color_set_id", "color_sets"),
+}
+
+
+def intern_fields(records, cache, fields=tuple(DICTIONARY_FIELDS)):
+    """
+    Makes equal field values of the records share one object, so that the description
+    of a product is held once in memory however many variants repeat it. Returns the
+    records.
+
+    Args:
+    - records: The records to intern.
+    - cache: Dict of the values interned so far, shared by the records of a crawl.
+    - fields: The fields to intern.
+    """
+    for record in records:
+        for field in fields:
+            value = getattr(record, field)
+            if value is not None:
+                setattr(record, field, cache.setdefault(value, value))
+    return records
+
+
+def text_id(value):
+    """
+    Returns the key of a value in its dictionary table: a hash of its text, the same on
+    every run and every machine.
+
+    Args:
+    - value: The text, or the tuple of texts.
+    """
+    return hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _text(value):
+    if value is None or value is pd.NA or value != value:
+        return None
+    # Tuples are written the same way as before normalisation, e.g. "('Navy', 'Grey')",
+    # also when they were read back from JSON as lists
+    return str(tuple(value) if isinstance(value, list) else value)
+
+
+def normalise_variants(frame):
+    """
+    Replaces the repeated text columns of variant rows by the key of their value, returns
+    the variants and a dict of the dictionary tables (one row per distinct value).
+
+    Args:
+    - frame: The variant rows.
+    """
+    frame = frame.copy()
+    tables = {}
+
+    for field, (column, table) in DICTIONARY_FIELDS.items():
+        if field not in frame:
+            continue
+
+        values = frame.pop(field)
+        texts = values.map(_text)
+
+        distinct = texts.dropna().drop_duplicates()
+        ids = distinct.map(text_id)
+
+        frame[column] = texts.map(dict(zip(distinct, ids)))
+        tables[table] = pd.DataFrame({"id": ids.values, field: distinct.values})
+
+    return frame, tables
+
+
+def write_variants(frame, supplier, output_dir="."):
+    """
+    Writes variant rows to `<supplier>_variants.csv` with their descriptions, icon sets
+    and colour sets in `<supplier>_descriptions.csv`, `<supplier>_icon_sets.csv` and
+    `<supplier>_color_sets.csv`.
+
+    Args:
+    - frame: The variant rows.
+    - supplier: The supplier that was scraped.
+    - output_dir: The directory to write the files to.
+    """
+    frame, tables = normalise_variants(frame)
+
+    frame.to_csv(os.path.join(output_dir, f"{supplier}_variants.csv"), index=False)
+    for table, rows in tables.items():
+        rows.to_csv(os.path.join(output_dir, f"{supplier}_{table}.csv"), index=False)
+
+
+def read_dictionaries(supplier, input_dir="."):
+    """
+    Reads the dictionary tables of a supplier, returns a dict of the variant field to a
+    Series of its values indexed by key. Tables that weren't written are left out.
+
+    Args:
+    - supplier: The supplier.
+    - input_dir: The directory containing the scraped CSV files.
+    """
+    dictionaries = {}
+
+    for field, (column, table) in DICTIONARY_FIELDS.items():
+        path = os.path.join(input_dir, f"{supplier}_{table}.csv")
+        if os.path.exists(path):
+            rows = pd.read_csv(path, dtype={"id": str})
+            dictionaries[field] = rows.set_index("id")[field]
+
+    return dictionaries
+
+
+def expand_variants(frame, dictionaries):
+    """
+    Replaces the keys of normalised variant rows by their values, the inverse of
+    `normalise_variants`. Rows written before normalisation are returned as they are.
+
+    Args:
+    - frame: The variant rows.
+    - dictionaries: The dictionary tables, as returned by `read_dictionaries`.
+    """
+    for field, (column, table) in DICTIONARY_FIELDS.items():
+        if column in frame:
+            keys = frame.pop(column).astype("string")
+            frame[field] = keys.map(dictionaries[field]) if field in dictionaries else None
+    return frame
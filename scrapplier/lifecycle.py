@@ -0,0 +1,225 @@
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from .egress import looks_blocked
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class ManagedDriver:
+    """
+    Wraps the Chrome of a `Scraper` and keeps it healthy over long crawls.
+
+    - Dead sessions (crashed or closed browsers) are detected, the browser is restarted
+      and the interrupted page is loaded again.
+    - `recycle_if_needed` restarts the browser once it loaded `max_pages` pages, uses more
+      than `max_rss_mb` of memory or its pages take more than `max_latency` seconds to
+      load on average.
+    - The cookies (and so the logins) are restored after every restart.
+    - Pages loaded in tabs are counted with `record_navigation`, as they don't go
+      through `get`.
+    - With an `EgressPool`, the browser goes through one of its proxies. Every page load
+      is reported to the pool, and the browser is restarted on another proxy once its
+      proxy is evicted.
+
+    Every other attribute is forwarded to the current driver.
+
+    Attributes:
+    - factory: Function returning a new driver, called with a proxy of `egress` if given.
+    - max_pages: Restart after this many pages, None to never restart on page count.
+    - max_rss_mb: Restart when the browser uses more memory than this, needs psutil.
+    - max_latency: Restart when the average page load takes longer than this many seconds.
+    - check_every: How many pages between two memory checks and cookie snapshots.
+    - egress: Optional `EgressPool` the browser's proxy comes from.
+    - egress_key: The sticky session key of the browser in the pool.
+    """
+
+    # Fields of the cookies returned by CDP that can be passed back to Network.setCookie
+    COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+    def __init__(self, factory, max_pages=None, max_rss_mb=None, max_latency=None, check_every=25, egress=None,
+                 egress_key="browser"):
+        self.factory = factory
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.max_latency = max_latency
+        self.check_every = check_every
+        self.egress = egress
+        self.egress_key = egress_key
+
+        self.proxy = None
+        self.driver = self._new_driver()
+        self.pages = 0
+        self.latency = None
+        self.restarts = 0
+        self._cookies = []
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+    def _new_driver(self):
+        if self.egress is None:
+            return self.factory()
+
+        if self.proxy is not None:
+            self.egress.release(self.proxy)
+        self.proxy = self.egress.acquire(self.egress_key)
+        return self.factory(self.proxy)
+
+    def _report(self, elapsed=None, error=False):
+        if self.egress is None:
+            return
+
+        blocked = False
+        if not error:
+            try:
+                blocked = looks_blocked(text=self.driver.title)
+            except WebDriverException:
+                pass
+        self.egress.report(self.proxy, latency=elapsed, error=error, blocked=blocked)
+
+    def get(self, url):
+        """
+        Loads a page, restarting the browser and loading the page again if the session died.
+
+        Args:
+        - url: The URL to load.
+        """
+        start = time.time()
+
+        try:
+            self.driver.get(url)
+        except WebDriverException:
+            if self.is_alive():
+                self._report(error=True)
+                raise
+            print(f"Browser session died while loading {url}, restarting it.")
+            self.restart()
+            start = time.time()
+            self.driver.get(url)
+
+        self.record_navigation(time.time() - start)
+
+    def record_navigation(self, elapsed):
+        """
+        Counts a page loaded without `get`, e.g. in a tab of `TabPool`, towards the page
+        count and the latency of the browser, and reports it to the egress pool.
+
+        Args:
+        - elapsed: The seconds the page took to load.
+        """
+        # Exponential moving average, so that the latency follows the browser's current state
+        self.latency = elapsed if self.latency is None else 0.9 * self.latency + 0.1 * elapsed
+        self.pages += 1
+        self._report(elapsed)
+
+        if self.pages % self.check_every == 0:
+            self.save_cookies()
+
+    def is_alive(self):
+        """
+        Returns whether the browser session still responds.
+        """
+        try:
+            self.driver.window_handles
+            return True
+        except WebDriverException:
+            return False
+
+    def rss_mb(self):
+        """
+        Returns the memory used by the browser and its child processes in MB, or None if
+        psutil isn't installed.
+        """
+        if psutil is None:
+            return None
+
+        pid = getattr(self.driver, "browser_pid", None) or self.driver.service.process.pid
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(process.memory_info().rss for process in processes) / 1024 ** 2
+        except psutil.Error:
+            return None
+
+    def _needs_recycling(self):
+        if self.proxy is not None and self.proxy.evicted_until is not None:
+            return "unhealthy proxy"
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            return "page count"
+        if self.max_latency is not None and self.latency is not None and self.latency > self.max_latency:
+            return "page load latency"
+        if self.max_rss_mb is not None and self.pages and self.pages % self.check_every == 0:
+            rss = self.rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                return "memory"
+        return None
+
+    def recycle_if_needed(self):
+        """
+        Restarts the browser if it crossed one of the thresholds, returns whether it did.
+        """
+        reason = self._needs_recycling()
+        if reason is None:
+            return False
+
+        print(f"Recycling the browser ({reason}) after {self.pages} pages.")
+        self.restart()
+        return True
+
+    def save_cookies(self):
+        """
+        Takes a snapshot of the cookies of every domain, restored after a restart.
+        """
+        try:
+            cookies = self.driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+            self._cookies = [
+                {field: cookie[field] for field in self.COOKIE_FIELDS if field in cookie}
+                for cookie in cookies
+            ]
+        except (WebDriverException, AttributeError, KeyError):
+            try:
+                self._cookies = self.driver.get_cookies()
+            except WebDriverException:
+                pass
+
+    def _restore_cookies(self):
+        try:
+            for cookie in self._cookies:
+                self.driver.execute_cdp_cmd("Network.setCookie", cookie)
+            return
+        except (WebDriverException, AttributeError):
+            pass
+
+        # Without CDP, cookies can only be added to the domain of the current page
+        for domain in {cookie["domain"].lstrip(".") for cookie in self._cookies}:
+            self.driver.get(f"https://{domain}/")
+            for cookie in self._cookies:
+                if cookie["domain"].lstrip(".") == domain:
+                    try:
+                        self.driver.add_cookie(cookie)
+                    except WebDriverException:
+                        pass
+
+    def restart(self):
+        """
+        Replaces the browser with a new one and restores the cookies.
+        """
+        if self.is_alive():
+            self.save_cookies()
+
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+        self.driver = self._new_driver()
+        self.pages = 0
+        self.latency = None
+        self.restarts += 1
+
+        self._restore_cookies()
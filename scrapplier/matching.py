@@ -0,0 +1,270 @@
+import hashlib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .store import categorise
+
+# Words that say nothing about what the product is
+STOPWORDS = {
+    "the", "and", "of", "with", "for", "in", "a", "school", "schools", "uniform", "academy",
+    "primary", "high", "st", "new", "logo", "embroidered", "badge", "badged", "crest",
+}
+
+COLOURS = {
+    "black", "navy", "grey", "gray", "white", "red", "royal", "blue", "green", "bottle", "maroon",
+    "burgundy", "purple", "yellow", "gold", "sky", "brown", "charcoal", "pink", "orange", "jade",
+}
+
+# Ages and age ranges, e.g. "Age 7-8", "7–8 years", "age 11"
+AGE_PATTERN = re.compile(r"(?:age\s*)?(\d{1,2})\s*(?:-|–|to)\s*(\d{1,2})\s*(?:years|yrs|y)?\b|age\s*(\d{1,2})")
+
+# Multipliers of the splitmix64 finaliser, which turns a feature hash and a seed into
+# one of the MinHash hash functions
+MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def tokens(name):
+    """
+    Returns the set of features of a product name: its words (without stop words) and
+    pairs of consecutive words, its category, its colours and its age range.
+
+    Args:
+    - name: The name of the product.
+    """
+    if not isinstance(name, str):
+        return set()
+
+    name = re.sub(r"['’]s\b", "", name.lower()).replace("grey", "gray")
+    ages = [f"age:{first}-{last}" if first else f"age:{single}" for first, last, single in AGE_PATTERN.findall(name)]
+
+    # Ages are matched as a whole, not number by number
+    words = [word for word in re.findall(r"[a-z]+", AGE_PATTERN.sub(" ", name)) if word not in STOPWORDS]
+
+    features = set(words)
+    features.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    features.add(f"category:{categorise(name)}")
+    features.update(f"colour:{word}" for word in words if word in COLOURS)
+    features.update(ages)
+    return features
+
+
+def _token_hashes(features):
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big") for feature in features],
+        dtype=np.uint64,
+    )
+
+
+class MatchIndex:
+    """
+    Index of the products of every supplier for finding the equivalent products of other
+    suppliers, e.g. the George (generic) equivalent of a school's grey trousers age 7-8,
+    without comparing every pair of names.
+
+    Every product name is reduced to a set of features (see `tokens`). Products with the
+    same features (the same trousers sold to hundreds of schools) share one entry, and
+    every entry gets a MinHash signature of `bands * rows` hashes, whose share of equal
+    hashes between two entries estimates the Jaccard similarity of their features.
+    Signatures are cut into `bands` bands, and only entries sharing a whole band are
+    compared (locality sensitive hashing), so the cost grows with the number of distinct
+    names rather than with the number of pairs.
+
+    The index is updated one supplier at a time: `update` only compares the entries that
+    are new to the index, the pairs between the others are kept.
+
+    Attributes:
+    - bands: The number of bands, more bands find less similar pairs.
+    - rows: The number of hashes per band, more rows keep fewer dissimilar candidates.
+    - threshold: The smallest estimated similarity of a kept pair.
+    - products: DataFrame of the indexed products (supplier, url, name).
+    """
+
+    def __init__(self, bands=32, rows=4, threshold=0.5, seed=0):
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+
+        rng = np.random.default_rng(seed)
+        self._seeds = rng.integers(0, np.iinfo(np.uint64).max, size=bands * rows, dtype=np.uint64, endpoint=True)
+
+        self.products = pd.DataFrame(columns=["supplier", "url", "name"])
+
+        # Entry (frozen set of features) to its signature, its products and its matched entries
+        self._signatures = {}
+        self._members = {}
+        self._pairs = {}
+        self._entries = {}
+        self._buckets = [{} for _ in range(bands)]
+
+    def _signature(self, features):
+        # Every column is one hash function applied to every feature, the signature keeps the minimum
+        values = _token_hashes(features)[:, None] ^ self._seeds
+        values = (values ^ (values >> np.uint64(30))) * MIX_1
+        values = (values ^ (values >> np.uint64(27))) * MIX_2
+        values ^= values >> np.uint64(31)
+        return values.min(axis=0)
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _add_entry(self, entry):
+        signature = self._signature(entry)
+        self._signatures[entry] = signature
+        self._members[entry] = set()
+        self._pairs[entry] = {}
+
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.setdefault(band_key, set())
+            candidates.update(bucket)
+            bucket.add(entry)
+
+        for other in candidates:
+            estimated = float(np.mean(signature == self._signatures[other]))
+            if estimated < self.threshold:
+                continue
+            similarity = len(entry & other) / len(entry | other)
+            self._pairs[entry][other] = self._pairs[other][entry] = (estimated, similarity)
+
+    def _remove_entry(self, entry):
+        for buckets, band_key in zip(self._buckets, self._band_keys(self._signatures.pop(entry))):
+            bucket = buckets[band_key]
+            bucket.discard(entry)
+            if not bucket:
+                del buckets[band_key]
+
+        for other in self._pairs.pop(entry):
+            del self._pairs[other][entry]
+        del self._members[entry]
+
+    def remove(self, supplier):
+        """
+        Removes the products of a supplier from the index.
+
+        Args:
+        - supplier: The supplier.
+        """
+        for url in self.products.loc[self.products["supplier"] == supplier, "url"]:
+            key = (supplier, url)
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                continue
+            self._members[entry].discard(key)
+            if not self._members[entry]:
+                self._remove_entry(entry)
+
+        self.products = self.products[self.products["supplier"] != supplier]
+
+    def update(self, supplier, products):
+        """
+        Replaces the products of a supplier and matches them with the indexed products,
+        returns the number of entries new to the index.
+
+        Args:
+        - supplier: The supplier.
+        - products: DataFrame of the supplier's products, with `url` and `name` columns.
+          Products sold to several schools are indexed once.
+        """
+        self.remove(supplier)
+
+        products = products[["url", "name"]].dropna(subset=["url"]).drop_duplicates("url").assign(supplier=supplier)
+        new = 0
+
+        for url, name in zip(products["url"], products["name"]):
+            entry = frozenset(tokens(name))
+            if not entry:
+                continue
+            if entry not in self._members:
+                self._add_entry(entry)
+                new += 1
+
+            key = (supplier, url)
+            self._members[entry].add(key)
+            self._entries[key] = entry
+
+        self.products = pd.concat([self.products, products[["supplier", "url", "name"]]], ignore_index=True)
+        return new
+
+    def update_from_file(self, supplier, input_dir="."):
+        """
+        Replaces the products of a supplier by those of its scraped products CSV file,
+        returns the number of entries new to the index.
+
+        Args:
+        - supplier: The supplier.
+        - input_dir: The directory containing the scraped CSV files.
+        """
+        path = os.path.join(input_dir, f"{supplier}_products.csv")
+        if not os.path.exists(path):
+            raise ValueError(f"No products file for {supplier} in {input_dir}.")
+
+        new = self.update(supplier, pd.read_csv(path, usecols=["url", "name"]))
+        print(f"Indexed the products of {supplier}, {new} new names.")
+        return new
+
+    def groups(self, min_similarity=None):
+        """
+        Returns the candidate equivalence groups: the connected components of the matched
+        entries holding products of several suppliers, one row per product with its group
+        and its score, the mean similarity of its entry's matches (1 for identical names).
+
+        Args:
+        - min_similarity: Only use the matches at least this similar, defaults to the threshold.
+        """
+        min_similarity = self.threshold if min_similarity is None else min_similarity
+        parent = {}
+
+        def find(entry):
+            parent.setdefault(entry, entry)
+            while parent[entry] != entry:
+                parent[entry] = parent[parent[entry]]
+                entry = parent[entry]
+            return entry
+
+        scores = {}
+        for entry, matches in self._pairs.items():
+            similarities = [similarity for other, (_, similarity) in matches.items() if similarity >= min_similarity]
+            scores[entry] = float(np.mean(similarities)) if similarities else 1.0
+            for other, (_, similarity) in matches.items():
+                if similarity >= min_similarity:
+                    parent[find(entry)] = find(other)
+
+        rows = [
+            (find(entry), supplier, url, scores[entry])
+            for entry, members in self._members.items()
+            for supplier, url in members
+        ]
+        groups = pd.DataFrame(rows, columns=["root", "supplier", "url", "score"])
+
+        # Only groups pairing suppliers are candidates for a comparison
+        suppliers = groups.groupby("root")["supplier"].transform("nunique")
+        groups = groups[suppliers > 1].copy()
+        groups["group"] = pd.factorize(groups["root"])[0]
+
+        groups = groups.merge(self.products, on=["supplier", "url"], how="left")
+        return groups.drop(columns="root").sort_values(["group", "supplier", "url"]).reset_index(drop=True)
+
+    def matches(self, supplier, url):
+        """
+        Returns the products of other suppliers matched with a product, most similar first.
+
+        Args:
+        - supplier: The supplier of the product.
+        - url: The URL of the product.
+        """
+        entry = self._entries.get((supplier, url))
+        if entry is None:
+            raise ValueError(f"{url} of {supplier} isn't indexed.")
+
+        rows = [(other_supplier, other_url, 1.0, 1.0) for other_supplier, other_url in self._members[entry]]
+        for other, (estimated, similarity) in self._pairs[entry].items():
+            rows += [(other_supplier, other_url, estimated, similarity) for other_supplier, other_url in self._members[other]]
+
+        matches = pd.DataFrame(rows, columns=["supplier", "url", "estimated", "similarity"])
+        matches = matches[matches["supplier"] != supplier].merge(self.products, on=["supplier", "url"], how="left")
+
+        return matches.sort_values(["similarity", "url"], ascending=[False, True]).reset_index(drop=True)
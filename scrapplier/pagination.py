@@ -0,0 +1,235 @@
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import WebDriverException, TimeoutException
+
+
+def add_query_params(url, **params):
+    """
+    Adds (or replaces) query parameters on a URL.
+
+    Args:
+    - url: The URL to add the parameters to.
+    - params: The query parameters to set.
+    """
+    parts = urlparse(url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query.update({key: str(value) for key, value in params.items()})
+
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+class PageNumberPagination:
+    """
+    Listing pages addressed by a page number in the query string, e.g. `?page=2`.
+
+    Attributes:
+    - page_param: Name of the page number query parameter.
+    - start: Number of the first page.
+    - extra_params: Query parameters added to every page URL, e.g. a page size.
+    - max_pages: Upper bound on the pages walked.
+    """
+
+    def __init__(self, page_param="page", start=1, extra_params=None, max_pages=100):
+        self.page_param = page_param
+        self.start = start
+        self.extra_params = extra_params or {}
+        self.max_pages = max_pages
+
+    def page_url(self, url, page):
+        """
+        Builds the URL of a given page.
+
+        Args:
+        - url: The URL of the listing.
+        - page: The page number.
+        """
+        return add_query_params(url, **self.extra_params, **{self.page_param: page})
+
+    def collect(self, driver, url, extract):
+        """
+        Loads the pages of a listing one after another and merges the extracted items.
+
+        Stops at the first empty page, or when a page repeats the previous one (most
+        platforms serve the last page again for out of range page numbers).
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - url: The URL of the listing.
+        - extract: Function taking the driver and returning the items on the loaded page.
+        """
+        items = []
+        previous = None
+
+        for page in range(self.start, self.start + self.max_pages):
+            driver.get(self.page_url(url, page))
+            page_items = extract(driver)
+
+            if not page_items or page_items == previous:
+                break
+
+            items.extend(page_items)
+            previous = page_items
+
+        return items
+
+
+class OffsetPagination:
+    """
+    API endpoints paged by an offset and a limit, e.g. `?offset=200&limit=100`.
+
+    Attributes:
+    - limit: The number of items requested per call.
+    - offset_param: Name of the offset query parameter.
+    - limit_param: Name of the limit query parameter.
+    - max_requests: Upper bound on the calls made.
+    """
+
+    def __init__(self, limit=100, offset_param="offset", limit_param="limit", max_requests=1000):
+        self.limit = limit
+        self.offset_param = offset_param
+        self.limit_param = limit_param
+        self.max_requests = max_requests
+
+    def page_url(self, url, offset):
+        """
+        Builds the URL of the page starting at a given offset.
+
+        Args:
+        - url: The URL of the endpoint.
+        - offset: The offset of the first item.
+        """
+        return add_query_params(url, **{self.offset_param: offset, self.limit_param: self.limit})
+
+    def collect(self, url, fetch):
+        """
+        Calls the endpoint until it returns a short page.
+
+        Args:
+        - url: The URL of the endpoint.
+        - fetch: Function taking a page URL and returning the items of that page.
+        """
+        items = []
+
+        for request in range(self.max_requests):
+            page_items = fetch(self.page_url(url, request * self.limit))
+            items.extend(page_items)
+
+            if len(page_items) < self.limit:
+                break
+
+        return items
+
+
+class CursorPagination:
+    """
+    API endpoints where every response carries the cursor of the next page.
+
+    Attributes:
+    - cursor_param: Name of the cursor query parameter.
+    - max_requests: Upper bound on the calls made.
+    """
+
+    def __init__(self, cursor_param="cursor", max_requests=1000):
+        self.cursor_param = cursor_param
+        self.max_requests = max_requests
+
+    def collect(self, url, fetch):
+        """
+        Follows the cursors until the endpoint stops returning one.
+
+        Args:
+        - url: The URL of the endpoint.
+        - fetch: Function taking a page URL and returning a tuple of the items and the
+          next cursor (or None on the last page).
+        """
+        items = []
+        page_url = url
+
+        for _ in range(self.max_requests):
+            page_items, cursor = fetch(page_url)
+            items.extend(page_items)
+
+            if not cursor:
+                break
+
+            page_url = add_query_params(url, **{self.cursor_param: cursor})
+
+        return items
+
+
+class LoadMorePagination:
+    """
+    Listings that append items when a "load more" button is clicked.
+
+    Attributes:
+    - button: Locator tuple of the load more button, e.g. `(By.CSS_SELECTOR, '.show-more')`.
+    - item_selector: CSS selector of the listing items, used to detect when new items arrived.
+    - max_clicks: Upper bound on the number of clicks.
+    - timeout: Seconds to wait for new items after each click.
+    """
+
+    def __init__(self, button, item_selector, max_clicks=200, timeout=10):
+        self.button = button
+        self.item_selector = item_selector
+        self.max_clicks = max_clicks
+        self.timeout = timeout
+
+    def load(self, driver):
+        """
+        Clicks the button until it disappears or stops adding items, returns the number
+        of clicks.
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
+        count = lambda driver: len(driver.find_elements(By.CSS_SELECTOR, self.item_selector))
+
+        for clicks in range(self.max_clicks):
+            buttons = driver.find_elements(*self.button)
+            if not buttons or not buttons[0].is_displayed():
+                return clicks
+
+            loaded = count(driver)
+            try:
+                driver.execute_script("arguments[0].click();", buttons[0])
+                WebDriverWait(driver, self.timeout).until(lambda driver: count(driver) > loaded)
+            except (TimeoutException, WebDriverException):
+                return clicks + 1
+
+        return self.max_clicks
+
+
+class InfiniteScrollPagination:
+    """
+    Listings that append items when the page is scrolled to the bottom.
+
+    Attributes:
+    - max_scrolls: Upper bound on the number of scrolls.
+    - timeout: Seconds to wait for the page to grow after each scroll.
+    """
+
+    def __init__(self, max_scrolls=200, timeout=10):
+        self.max_scrolls = max_scrolls
+        self.timeout = timeout
+
+    def load(self, driver):
+        """
+        Scrolls to the bottom until the page height stops growing, returns the number of
+        scrolls.
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
+        height = lambda driver: driver.execute_script("return document.body.scrollHeight")
+
+        for scrolls in range(self.max_scrolls):
+            last_height = height(driver)
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            try:
+                WebDriverWait(driver, self.timeout).until(lambda driver: height(driver) > last_height)
+            except TimeoutException:
+                return scrolls + 1
+
+        return self.max_scrolls
@@ -0,0 +1,166 @@
+import queue
+import threading
+import time
+
+from .ids import assign_ids
+from .interning import intern_fields
+
+# Tells a stage worker that its input is exhausted
+DONE = object()
+
+
+class Pipeline:
+    """
+    Scrapes the products and the variants of a supplier's schools concurrently: schools
+    feed the product stage, whose products feed the variant stage as soon as they are
+    listed, through bounded queues.
+
+    Every stage has its own number of workers, each with its own browser (logged in with
+    the supplier's setup), so the wall time approaches the time of the slowest stage
+    rather than the sum of the stages, and the first variants come in within seconds.
+    The bounded queues hold the product stage back when the variant stage can't keep up.
+
+    Attributes:
+    - scraper: The `Scraper` whose stages are run.
+    - supplier: The supplier to scrape.
+    - product_workers: The number of browsers listing products.
+    - variant_workers: The number of browsers scraping variants, 0 to stop at products.
+    - queue_size: The number of items waiting between two stages.
+    - driver_factory: Function returning a new driver for a worker, called with the name
+      of the worker. Defaults to a browser started like the scraper's, from its
+      `driver_factory` and with its settings and profile.
+    - tabs: The number of pages loaded at once by each worker, see `Scraper.scrape`.
+    - validator: Optional `Validator` the products and variants are checked with as they
+      are scraped. The variants of invalid products aren't scraped.
+    - stage_seconds: Dict of stage to the seconds the stage ran for, from its first item
+      to its end, once run. The stages overlap, so they add up to more than the run.
+    """
+
+    def __init__(self, scraper, supplier, product_workers=2, variant_workers=2, queue_size=100, driver_factory=None,
+                 tabs=1, validator=None):
+        self.scraper = scraper
+        self.supplier = supplier
+        self.product_workers = product_workers
+        self.variant_workers = variant_workers
+        self.queue_size = queue_size
+        self.driver_factory = driver_factory or self._worker_driver
+        self.tabs = tabs
+        self.validator = validator
+
+        self.products = []
+        self.variants = []
+        self.first_variant_after = None
+        self.stage_seconds = {}
+
+        self._lock = threading.Lock()
+        self._errors = []
+        self._alive = {"products": product_workers, "variants": variant_workers}
+
+    def _worker_driver(self, name):
+        return self.scraper._worker_driver(f"{self.supplier}-{name}")
+
+    def _worker(self, name, depth, inbox, handle):
+        driver = None
+        try:
+            driver = self.driver_factory(name)
+            self.scraper._setup(driver, self.supplier)
+
+            items = iter(inbox.get, DONE)
+            for item, records in self.scraper._scrape_items(driver, self.supplier, depth, items, self.tabs):
+                handle(item, records)
+        except Exception as e:
+            print(f"Pipeline worker {name} failed: {e}")
+            with self._lock:
+                self._errors.append((depth, e))
+                self._alive[depth] -= 1
+                last = self._alive[depth] == 0
+
+            # The other workers of the stage take over its items, unless there are none left:
+            # then drain the queue, so that the stage feeding this one never blocks on it
+            if last:
+                for _ in iter(inbox.get, DONE):
+                    pass
+        finally:
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+    def _start(self, depth, count, inbox, handle):
+        threads = [
+            threading.Thread(target=self._worker, args=(f"{depth}-{i}", depth, inbox, handle), daemon=True)
+            for i in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def run(self, schools):
+        """
+        Scrapes the products (and variants) of the schools, returns `(products, variants)`.
+        Raises if every worker of a stage failed.
+
+        Args:
+        - schools: The schools of the supplier, with their ids assigned.
+        """
+        started = time.time()
+        school_queue = queue.Queue(self.queue_size)
+        product_queue = queue.Queue(self.queue_size)
+        queued = set()
+        texts = {}
+        variants_started = []
+
+        def handle_products(school, products):
+            assign_ids(self.supplier, products, school)
+            with self._lock:
+                if self.validator is not None:
+                    products = self.validator.check_records(products, "products")
+                self.products += products
+                # Products sold to several schools have the same id, their variants are scraped once
+                new = [product for product in products if product.id not in queued]
+                queued.update(product.id for product in new)
+                if new and not variants_started:
+                    variants_started.append(time.time())
+
+            if self.variant_workers:
+                for product in new:
+                    product_queue.put(product)
+
+        def handle_variants(product, variants):
+            assign_ids(self.supplier, variants, product)
+            with self._lock:
+                if self.validator is not None:
+                    variants = self.validator.check_records(variants, "variants")
+                intern_fields(variants, texts)
+                if variants and self.first_variant_after is None:
+                    self.first_variant_after = time.time() - started
+                self.variants += variants
+
+        product_threads = self._start("products", self.product_workers, school_queue, handle_products)
+        variant_threads = self._start("variants", self.variant_workers, product_queue, handle_variants)
+
+        for school in schools:
+            school_queue.put(school)
+        for _ in product_threads:
+            school_queue.put(DONE)
+
+        for thread in product_threads:
+            thread.join()
+        self.stage_seconds["products"] = time.time() - started
+        for _ in variant_threads:
+            product_queue.put(DONE)
+        for thread in variant_threads:
+            thread.join()
+        # The variant stage starts with the first product listed, not with the run
+        self.stage_seconds["variants"] = time.time() - (variants_started[0] if variants_started else time.time())
+
+        for depth, count in [("products", self.product_workers), ("variants", self.variant_workers)]:
+            errors = [e for error_depth, e in self._errors if error_depth == depth]
+            if count and len(errors) == count:
+                raise RuntimeError(f"Every {depth} worker of the pipeline failed, the first with: {errors[0]}")
+
+        first = "" if self.first_variant_after is None else f", first variant after {self.first_variant_after:.1f}s"
+        print(f"Pipeline scraped {len(self.products)} products and {len(self.variants)} variants in {time.time() - started:.1f}s{first}.")
+
+        return self.products, self.variants
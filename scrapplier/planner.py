@@ -0,0 +1,301 @@
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from .records import DEPTHS
+
+RUN_COLUMNS = [
+    "run", "depth", "discovered", "schools", "products", "unique_products", "variants", "product_workers",
+    "variant_workers", "tabs", "schools_seconds", "products_seconds", "variants_seconds", "seconds",
+]
+
+# Costs assumed for suppliers without a recorded run: seconds of the school list, browser
+# seconds per school (all its listing pages) and per product page, products per school
+# and variants per product
+DEFAULT_METRICS = {
+    "schools": 200,
+    "schools_seconds": 30.0,
+    "seconds_per_school": 8.0,
+    "seconds_per_product": 4.0,
+    "products_per_school": 25.0,
+    "variants_per_product": 8.0,
+}
+
+# Shares of the schools offered to the planner, from all of them to a tenth
+SAMPLES = (1.0, 0.5, 0.25, 0.1)
+
+
+def record_run(supplier, run, output_dir="."):
+    """
+    Appends the metrics of a crawl to `<supplier>_runs.csv`, which the planner estimates
+    the next crawls from.
+
+    Args:
+    - supplier: The supplier that was scraped.
+    - run: Dict of the metrics of the crawl, see `RUN_COLUMNS`.
+    - output_dir: The directory of the runs file.
+    """
+    path = os.path.join(output_dir, f"{supplier}_runs.csv")
+    row = pd.DataFrame([{column: run.get(column) for column in RUN_COLUMNS}])
+    row.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+
+class CrawlPlanner:
+    """
+    Estimates the pages and the wall time of crawls from the metrics of past crawls, and
+    picks the depth, the share of schools and the number of browsers of each supplier that
+    cover the most within a deadline.
+
+    The cost of a crawl is the time of its school list, plus the browser time of its
+    schools (all their listing pages) and of its product pages, measured in past runs
+    and divided by the speedup of the browsers working at once. Every browser (or tab)
+    after the first adds `efficiency` of a browser, as they share the machine and the
+    network. With several browsers, a crawl down to variants runs as a pipeline, its
+    browsers split between the stages in proportion to their work.
+
+    The coverage of a crawl is the mean, over the supplier's depths, of the share of the
+    schools scraped at each depth. Every crawl loads the whole school list, so the school
+    depth counts in full and a sample only lowers the deeper ones: a tenth of the schools
+    down to products covers more than the school list alone. Suppliers are crawled one after
+    another: the plan keeps taking the upgrade (the fastest crawl of a higher coverage)
+    adding the most coverage per second that still fits, then gives every crawl the
+    fewest browsers the time left allows.
+
+    Attributes:
+    - input_dir: The directory of the `<supplier>_runs.csv` files.
+    - efficiency: The share of a browser every additional browser adds.
+    - window: The number of recent runs the metrics are taken from.
+    """
+
+    def __init__(self, input_dir=".", efficiency=0.8, window=5):
+        self.input_dir = input_dir
+        self.efficiency = efficiency
+        self.window = window
+
+    def speedup(self, concurrency):
+        """
+        Returns how many times faster `concurrency` browsers (or tabs) are than one.
+
+        Args:
+        - concurrency: The number of pages loaded at once.
+        """
+        return 1 + self.efficiency * (max(concurrency, 1) - 1)
+
+    def runs(self, supplier):
+        """
+        Returns the recorded runs of a supplier, oldest first.
+
+        Args:
+        - supplier: The supplier.
+        """
+        path = os.path.join(self.input_dir, f"{supplier}_runs.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=RUN_COLUMNS)
+        return pd.read_csv(path)
+
+    def metrics(self, supplier):
+        """
+        Returns the metrics of a supplier (see `DEFAULT_METRICS`), the medians of its recent
+        runs, or the defaults for the metrics no run measured.
+
+        Args:
+        - supplier: The supplier.
+        """
+        runs = self.runs(supplier).tail(self.window)
+        metrics = dict(DEFAULT_METRICS)
+        if runs.empty:
+            return metrics
+
+        tabs = runs["tabs"].fillna(1)
+        product_speedup = (runs["product_workers"].fillna(1) * tabs).map(self.speedup)
+        variant_speedup = (runs["variant_workers"].fillna(1) * tabs).map(self.speedup)
+
+        measured = {
+            "schools": runs["discovered"].dropna().tail(1),
+            "schools_seconds": runs["schools_seconds"],
+            "seconds_per_school": runs["products_seconds"] * product_speedup / runs["schools"],
+            "seconds_per_product": runs["variants_seconds"] * variant_speedup / runs["unique_products"],
+            "products_per_school": runs["unique_products"] / runs["schools"],
+            "variants_per_product": runs["variants"] / runs["unique_products"],
+        }
+
+        for name, values in measured.items():
+            value = pd.Series(values, dtype=float).replace([float("inf"), -float("inf")], float("nan")).median()
+            if pd.notna(value) and value > 0:
+                metrics[name] = float(value)
+
+        return metrics
+
+    def estimate(self, supplier, depth="variants", sample=None, browsers=1, tabs=1, deepest="variants", schools=None):
+        """
+        Returns the estimate of one crawl: its schools, pages, rows and browsers per stage,
+        its wall time in seconds and its coverage.
+
+        Args:
+        - supplier: The supplier.
+        - depth: The depth of the crawl.
+        - sample: The number of schools scraped, all of them if None.
+        - browsers: The number of browsers, split between the stages as a pipeline if more than one.
+        - tabs: The number of tabs per browser.
+        - deepest: The deepest depth the supplier can be scraped at.
+        - schools: The number of schools of the supplier, defaults to the last run's.
+        """
+        if depth not in DEPTHS:
+            raise ValueError("Invalid depth.")
+
+        metrics = self.metrics(supplier)
+        levels = DEPTHS[:DEPTHS.index(deepest) + 1]
+        depth = depth if depth in levels else deepest
+
+        total = int(schools if schools is not None else metrics["schools"])
+        scraped = total if sample is None else min(sample, total)
+
+        products = scraped * metrics["products_per_school"] if depth != "schools" else 0
+        variants = products * metrics["variants_per_product"] if depth == "variants" else 0
+
+        product_work = scraped * metrics["seconds_per_school"] if depth != "schools" else 0.0
+        variant_work = products * metrics["seconds_per_product"] if depth == "variants" else 0.0
+
+        workers = None
+        if depth == "schools":
+            stages = 0.0
+        elif browsers <= 1:
+            stages = (product_work + variant_work) / self.speedup(tabs)
+        elif depth == "products":
+            workers = {"products": browsers}
+            stages = product_work / self.speedup(browsers * tabs)
+        else:
+            product_browsers = min(max(1, round(browsers * product_work / (product_work + variant_work or 1))), browsers - 1)
+            workers = {"products": product_browsers, "variants": browsers - product_browsers}
+            stages = max(
+                product_work / self.speedup(product_browsers * tabs),
+                variant_work / self.speedup(workers["variants"] * tabs),
+            )
+
+        return {
+            "supplier": supplier,
+            "depth": depth,
+            "sample": None if scraped == total else scraped,
+            "schools": scraped,
+            "pages": 1 + scraped * (depth != "schools") + round(products) * (depth == "variants"),
+            "products": round(products),
+            "variants": round(variants),
+            "browsers": browsers,
+            "workers": workers,
+            "tabs": tabs,
+            "seconds": metrics["schools_seconds"] + stages,
+            "coverage": round((1 + (scraped / total if total else 0.0) * levels.index(depth)) / len(levels), 6),
+        }
+
+    def options(self, supplier, max_browsers=4, tabs=1, deepest="variants", schools=None, samples=SAMPLES):
+        """
+        Returns the estimates of every crawl of a supplier the planner chooses from.
+
+        Args:
+        - supplier: The supplier.
+        - max_browsers: The largest number of browsers of a crawl.
+        - tabs: The number of tabs per browser.
+        - deepest: The deepest depth the supplier can be scraped at.
+        - schools: The number of schools of the supplier, defaults to the last run's.
+        - samples: The shares of the schools to choose from.
+        """
+        total = int(schools if schools is not None else self.metrics(supplier)["schools"])
+        estimates = []
+
+        for depth in DEPTHS[:DEPTHS.index(deepest) + 1]:
+            for share in samples:
+                sample = None if share >= 1 else max(1, round(total * share))
+                for browsers in range(1, max_browsers + 1):
+                    estimates.append(self.estimate(supplier, depth, sample, browsers, tabs, deepest, total))
+
+        return pd.DataFrame(estimates).drop_duplicates(["depth", "schools", "browsers"]).reset_index(drop=True)
+
+    def plan(self, suppliers, deadline, max_browsers=4, tabs=1, deepest=None, schools=None):
+        """
+        Returns the crawl of every supplier that fits the deadline, one row per supplier
+        (suppliers nothing fits for are left out), and prints the total.
+
+        Args:
+        - suppliers: The suppliers to crawl, one after another.
+        - deadline: The time the crawls have to be done by (a datetime), or their budget in seconds.
+        - max_browsers: The largest number of browsers of a crawl.
+        - tabs: The number of tabs per browser.
+        - deepest: Optional dict of supplier to the deepest depth it can be scraped at.
+        - schools: Optional dict of supplier to its current number of schools.
+        """
+        if isinstance(deadline, (int, float)):
+            budget = float(deadline)
+        else:
+            deadline = pd.Timestamp(deadline)
+            if deadline.tzinfo is None:
+                deadline = deadline.tz_localize(datetime.now().astimezone().tzinfo)
+            budget = (deadline - pd.Timestamp(datetime.now(timezone.utc))).total_seconds()
+
+        if budget <= 0:
+            raise ValueError("The deadline has already passed.")
+
+        deepest = deepest or {}
+        schools = schools or {}
+        options = {
+            supplier: self.options(supplier, max_browsers, tabs, deepest.get(supplier, "variants"), schools.get(supplier))
+            for supplier in suppliers
+        }
+        # The fastest crawl of every coverage
+        fastest = {
+            supplier: estimates.sort_values(["seconds", "browsers"]).drop_duplicates("coverage")
+            for supplier, estimates in options.items()
+        }
+
+        chosen = {supplier: None for supplier in suppliers}
+        used = 0.0
+
+        while True:
+            best = None
+            for supplier, estimates in fastest.items():
+                current = chosen[supplier]
+                seconds = 0.0 if current is None else current["seconds"]
+                coverage = 0.0 if current is None else current["coverage"]
+
+                upgrades = estimates[
+                    (estimates["coverage"] > coverage) & (estimates["seconds"] - seconds <= budget - used)
+                ]
+                for _, upgrade in upgrades.iterrows():
+                    # Upgrades that save time are taken first, then by coverage per second
+                    extra = upgrade["seconds"] - seconds
+                    rate = float("inf") if extra <= 0 else (upgrade["coverage"] - coverage) / extra
+                    if best is None or rate > best[0] or (rate == best[0] and extra < best[3]):
+                        best = (rate, supplier, upgrade, extra)
+
+            if best is None:
+                break
+
+            _, supplier, upgrade, extra = best
+            chosen[supplier] = upgrade
+            used += extra
+
+        # Browsers the plan doesn't need are given back, as long as it still fits
+        for supplier, current in chosen.items():
+            if current is None:
+                continue
+            estimates = options[supplier]
+            same = estimates[
+                (estimates["depth"] == current["depth"]) & (estimates["schools"] == current["schools"])
+                & (estimates["seconds"] - current["seconds"] <= budget - used)
+            ].sort_values("browsers")
+            fewer = same.iloc[0]
+            used += fewer["seconds"] - current["seconds"]
+            chosen[supplier] = fewer
+
+        plan = pd.DataFrame([estimate for estimate in chosen.values() if estimate is not None])
+        if plan.empty:
+            print(f"Nothing fits in {budget / 3600:.1f} hours.")
+            return plan
+
+        plan = plan.reset_index(drop=True)
+        for column in ["schools", "pages", "products", "variants", "browsers", "tabs"]:
+            plan[column] = plan[column].astype(int)
+        # Passed on to `scrape` as is: None for the crawls of all the schools
+        plan["sample"] = pd.Series([None if pd.isna(sample) else int(sample) for sample in plan["sample"]], dtype=object)
+        print(f"Planned {len(plan)} of {len(suppliers)} suppliers in {plan['seconds'].sum() / 3600:.1f} of {budget / 3600:.1f} hours.")
+        return plan
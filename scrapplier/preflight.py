@@ -0,0 +1,152 @@
+import random
+
+import pandas as pd
+from selenium.common.exceptions import NoSuchElementException
+
+from .commands import CommandProxy
+from .records import RECORD_TYPES, REQUIRED_FIELDS
+
+# The commands whose lookups are recorded, on the driver or on an element
+LOOKUPS = {"find_element", "find_elements", "element.find_element", "element.find_elements"}
+
+
+class RecordingDriver(CommandProxy):
+    """
+    Wraps a driver and records every element lookup made through it, with the scraper
+    method that made it and the number of elements it matched.
+
+    Attributes:
+    - driver: The Selenium WebDriver instance.
+    - lookups: List of (caller, by, selector, matches) tuples.
+    """
+
+    def __init__(self, driver):
+        super().__init__(driver, self._observe)
+        self.driver = driver
+        self.lookups = []
+
+    def _observe(self, command, args, started, latency, result, error, stack, caller):
+        if command not in LOOKUPS or (error is not None and not isinstance(error, NoSuchElementException)):
+            return
+
+        by, value = (list(args) + [None, None])[:2]
+        if error is not None:
+            matches = 0
+        else:
+            matches = len(result) if command.endswith("find_elements") else 1
+
+        method, line = caller
+        self.lookups.append((None if method is None else f"{method}:{line}", by, value, matches))
+
+
+class PreflightReport:
+    """
+    Result of a pre-flight check of a supplier.
+
+    Attributes:
+    - supplier: The supplier that was checked.
+    - selectors: DataFrame with one row per selector and scraper method: the number of
+      lookups, how many matched nothing, and the largest number of elements matched.
+    - fields: DataFrame with one row per depth and field: the number of sampled rows and
+      how many of them are null.
+    - counts: The number of rows scraped per depth.
+    - errors: The errors raised while scraping the sample.
+    """
+
+    def __init__(self, supplier, lookups, records, errors):
+        self.supplier = supplier
+        self.errors = errors
+        self.counts = {depth: len(rows) for depth, rows in records.items()}
+
+        selectors = pd.DataFrame(lookups, columns=["caller", "by", "selector", "matches"])
+        self.selectors = (
+            selectors.assign(empty=selectors["matches"] == 0)
+            .groupby(["caller", "by", "selector"], as_index=False, dropna=False)
+            .agg(lookups=("matches", "size"), empty=("empty", "sum"), max_matches=("matches", "max"))
+        )
+
+        fields = []
+        for depth, rows in records.items():
+            for field in RECORD_TYPES[depth].__slots__:
+                nulls = sum(getattr(row, field) in (None, "") for row in rows)
+                fields.append((depth, field, len(rows), nulls, field in REQUIRED_FIELDS[depth]))
+        self.fields = pd.DataFrame(fields, columns=["depth", "field", "rows", "nulls", "required"])
+
+    @property
+    def unmatched(self):
+        """
+        The selectors that never matched anything. Some are expected to (e.g. a "load more"
+        button once everything is loaded), but a redesign usually shows up here first.
+        """
+        return self.selectors[self.selectors["max_matches"] == 0]
+
+    @property
+    def problems(self):
+        """
+        The reasons the supplier's extractors look broken.
+        """
+        problems = [f"{depth}: no rows scraped" for depth, count in self.counts.items() if count == 0]
+
+        missing = self.fields[self.fields["required"] & (self.fields["rows"] > 0) & (self.fields["nulls"] > 0)]
+        for row in missing.itertuples():
+            problems.append(f"{row.depth}: {row.field} is null in {row.nulls} of {row.rows} rows")
+
+        problems += [f"error: {error}" for error in self.errors]
+        return problems
+
+    @property
+    def ok(self):
+        return not self.problems
+
+    def __str__(self):
+        lines = [f"Pre-flight check of {self.supplier}: {'OK' if self.ok else 'FAILED'}"]
+        lines += [f"- {depth}: {count} rows" for depth, count in self.counts.items()]
+        lines += [f"- {problem}" for problem in self.problems]
+
+        for row in self.unmatched.itertuples():
+            lines.append(f"- selector {row.selector!r} in {row.caller} matched nothing")
+
+        return "\n".join(lines)
+
+
+def run_preflight(scraper, supplier, sample=2, depth="schools", seed=None):
+    """
+    Scrapes a small random sample of a supplier's schools and products, and checks that
+    every depth returns rows with their required fields filled in.
+
+    Args:
+    - scraper: The `Scraper` to check.
+    - supplier: The supplier to check.
+    - sample: The number of schools (and of products) to scrape.
+    - depth: The deepest depth to check.
+    - seed: Seed of the random sample, for reproducible checks.
+    """
+    driver = RecordingDriver(scraper.driver)
+    rng = random.Random(seed)
+    records = {}
+    errors = []
+
+    try:
+        scraper._setup(driver, supplier)
+        records["schools"] = scraper._stage(supplier, "schools")(driver)
+    except Exception as e:
+        errors.append(f"schools: {e}")
+        records["schools"] = []
+
+    parents = records["schools"]
+
+    for child_depth in ["products", "variants"]:
+        stage = scraper._stage(supplier, child_depth)
+        if stage is None or depth == "schools" or (depth == "products" and child_depth == "variants"):
+            break
+
+        records[child_depth] = []
+        for parent in rng.sample(parents, min(sample, len(parents))):
+            try:
+                records[child_depth] += stage(driver, parent)
+            except Exception as e:
+                errors.append(f"{child_depth} of {getattr(parent, 'store_page', None) or parent.url}: {e}")
+
+        parents = records[child_depth]
+
+    return PreflightReport(supplier, driver.lookups, records, errors)
@@ -0,0 +1,129 @@
+import json
+import threading
+
+import pandas as pd
+
+from .commands import CommandProxy, is_element
+
+# Size of an element reference in a WebDriver response, e.g. {"element-6066-...": "<uuid>"}
+ELEMENT_REFERENCE_BYTES = 90
+
+
+def _payload(value):
+    """
+    Returns the size of a command's result in bytes, as it would be sent by the browser.
+    """
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, bytes):
+        return len(value)
+    if is_element(value):
+        return ELEMENT_REFERENCE_BYTES
+    if isinstance(value, (list, tuple)):
+        return sum(_payload(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_payload(key) + _payload(item) for key, item in value.items())
+    return len(json.dumps(value, default=str))
+
+
+class ProfilingDriver(CommandProxy):
+    """
+    Wraps a driver and records every command made through it and through the elements
+    it returned: the scraper method and line that made it, its latency and the size of
+    its result. Opt-in, see the `profile` argument of `Scraper`.
+
+    Most of the time of a crawl goes into many small commands (a `find_element` per
+    field of every product card, a `get_attribute` per option...), which the report ranks
+    by the time they took. A line issuing many commands per page is an N+1 pattern,
+    worth replacing by a single lookup or script.
+
+    Attributes:
+    - driver: The Selenium WebDriver instance.
+    """
+
+    def __init__(self, driver):
+        super().__init__(driver, self._add)
+        self.driver = driver
+
+        self._lock = threading.Lock()
+        self._commands = []
+        self._page = 0
+
+    def _add(self, command, args, started, latency, result, error, stack, caller):
+        method, line = caller
+        payload = _payload(result)
+        with self._lock:
+            if command == "get":
+                self._page += 1
+            self._commands.append((command, method, line, stack, latency, started, self._page, payload))
+
+    def attach(self, driver):
+        """
+        Returns a wrapper of another driver whose commands are recorded along with this
+        driver's, e.g. for the browsers of the pipeline workers.
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
+        return CommandProxy(driver, self._add)
+
+    def commands(self):
+        """
+        Returns the recorded commands, one row per command.
+        """
+        with self._lock:
+            return pd.DataFrame(
+                self._commands,
+                columns=["command", "method", "line", "stack", "latency", "started", "page", "payload"],
+            )
+
+    def report(self, by=("method", "line", "command")):
+        """
+        Returns the commands grouped by the line that issued them, ranked by the time they
+        took: the number of calls, their total and mean latency, the bytes they returned,
+        the pages they were made on and the calls per page (N+1 patterns stand out there).
+
+        Args:
+        - by: The columns to group the commands by.
+        """
+        commands = self.commands()
+        total = commands["latency"].sum()
+
+        report = commands.groupby(list(by), dropna=False).agg(
+            calls=("latency", "size"),
+            seconds=("latency", "sum"),
+            mean_ms=("latency", "mean"),
+            payload=("payload", "sum"),
+            pages=("page", "nunique"),
+        )
+        report["mean_ms"] *= 1000
+        report["share"] = report["seconds"] / total if total else 0.0
+        report["calls_per_page"] = report["calls"] / report["pages"]
+
+        return report.sort_values("seconds", ascending=False).reset_index()
+
+    def write_folded(self, path):
+        """
+        Writes the commands as folded stacks, one line per distinct stack with its time in
+        microseconds, e.g. for `flamegraph.pl` or speedscope.
+
+        Args:
+        - path: The file to write.
+        """
+        commands = self.commands()
+        stacks = commands["stack"] + ";" + commands["command"]
+        micros = (commands["latency"] * 1e6).groupby(stacks).sum().round().astype(int)
+
+        with open(path, "w") as f:
+            for stack, value in micros.items():
+                f.write(f"{stack} {value}\n")
+
+    def reset(self):
+        """
+        Forgets the recorded commands, e.g. to compare two runs.
+        """
+        with self._lock:
+            self._commands = []
+            self._page = 0
@@ -0,0 +1,115 @@
+import pandas as pd
+
+
+class Record:
+    """
+    Base class of the rows scraped from the supplier websites.
+
+    Records use `__slots__` rather than a `__dict__`, so a row costs a fixed handful of
+    pointers instead of a hash table, and every supplier fills the same columns. Fields
+    that aren't scraped for a supplier are left as None.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.pop(name, None))
+
+        if fields:
+            raise TypeError(f"Unknown {type(self).__name__} fields: {', '.join(fields)}")
+
+    def to_dict(self):
+        """
+        Returns the record as a dict, e.g. to serialise it to JSON.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class School(Record):
+    """
+    A school listed on a supplier website.
+
+    Attributes:
+    - schoolsupplier_id: The id of the school on this supplier.
+    - name: The name of the school as shown by the supplier.
+    - store_page: The URL of the school's page on the supplier website.
+    - urn: The Unique Reference Number of the school, when the supplier shows it.
+    """
+
+    __slots__ = ("schoolsupplier_id", "name", "store_page", "urn")
+
+
+class Product(Record):
+    """
+    A product sold for a school.
+
+    Attributes:
+    - id: The id of the product.
+    - schoolsupplier_id: The id of the school the product is sold for.
+    - name: The name of the product.
+    - url: The URL of the product page.
+    - price: The price shown on the listing page.
+    - image: The URL of the product image.
+    - label: The label shown on the product card (e.g. "Optional"), if any.
+    """
+
+    __slots__ = ("id", "schoolsupplier_id", "name", "url", "price", "image", "label")
+
+
+class Variant(Record):
+    """
+    A variant (size) of a product.
+
+    Attributes:
+    - id: The id of the variant.
+    - product_id: The id of the product.
+    - size: The size of the variant.
+    - option: The value of the option the variant was picked with on the product page,
+      which tells apart the variants of the same size, e.g. in different colours.
+    - price: The price of the variant.
+    - description: The description of the product.
+    - description_icon_alts: Tuple of the alt texts of the description icons.
+    - colors: Tuple of the colours the product is available in.
+    """
+
+    __slots__ = ("id", "product_id", "size", "option", "price", "description", "description_icon_alts", "colors")
+
+
+DEPTHS = ["schools", "products", "variants"]
+
+RECORD_TYPES = {
+    "schools": School,
+    "products": Product,
+    "variants": Variant,
+}
+
+# The fields every scraped row of a depth must have
+REQUIRED_FIELDS = {
+    "schools": ["name", "store_page"],
+    "products": ["name", "url", "price"],
+    "variants": ["size", "price"],
+}
+
+
+def to_frame(records, record_type):
+    """
+    Builds a DataFrame from records, one column at a time.
+
+    Args:
+    - records: The records to convert.
+    - record_type: The class of the records, gives the columns even when there are no records.
+    """
+    return pd.DataFrame({
+        name: [getattr(record, name) for record in records]
+        for name in record_type.__slots__
+    })
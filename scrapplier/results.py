@@ -0,0 +1,79 @@
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from .records import DEPTHS
+
+# Variant columns holding the same text for every size of a product, dictionary encoded in Arrow
+DICTIONARY_COLUMNS = ["description"]
+
+
+def _is_text(data_type):
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+
+class ScrapeResult:
+    """
+    The tables of a crawl, as returned by `Scraper.scrape`, so callers use the rows
+    without reading the CSV files back. The frames are the ones the CSV files are
+    written from (when they are), holding the rows that passed the validator.
+
+    Attributes:
+    - supplier: The supplier that was scraped.
+    - depth: The depth the crawl went down to, which can be less than the requested one
+      for suppliers without a products or variants stage.
+    - complete: Whether the crawl covered all the schools of the supplier.
+    - schools: DataFrame of the schools.
+    - products: DataFrame of the products, None if the crawl stopped at schools.
+    - variants: DataFrame of the variants, None if the crawl stopped at products.
+    - quality: DataFrame of the quality stats of the run (see `Validator.summary`), None
+      if the rows weren't validated.
+    - quarantine: DataFrame of the rows that failed the validator, None if the rows
+      weren't validated.
+    - run: Dict of the metrics of the run, see `RUN_COLUMNS`.
+    - output_dir: The directory the CSV files were written to, None if they weren't.
+    """
+
+    def __init__(self, supplier, depth, frames, complete=True, quality=None, quarantine=None, run=None, output_dir=None):
+        self.supplier = supplier
+        self.depth = depth
+        self.complete = complete
+        self.schools = frames.get("schools")
+        self.products = frames.get("products")
+        self.variants = frames.get("variants")
+        self.quality = quality
+        self.quarantine = quarantine
+        self.run = run or {}
+        self.output_dir = output_dir
+
+    def tables(self):
+        """
+        Returns a dict of depth to the DataFrame of its rows, for the depths scraped.
+        """
+        tables = {depth: getattr(self, depth) for depth in DEPTHS}
+        return {depth: frame for depth, frame in tables.items() if frame is not None}
+
+    def to_arrow(self):
+        """
+        Returns a dict of depth to an Arrow table of its rows, for the depths scraped, e.g.
+        to hand them to DuckDB or Polars. The descriptions repeated by the variants of a
+        product are dictionary encoded. Needs pyarrow.
+        """
+        if pa is None:
+            raise ImportError("pyarrow is needed to convert the results to Arrow tables.")
+
+        tables = {}
+        for depth, frame in self.tables().items():
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            for column in DICTIONARY_COLUMNS:
+                if column in table.column_names and _is_text(table.schema.field(column).type):
+                    index = table.column_names.index(column)
+                    table = table.set_column(index, column, table.column(column).dictionary_encode())
+            tables[depth] = table
+
+        return tables
+
+    def __repr__(self):
+        counts = ", ".join(f"{len(frame)} {depth}" for depth, frame in self.tables().items())
+        return f"ScrapeResult({self.supplier}: {counts})"
@@ -0,0 +1,144 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from .ids import canonical_url
+
+
+class RevisitScheduler:
+    """
+    Chooses the pages to crawl again under a page budget, from how often their prices
+    changed in past crawls.
+
+    Every product page is modelled as changing at random with its own rate (a Poisson
+    process), estimated from the changes recorded in the `PriceHistory` over the time
+    the page has been crawled. The estimate is smoothed towards `prior_changes` changes
+    per `prior_days`, so pages seen once or never changing aren't written off. The
+    priority of a page is the probability that it changed since it was last crawled,
+    `1 - exp(-rate * days since last crawl)`, and a plan is the pages of highest priority:
+    the crawl that finds the most changes for its budget.
+
+    Suppliers scraped down to variants are revisited product page by product page.
+    Suppliers scraped down to products are revisited school page by school page, a
+    school page changing whenever one of its products does.
+
+    Attributes:
+    - history: The `PriceHistory` of past crawls.
+    - input_dir: The directory of the scraped CSV files, to find the school of the
+      products of suppliers scraped down to products.
+    - prior_changes: The number of changes of the prior.
+    - prior_days: The number of days of the prior.
+    """
+
+    def __init__(self, history, input_dir=".", prior_changes=0.5, prior_days=90):
+        self.history = history
+        self.input_dir = input_dir
+        self.prior_changes = prior_changes
+        self.prior_days = prior_days
+
+    def rates(self, suppliers=None, now=None):
+        """
+        Returns the estimated change rate (per day) and the revisit priority of every
+        product page in the history, with the URL it was last crawled at.
+
+        Args:
+        - suppliers: Only return the pages of these suppliers.
+        - now: The time of the planned crawl, defaults to now.
+        """
+        where = ""
+        params = []
+        if suppliers is not None:
+            where = f"WHERE h.supplier IN ({', '.join('?' * len(suppliers))})"
+            params = list(suppliers)
+
+        pages = pd.read_sql_query(
+            f"""
+            SELECT
+                h.supplier,
+                h.product_key,
+                MAX(h.variant_key <> '') AS has_variants,
+                MIN(h.valid_from) AS first_seen,
+                MAX(h.valid_from) AS last_change,
+                COUNT(DISTINCT h.valid_from) - 1 AS changes,
+                s.seen_at,
+                s.url
+            FROM price_history h
+            LEFT JOIN last_seen s ON s.supplier = h.supplier AND s.product_key = h.product_key
+            {where}
+            GROUP BY h.supplier, h.product_key
+            """,
+            self.history.connection,
+            params=params,
+        )
+
+        now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+        if now.tzinfo is None:
+            now = now.tz_localize("UTC")
+
+        first_seen = pd.to_datetime(pages["first_seen"], utc=True)
+        seen_at = pd.to_datetime(pages["seen_at"].fillna(pages["last_change"]), utc=True)
+
+        exposure = (seen_at - first_seen).dt.total_seconds() / 86400
+        pages["days_since_seen"] = ((now - seen_at).dt.total_seconds() / 86400).clip(lower=0)
+        pages["rate"] = (pages["changes"] + self.prior_changes) / (exposure + self.prior_days)
+        pages["priority"] = 1 - np.exp(-pages["rate"] * pages["days_since_seen"])
+
+        return pages
+
+    def _school_pages(self, supplier, pages):
+        products_path = os.path.join(self.input_dir, f"{supplier}_products.csv")
+        schools_path = os.path.join(self.input_dir, f"{supplier}_schools.csv")
+        if not os.path.exists(products_path) or not os.path.exists(schools_path):
+            print(f"Skipping the schools of {supplier}, its products and schools files are missing.")
+            return pd.DataFrame(columns=["url", "rate", "days_since_seen", "priority"])
+
+        products = pd.read_csv(products_path, usecols=["url", "schoolsupplier_id"])
+        schools = pd.read_csv(schools_path, usecols=["schoolsupplier_id", "store_page"])
+
+        products["product_key"] = products["url"].map(canonical_url)
+
+        pages = pages.drop(columns="url").merge(products, on="product_key").merge(schools, on="schoolsupplier_id")
+        pages["expected_changes"] = pages["rate"] * pages["days_since_seen"]
+
+        schools = pages.groupby("store_page").agg(
+            rate=("rate", "sum"),
+            days_since_seen=("days_since_seen", "min"),
+            expected_changes=("expected_changes", "sum"),
+        )
+        schools["priority"] = 1 - np.exp(-schools["expected_changes"])
+
+        return schools.drop(columns="expected_changes").reset_index().rename(columns={"store_page": "url"})
+
+    def plan(self, budget, suppliers=None, now=None):
+        """
+        Returns the pages to crawl, at most `budget` of them, by decreasing priority.
+
+        Args:
+        - budget: The number of pages the crawl can load.
+        - suppliers: Only plan the pages of these suppliers.
+        - now: The time of the planned crawl, defaults to now.
+        """
+        rates = self.rates(suppliers, now=now)
+        candidates = []
+
+        for supplier, pages in rates.groupby("supplier"):
+            if pages["has_variants"].any():
+                # The product key is a canonical URL, the page is loaded at the URL it was crawled at
+                unknown = pages["url"].isna().sum()
+                if unknown:
+                    print(f"Skipping {unknown} {supplier} pages crawled before their URLs were recorded.")
+                pages = pages.dropna(subset=["url"]).assign(depth="variants")
+            else:
+                pages = self._school_pages(supplier, pages).assign(depth="products")
+            candidates.append(pages.assign(supplier=supplier))
+
+        columns = ["supplier", "depth", "url", "rate", "days_since_seen", "priority"]
+        if not candidates:
+            return pd.DataFrame(columns=columns)
+
+        plan = pd.concat(candidates, ignore_index=True)[columns]
+        plan = plan.sort_values("priority", ascending=False, kind="stable").head(budget).reset_index(drop=True)
+
+        print(f"Planned {len(plan)} pages, expected to find {plan['priority'].sum():.1f} changed pages.")
+        return plan
@@ -1,3 +1,4 @@
+import os
 import time
 
 import pandas as pd
@@ -11,21 +12,144 @@ from selenium.webdriver.support.ui import Select
 from tqdm.notebook import tqdm
 import undetected_chromedriver as uc
 
+from .pagination import (
+    add_query_params,
+    PageNumberPagination,
+    LoadMorePagination,
+    InfiniteScrollPagination,
+)
+from .commands import unwrap
+from .egress import chrome_argument
+from .ids import assign_ids, product_id
+from .interning import intern_fields, write_variants
+from .lifecycle import ManagedDriver
+from .pipeline import Pipeline
+from .planner import CrawlPlanner, record_run
+from .preflight import run_preflight
+from .profiler import ProfilingDriver
+from .records import DEPTHS, School, Product, Variant, to_frame
+from .results import ScrapeResult
+from .selection import Selection
+from .sitemap import SITEMAPS, sitemap_schools
+from .tabs import TabPool
+from .validation import Validator
+from .variants import enumerate_variants, field
+
+SUPPLIERS = [
+    "monkhouse",
+    "blossomsschoolwear",
+    "pinderschoolwear",
+    "schoolwearmadeeasy",
+    "scotcrestschool",
+    "stevensons",
+    "alansantryschoolwear",
+    "aspireacademyglasgow",
+    "borderembroideries",
+    "directschoolwear",
+    "macgregorschoolwear",
+    "schooluniformscotland",
+    "smartschoolwear",
+    "topformschoolwear",
+    "uniformdirect",
+    "asda",
+]
+
+# Product listings walked a page at a time
+MONKHOUSE_PAGINATION = PageNumberPagination(page_param="p", extra_params={"product_list_limit": 100})
+LIMIT_PAGINATION = PageNumberPagination(page_param="page", extra_params={"limit": 100})
+
 class Scraper:
     """
     Base class for scraping data from different supplier websites.
-    
+
+    Every supplier is scraped in stages, one method per depth:
+    - `_scrape_<supplier>_schools(driver)` returns the schools of the supplier.
+    - `_scrape_<supplier>_products(driver, school)` returns the products of one school.
+    - `_scrape_<supplier>_variants(driver, product)` returns the variants of one product.
+
+    Suppliers that need a login or a cookie banner dismissed before scraping also have a
+    `_setup_<supplier>(driver)` method. Stages that don't start by loading the store page
+    of the school (or the page of the product) have a `_url_<supplier>_<depth>(item)`
+    method returning the URL they load first, which tabs preload.
+
     Attributes:
     - username: Username for logging into the supplier website.
     - password: Password for logging into the supplier website.
     - headless: Whether to run the scraper in headless mode.
+    - recycle_after: Restart the browser after this many pages.
+    - max_rss_mb: Restart the browser when it uses more memory than this (in MB).
+    - max_latency: Restart the browser when pages take longer than this to load on average (in seconds).
+    - egress: Optional `EgressPool` of proxies the browser's traffic goes through.
+    - driver: Optional driver to scrape with instead of starting Chrome, e.g. a
+      `FakeDriver` serving saved pages to test the extraction code.
+    - profile: Whether to record every command sent to the browser, the driver is then a
+      `ProfilingDriver` whose `report()` ranks the lines of the scraper by browser time.
+    - driver_factory: Function returning a new browser instead of starting Chrome, called
+      with a proxy of `egress` if given. It starts the scraper's driver (unless `driver`
+      is given) and those of the pipeline workers, e.g. a `FakeDriver` each.
     """
 
-    def __init__(self, username, password, headless=False):
+    def __init__(self, username, password, headless=False, recycle_after=None, max_rss_mb=None, max_latency=None,
+                 egress=None, driver=None, profile=False, driver_factory=None):
         self.headless = headless
         self.username = username
         self.password = password
-        self.driver = uc.Chrome(headless=self.headless, use_subprocess=False)
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.max_latency = max_latency
+        self.egress = egress
+        self.driver_factory = driver_factory or self._chrome
+
+        self.driver = driver if driver is not None else self._managed_driver()
+
+        if profile:
+            self.driver = ProfilingDriver(self.driver)
+
+        # The suppliers whose setup already ran on `self.driver`
+        self._ready = set()
+
+    def _managed_driver(self, egress_key="browser"):
+        """
+        Starts a new browser from the driver factory, restarted and recycled with the
+        settings of the scraper.
+
+        Args:
+        - egress_key: The sticky session key of the browser in the egress pool.
+        """
+        return ManagedDriver(
+            self.driver_factory,
+            max_pages=self.recycle_after,
+            max_rss_mb=self.max_rss_mb,
+            max_latency=self.max_latency,
+            egress=self.egress,
+            egress_key=egress_key,
+        )
+
+    def _worker_driver(self, name):
+        """
+        Starts the browser of a worker, e.g. of the pipeline, with the settings of the
+        scraper's. Its commands go to the scraper's profile when it is profiled.
+
+        Args:
+        - name: The name of the worker, its sticky session key in the egress pool.
+        """
+        driver = self._managed_driver(egress_key=name)
+        if isinstance(self.driver, ProfilingDriver):
+            driver = self.driver.attach(driver)
+        return driver
+
+    def _chrome(self, proxy=None):
+        """
+        Starts a new Chrome.
+
+        Args:
+        - proxy: Optional `Proxy` of the egress pool the browser's traffic goes through.
+        """
+        options = uc.ChromeOptions()
+        if proxy is not None:
+            options.add_argument(chrome_argument(proxy))
+
+        return uc.Chrome(options=options, headless=self.headless, use_subprocess=False)
 
     def _login_monkhouse(self, driver):
         """
@@ -40,181 +164,133 @@ class Scraper:
         accept_button.click()
 
         email_input = driver.find_element(By.NAME, 'login[username]')
-        email_input.send_keys(username)
+        email_input.send_keys(self.username)
         password_input = driver.find_element(By.NAME, 'login[password]')
-        password_input.send_keys(password)
+        password_input.send_keys(self.password)
         submit_button = driver.find_element(By.ID, 'send2')
         submit_button.click()
 
         print("Successfully logged into Monkhouse.")
 
-    def _scrape_monkhouse(self, driver, depth="schools"):
+    def _setup_monkhouse(self, driver):
         """
-        Scrapes data from the Monkhouse website.
+        Opens the Monkhouse login page and logs in.
 
         Args:
         - driver: The Selenium WebDriver instance.
-        - depth: The depth to scrape data at. Can be "schools", "products" or "variants".
         """
-        
         driver.get('https://www.monkhouse.com/customer/account/login/')
         time.sleep(10)
 
         self._login_monkhouse(driver)
 
+    def _scrape_monkhouse_schools(self, driver):
+        """
+        Scrapes the schools from the Monkhouse website.
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
         driver.get("https://www.monkhouse.com/school")
         elements = driver.find_elements(By.CSS_SELECTOR, '.search-results ul li a')
 
         schools = []
 
         for element in tqdm(elements):
-            school = {}
-            school["store_page"] = element.get_attribute('href')
-            school["raw_name"] = element.text
+            school = School()
+            school.store_page = element.get_attribute('href')
+            school.name = element.text
 
-            if "URN-" in school["raw_name"]:
-                school["urn"] = school["raw_name"].split("URN-")[1][:-1]
+            if "URN-" in school.name:
+                school.urn = school.name.split("URN-")[1][:-1]
             else:
-                school["urn"] = None
+                school.urn = None
             schools.append(school)
 
-        pd.DataFrame(schools).to_csv("monkhouse_schools.csv", index=False)
+        return schools
 
-        if depth == "schools":
-            print("Successfully scraped schools.")
-            return 0
+    def _url_monkhouse_products(self, school):
+        """
+        Returns the first listing page of a Monkhouse school.
 
-        product_id = 0
-        products = []
+        Args:
+        - school: The school, as returned by `_scrape_monkhouse_schools`.
+        """
+        return MONKHOUSE_PAGINATION.page_url(school.store_page, MONKHOUSE_PAGINATION.start)
 
-        for i, school in tqdm(enumerate(schools)):
-            school["schoolsupplier_id"] = i
-            driver.get(school["store_page"])
+    def _scrape_monkhouse_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Monkhouse website.
 
-            # Wait for the page to load
-            WebDriverWait(driver, 2).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '.products.list.items.product-items'))
-            )
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_monkhouse_schools`.
+        """
 
+        def extract_products(driver):
+            # Wait for the page to load
             try:
-                # Click "Load More" until all products are loaded
-                while True:
-                    try:
-                        load_more_button = driver.find_element(By.CSS_SELECTOR, '.action.show-more')
-                        load_more_button.click()
-                    except:
-                        break
-
-                main_element = driver.find_element(By.CSS_SELECTOR, '.products.list.items.product-items')
-                product_elements = main_element.find_elements(By.CSS_SELECTOR, '.item.product.product-item')
+                WebDriverWait(driver, 2).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, '.products.list.items.product-items'))
+                )
             except:
-                school["products"] = None
-                break
+                return []
+
+            main_element = driver.find_element(By.CSS_SELECTOR, '.products.list.items.product-items')
+            product_elements = main_element.find_elements(By.CSS_SELECTOR, '.item.product.product-item')
 
+            page_products = []
             for product_element in product_elements:
-                product = {}
+                product = Product()
                 try:
-                    product["schoolsupplier_id"] = i
-                    product["id"] = product_id
-
-                    product_id += 1
-                    product["name"] = product_element.find_element(By.CSS_SELECTOR, '.product-item-link').get_attribute('text')
-                    product["link"] = product_element.find_element(By.CSS_SELECTOR, '.product-item-link').get_attribute('href')
-                    product["price"] = product_element.find_element(By.CSS_SELECTOR, '.price').text
-                    product["image"] = product_element.find_element(By.CSS_SELECTOR, '.product-image-photo').get_attribute('src')
+                    product.name = product_element.find_element(By.CSS_SELECTOR, '.product-item-link').get_attribute('text')
+                    product.url = product_element.find_element(By.CSS_SELECTOR, '.product-item-link').get_attribute('href')
+                    product.price = product_element.find_element(By.CSS_SELECTOR, '.price').text
+                    product.image = product_element.find_element(By.CSS_SELECTOR, '.product-image-photo').get_attribute('src')
                     try:
-                        product["label"] = product_element.find_element(By.CSS_SELECTOR, '.product-label>span').text
+                        product.label = product_element.find_element(By.CSS_SELECTOR, '.product-label>span').text
                     except:
-                        product["label"] = None
+                        product.label = None
                 except:
                     continue
 
-                products.append(product)
-
-            school["products"] = products
-
-        pd.DataFrame(products).to_csv("monkhouse_products.csv", index=False)
-        
-        if depth == "products":
-            print("Successfully scraped schools and products.")
-            return 0
+                page_products.append(product)
 
-        variant_id = 0
-        variants = []
-
-        for product in tqdm(products):
-
-            driver.get(product["link"])
-
-            # Wait for the page to load
-            try:
-                WebDriverWait(driver, 1).until(EC.presence_of_element_located((By.CSS_SELECTOR, '.swatch-select.size')))
-            except:
-                continue
+            return page_products
 
-            select_element = Select(driver.find_element(By.CSS_SELECTOR, '.swatch-select.size'))
-            options = select_element.options
-
-            for option in options:
-                size = option.get_attribute('data-option-label')
-                # Select the option
-                try:    
-                    select_element.select_by_visible_text(option.text)
-                    # Get the price
-                    price = driver.find_element(By.CSS_SELECTOR, '.price-wrapper ').text
-
-                    description = driver.find_element(By.CSS_SELECTOR, '.product.attribute.description').text
-
-                    description_icons = driver.find_elements(By.CSS_SELECTOR, ".description-icon img")
-                    
-                    variant = {}
-                    variant["id"] = variant_id
-                    variant_id += 1
-                    variant["product_id"] = product["id"]
-                    variant["size"] = size
-                    variant["price"] = price
-                    variant["description"] = description
+        # The "Load More" button only requests the next `?p=` page, load the pages directly instead
+        return MONKHOUSE_PAGINATION.collect(driver, school.store_page, extract_products)
 
-                    try:
-                        description_icon_alts = []
-                        for description_icon in description_icons:
-                            if description_icon.get_attribute('alt') != "":
-                                description_icon_alts.append(description_icon.get_attribute('alt'))
-                        variant["description_icon_alts"] = description_icon_alts
-                    except: 
-                        variant["description_icon_alts"] = None
-
-                    try:
-                        colors = driver.find_elements(By.CSS_SELECTOR, '.swatch-attribute.color')
-                        color_options = colors[0].find_elements(By.CSS_SELECTOR, '.swatch-option')
-                        color_option_values = []
-                        for color_option in color_options:
-                            color_option_values.append(color_option.get_attribute('data-option-label'))
-                        variant["colors"] = color_option_values
-                    except:
-                        variant["colors"] = None
-
-                    variants.append(variant)
-
-                except:
-                    variant = {}
-                    variants.append(variant)
-
-        pd.DataFrame(variants).to_csv("monkhouse_variants.csv", index=False)
-
-        print("Successfully scraped schools, products and variants.")
-
-    def _scrape_blossomsschoolwear(self, driver, depth="schools"):
+    def _scrape_monkhouse_variants(self, driver, product):
         """
-        Scrapes data from the Blossoms Schoolwear website.
+        Scrapes the variants of one product from the Monkhouse website.
 
         Args:
         - driver: The Selenium WebDriver instance.
-        - depth: The depth to scrape data at. Can be "schools", "products" or "variants
-
+        - product: The product, as returned by `_scrape_monkhouse_products`.
         """
+        driver.get(product.url)
+
+        # Wait for the page to load
+        try:
+            WebDriverWait(driver, 1).until(EC.presence_of_element_located((By.CSS_SELECTOR, '.swatch-select.size')))
+        except:
+            return []
+
+        return enumerate_variants(driver, '.swatch-select.size', {
+            'price': field('.price-wrapper'),
+            'description': field('.product.attribute.description'),
+            'description_icon_alts': field('.description-icon img', attribute='alt', multiple=True),
+            'colors': field('.swatch-attribute.color .swatch-option', attribute='data-option-label', multiple=True),
+        }, size_attribute='data-option-label')
+
+    def _scrape_blossomsschoolwear_schools(self, driver):
+        """
+        Scrapes the schools from the Blossoms Schoolwear website.
 
-        driver.get('https://blossomsschoolwear.com/nursery-school-uniform/')
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
 
         schools = []
 
@@ -228,118 +304,130 @@ class Scraper:
             school_elements = driver.find_elements(By.CSS_SELECTOR, '.product-img-list>.text-center')
 
             for school_element in school_elements:
-                school = {}
+                school = School()
                 school_name = school_element.find_element(By.CSS_SELECTOR, '.header-cat').text
                 store_page = school_element.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
-                
-                school['school_name'] = school_name
-                school['store_page'] = store_page
 
-                schools.append(school)
+                school.name = school_name
+                school.store_page = store_page
 
-        pd.DataFrame(schools).to_csv("blossomsschoolwear_schools.csv", index=False)
+                schools.append(school)
 
+        return schools
 
-        if depth == "schools":
-            print("Successfully scraped schools.")
-            return 0
-        
-        products = []
-        product_id = 0
+    def _url_blossomsschoolwear_products(self, school):
+        """
+        Returns the first listing page of a Blossoms Schoolwear school.
 
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}?limit=100' if '?' not in school["store_page"] else f'{school["store_page"]}&limit=100'
+        Args:
+        - school: The school, as returned by `_scrape_blossomsschoolwear_schools`.
+        """
+        return LIMIT_PAGINATION.page_url(school.store_page, LIMIT_PAGINATION.start)
 
-            driver.get(store_page_url)
+    def _scrape_blossomsschoolwear_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Blossoms Schoolwear website.
 
-            product_elements = driver.find_elements(By.CSS_SELECTOR, '.product')
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_blossomsschoolwear_schools`.
+        """
 
-            for product_element in product_elements:
-                product = {}
+        def extract_products(driver):
+            page_products = []
+            for product_element in driver.find_elements(By.CSS_SELECTOR, '.product'):
+                product = Product()
                 try:
-                    product["schoolsupplier_id"] = i
-                    product["id"] = product_id
-
-                    product_id += 1
                     name = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('title')
                     price = product_element.find_element(By.CSS_SELECTOR, '.price.price--withoutTax').text
                     url = product_element.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
                     image = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
-                    
-                    product['name'] = name
-                    product['price'] = price
-                    product['url'] = url
-                    product['image'] = image
+
+                    product.name = name
+                    product.price = price
+                    product.url = url
+                    product.image = image
                 except:
                     continue
-                    
-                products.append(product)
 
-            school["products"] = products
+                page_products.append(product)
 
-        
-        pd.DataFrame(products).to_csv("blossomsschoolwear_products.csv", index=False)
+            return page_products
 
-        if depth == "products":
-            print("Successfully scraped schools and products.")
-            return 0
+        return LIMIT_PAGINATION.collect(driver, school.store_page, extract_products)
 
-        variant_id = 0
-        variants = []
+    def _scrape_blossomsschoolwear_variants(self, driver, product):
+        """
+        Scrapes the variants of one product from the Blossoms Schoolwear website.
 
-        for product in tqdm(product_df.to_dict(orient="records")):
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - product: The product, as returned by `_scrape_blossomsschoolwear_products`.
+        """
+        driver.get(product.url)
 
-            driver.get(product["url"])
+        # Wait for the page to load
+        try:
+            WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.CSS_SELECTOR, '.form-select.form-select--small')))
+        except:
+            return []
 
-            # Wait for the page to load
+        return enumerate_variants(driver, '.form-select.form-select--small', {
+            'price': field('.price.price--withoutTax'),
+        })
+
+    def _extract_opencart_products(self, driver):
+        """
+        Extracts the product cards of an OpenCart (Journal theme) listing page.
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
+        try:
+            main_element = driver.find_element(By.CSS_SELECTOR, '.row.main-products.product-grid')
+        except:
+            return []
+
+        products = []
+        for product_element in main_element.find_elements(By.CSS_SELECTOR, '.product-grid-item'):
+            product = Product()
             try:
-                WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.CSS_SELECTOR, '.form-select.form-select--small')))
+                product.name = product_element.find_element(By.CSS_SELECTOR, '.product-details .name a').get_attribute('innerHTML')
+                product.url = product_element.find_element(By.CSS_SELECTOR, '.product-details .name a').get_attribute('href')
+                product.price = product_element.find_element(By.CSS_SELECTOR, '.product-details .price').text
+                product.image = product_element.find_element(By.CSS_SELECTOR, '.product-thumb img').get_attribute('src')
             except:
-                driver.save_screenshot(f'../data_dirty/error/error_{product["id"]}.png')
                 continue
 
-            select_element = Select(driver.find_element(By.CSS_SELECTOR, '.form-select.form-select--small'))
-            options = select_element.options
-
-            for option in options:
-                size = option.text
-                # Select the option
-                try:    
-                    select_element.select_by_visible_text(option.text)
-                    # Get the price
-                    time.sleep(0.1)
-                    price = driver.find_element(By.CSS_SELECTOR, '.price.price--withoutTax').text
+            products.append(product)
 
-                    description = np.nan
+        return products
 
-                    description_icons = np.nan
-                    
-                    variant = {}
-                    variant["id"] = variant_id
-                    variant_id += 1
-                    variant["product_id"] = product["id"]
-                    variant["size"] = size
-                    variant["price"] = price
-                    variant["description"] = description
+    def _url_opencart_products(self, school):
+        """
+        Returns the first listing page of a school of an OpenCart supplier.
 
-                    variants.append(variant)
+        Args:
+        - school: The school, with its `store_page`.
+        """
+        return LIMIT_PAGINATION.page_url(school.store_page, LIMIT_PAGINATION.start)
 
-                except:
-                    variant = {}
-                    variants.append(variant)
-            
-        pd.DataFrame(variants).to_csv("blossomsschoolwear_variants.csv", index=False)
+    def _scrape_opencart_products(self, driver, school):
+        """
+        Scrapes the products of one school from an OpenCart (Journal theme) supplier.
 
-    
-    def _scrape_pinderschoolwear(self, driver, depth="schools"):
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, with its `store_page`.
+        """
+        return LIMIT_PAGINATION.collect(driver, school.store_page, self._extract_opencart_products)
 
+    def _scrape_pinderschoolwear_schools(self, driver):
         """
-        Scrapes data from the Pinders Schoolwear website.
+        Scrapes the schools from the Pinders Schoolwear website.
 
         Args:
         - driver: The Selenium WebDriver instance.
-        - depth: The depth to scrape data at. Can be "schools", "products" or "variants
         """
 
         alphabets = list(map(chr, range(97, 123)))
@@ -352,58 +440,43 @@ class Scraper:
             school_elements = main_element.find_elements(By.CSS_SELECTOR, '.product-inner')
 
             for school_element in school_elements:
-                school = {}
+                school = School()
 
                 store_page = school_element.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
                 school_name = school_element.find_element(By.CSS_SELECTOR, '.title').text
 
-                school['name'] = school_name
-                school['store_page'] = store_page
-                
-                schools.append(school)
-        
-        pd.DataFrame(schools).to_csv("pinderschoolwear_schools.csv", index=False)
-
-        products = []
-        product_id = 0
-
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}?limit=100' if '?' not in school["store_page"] else f'{school["store_page"]}&limit=100'
+                school.name = school_name
+                school.store_page = store_page
 
-            driver.get(store_page_url)
+                schools.append(school)
 
-            main_element = driver.find_element(By.CSS_SELECTOR, '.row.main-products.product-grid')
-            product_elements = main_element.find_elements(By.CSS_SELECTOR, '.product-grid-item')
+        return schools
 
-            for product_element in product_elements:
-                product = {}
-                try:
-                    product["schoolsupplier_id"] = i
-                    product["id"] = product_id
-
-                    product_id += 1
-                    product["name"] = product_element.find_element(By.CSS_SELECTOR, '.product-details .name a').get_attribute('innerHTML')
-                    product["link"] = product_element.find_element(By.CSS_SELECTOR, '.product-details .name a').get_attribute('href')
-                    product["price"] = product_element.find_element(By.CSS_SELECTOR, '.product-details .price').text
-                    product["image"] = product_element.find_element(By.CSS_SELECTOR, '.product-thumb img').get_attribute('src')
-                except:
-                    continue
-                    
-                products.append(product)
+    def _url_pinderschoolwear_products(self, school):
+        """
+        Returns the first listing page of a Pinders Schoolwear school.
 
-            school["products"] = products
+        Args:
+        - school: The school, as returned by `_scrape_pinderschoolwear_schools`.
+        """
+        return self._url_opencart_products(school)
 
-        pd.DataFrame(products).to_csv("pinderschoolwear_products.csv", index=False)
+    def _scrape_pinderschoolwear_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Pinders Schoolwear website.
 
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_pinderschoolwear_schools`.
+        """
+        return self._scrape_opencart_products(driver, school)
 
-    def _scrape_schoolwearmadeeasy(self, driver, depth="schools"):
+    def _scrape_schoolwearmadeeasy_schools(self, driver):
         """
-        Scrapes data from the Schoolwear Made Easy website.
+        Scrapes the schools from the Schoolwear Made Easy website.
 
         Args:
         - driver: The Selenium WebDriver instance.
-        - depth: The depth to scrape data at. Can be "schools", "products" or "variants
         """
 
         driver.get('https://schoolwearmadeeasy.com/')
@@ -418,57 +491,55 @@ class Scraper:
 
         # Get the href attributes
         for element in elements:
-            school = {}
+            school = School()
             school_link = element.get_attribute("href")
             school_name = element.get_attribute("innerHTML")
 
-            school["name"] = school_name
-            school["store_page"] = school_link
+            school.name = school_name
+            school.store_page = school_link
 
             schools.append(school)
 
-        pd.DataFrame(schools).to_csv("schoolwearmadeeasy_schools.csv", index=False)
+        return schools
 
-        products = []
-        product_id = 0
+    def _scrape_schoolwearmadeeasy_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Schoolwear Made Easy website.
 
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            driver.get(school["store_page"])
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_schoolwearmadeeasy_schools`.
+        """
+        driver.get(school.store_page)
 
-            # Scroll down slowly to load all products
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        # Scroll down until all products are loaded
+        InfiniteScrollPagination(timeout=2).load(driver)
 
-            main_elements = driver.find_element(By.CSS_SELECTOR, '.tt-product-listing.row')
-            product_elements = main_elements.find_elements(By.CSS_SELECTOR, '.tt-product')
+        main_elements = driver.find_element(By.CSS_SELECTOR, '.tt-product-listing.row')
+        product_elements = main_elements.find_elements(By.CSS_SELECTOR, '.tt-product')
 
-            for product_element in product_elements:
-                product = {}
-                try:
-                    product["schoolsupplier_id"] = i
-                    product["id"] = product_id
-
-                    product_id += 1
-                    product["name"] = product_element.find_element(By.CSS_SELECTOR, '.tt-title.prod-thumb-title-color a').get_attribute('innerHTML')
-                    product["link"] = product_element.find_element(By.CSS_SELECTOR, '.tt-title.prod-thumb-title-color a').get_attribute('href')
-                    product["price"] = product_element.find_element(By.CSS_SELECTOR, '.tt-price span').text
-                    product["image"] = product_element.find_element(By.CSS_SELECTOR, '.tt-img img').get_attribute('srcset')
-                except:
-                    continue
+        products = []
 
-                products.append(product)
+        for product_element in product_elements:
+            product = Product()
+            try:
+                product.name = product_element.find_element(By.CSS_SELECTOR, '.tt-title.prod-thumb-title-color a').get_attribute('innerHTML')
+                product.url = product_element.find_element(By.CSS_SELECTOR, '.tt-title.prod-thumb-title-color a').get_attribute('href')
+                product.price = product_element.find_element(By.CSS_SELECTOR, '.tt-price span').text
+                product.image = product_element.find_element(By.CSS_SELECTOR, '.tt-img img').get_attribute('srcset')
+            except:
+                continue
 
-            school["products"] = products
+            products.append(product)
 
-        pd.DataFrame(products).to_csv("schoolwearmadeeasy_products.csv", index=False)
+        return products
 
-    def _scrape_scotcrestschool(self, driver, depth="schools"):
+    def _scrape_scotcrestschool_schools(self, driver):
         """
-        Scrapes data from the Scotcrest School website.
+        Scrapes the schools from the Scotcrest School website.
 
         Args:
         - driver: The Selenium WebDriver instance.
-        - depth: The depth to scrape data at. Can be "schools", "products" or "variants
         """
 
         driver.get('https://scotcrestschools.co.uk/Find-Your-School?limit=50')
@@ -482,118 +553,86 @@ class Scraper:
 
             school_elements = driver.find_elements(By.CSS_SELECTOR, '.refine-image a')
             for school_element in school_elements:
-                school = {}
+                school = School()
 
                 store_page = school_element.get_attribute('href')
                 school_name = school_element.find_element(By.CSS_SELECTOR, '.refine-category-name').text
 
-                school['name'] = school_name
-                school['store_page'] = store_page
-                
+                school.name = school_name
+                school.store_page = store_page
+
                 schools.append(school)
 
-        pd.DataFrame(schools).to_csv("scotcrestschool_schools.csv", index=False)
+        return schools
 
-        products = []
-        product_id = 0
+    def _url_scotcrestschool_products(self, school):
+        """
+        Returns the first listing page of a Scotcrest School school.
 
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}?limit=100' if '?' not in school["store_page"] else f'{school["store_page"]}&limit=100'
+        Args:
+        - school: The school, as returned by `_scrape_scotcrestschool_schools`.
+        """
+        return self._url_opencart_products(school)
 
-            driver.get(store_page_url)
+    def _scrape_scotcrestschool_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Scotcrest School website.
 
-            main_element = driver.find_element(By.CSS_SELECTOR, '.row.main-products.product-grid')
-            product_elements = main_element.find_elements(By.CSS_SELECTOR, '.product-grid-item')
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_scotcrestschool_schools`.
+        """
+        return self._scrape_opencart_products(driver, school)
 
-            for product_element in product_elements:
-                product = {}
-                try:
-                    product["schoolsupplier_id"] = i
-                    product["id"] = product_id
-
-                    product_id += 1
-                    product["name"] = product_element.find_element(By.CSS_SELECTOR, '.product-details .name a').get_attribute('innerHTML')
-                    product["link"] = product_element.find_element(By.CSS_SELECTOR, '.product-details .name a').get_attribute('href')
-                    product["price"] = product_element.find_element(By.CSS_SELECTOR, '.product-details .price').text
-                    product["image"] = product_element.find_element(By.CSS_SELECTOR, '.product-thumb img').get_attribute('src')
-                except:
-                    continue
-                    
-                products.append(product)
+    def _scrape_scotcrestschool_variants(self, driver, product):
+        """
+        Scrapes the variants of one product from the Scotcrest School website.
 
-            school["products"] = products
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - product: The product, as returned by `_scrape_scotcrestschool_products`.
+        """
+        driver.get(product.url)
 
-        product_df = pd.DataFrame(products)
-        product_df.to_csv("scotcrestschool_products.csv", index=False)
+        # Find li inside of the ul .tt-options-swatch and click them
+        options = driver.find_elements(By.CSS_SELECTOR, 'div.option-select > ul > li')
+
+        # Get all the data-value attribute from options
+        data_values = [option.get_attribute("data-value") for option in options]
+        sizes = [option.text for option in options]
 
-        variant_id = 0
         variants = []
 
-        for product in tqdm(product_df.to_dict(orient="records")[:5]):
+        for i, data_value in enumerate(data_values):
+            size = sizes[i]
 
-            driver.get(product["link"])
+            # Click element that has data-value attribute equal to data_value
+            driver.find_element(By.CSS_SELECTOR, f'div.option-select > ul > li[data-value="{data_value}"]').click()
 
-            # Wait for the page to load
+            price = driver.find_element(By.CSS_SELECTOR, '.product-price').text
             try:
-                # Find li inside of the ul .tt-options-swatch and click them
-                options = driver.find_elements(By.CSS_SELECTOR, 'div.option-select > ul > li')
-
-                # Get all the data-value attribute from options
-                data_values = [option.get_attribute("data-value") for option in options]
-                sizes = [option.text for option in options]
-
-                for i, data_value in enumerate(data_values):
-                    size = sizes[i]
-                    
-                    # Click element that has data-value attribute equal to data_value
-                    driver.find_element(By.CSS_SELECTOR, f'div.option-select > ul > li[data-value="{data_value}"]').click()
-                    
-                    price = driver.find_element(By.CSS_SELECTOR, '.product-price').text
-                    try:
-                        description = driver.find_element(By.CSS_SELECTOR, '#tab-description').text
-                    except:
-                        description = np.nan
-                    description_icons = np.nan
-                    
-                    variant = {}
-                    variant["id"] = variant_id
-                    variant_id += 1
-                    variant["product_id"] = product["id"]
-                    variant["size"] = size
-                    variant["price"] = price
-                    variant["description"] = description
-
-                    variants.append(variant)
-
-                    # except:
-                    #     variant = {}
-                    #     variants.append(variant)
-                        
-                    variants_df = pd.DataFrame(variants)
-
-                    variants_df.to_csv("../data_dirty/scotcrestschool_variants.csv", index=False)
-                
+                description = driver.find_element(By.CSS_SELECTOR, '#tab-description').text
             except:
-                driver.save_screenshot(f'../data_dirty/error/error_{product["id"]}.png')
-                continue
+                description = None
+
+            variant = Variant()
+            variant.size = size
+            variant.option = data_value
+            variant.price = price
+            variant.description = description
+
+            variants.append(variant)
 
-        pd.DataFrame(variants).to_csv("scotcrestschool_variants.csv", index=False)
+        return variants
 
-    def _scrape_stevensons(self, driver, depth="schools"):
+    def _scrape_stevensons_schools(self, driver):
         """
-        Scrapes data from the Stevensons website.
+        Scrapes the schools from the Stevensons website.
 
         Args:
         - driver: The Selenium WebDriver instance.
-        - depth: The depth to scrape data at. Can be "schools", "products" or "variants
         """
 
-        driver.get('https://www.stevensons.co.uk/school-finder')
-
-        areas = driver.find_elements(By.CSS_SELECTOR, '.refine-image a')
-        area_links = [area.get_attribute('href') for area in areas]
-
         alphabets = list(map(chr, range(97, 123)))
 
         schools = []
@@ -605,59 +644,45 @@ class Scraper:
                 school_elements = main_element.find_elements(By.CSS_SELECTOR, '.school-card')
 
                 for school_element in school_elements:
-                    school = {}
+                    school = School()
 
                     store_page = school_element.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
                     school_name = school_element.find_element(By.CSS_SELECTOR, 'h3').text
 
-                    school['name'] = school_name
-                    school['store_page'] = store_page
-                    
+                    school.name = school_name
+                    school.store_page = store_page
+
                     schools.append(school)
             except:
                 pass
 
-        pd.DataFrame(schools).to_csv("stevensons_schools.csv", index=False)
-
-        products = []
-        product_id = 0
-
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}?limit=100' if '?' not in school["store_page"] else f'{school["store_page"]}&limit=100'
+        return schools
 
-            driver.get(store_page_url)
-
-            main_element = driver.find_element(By.CSS_SELECTOR, '.row.main-products.product-grid')
-            product_elements = main_element.find_elements(By.CSS_SELECTOR, '.product-grid-item')
+    def _url_stevensons_products(self, school):
+        """
+        Returns the first listing page of a Stevensons school.
 
-            for product_element in product_elements:
-                product = {}
-                try:
-                    product["schoolsupplier_id"] = i
-                    product["id"] = product_id
-
-                    product_id += 1
-                    product["name"] = product_element.find_element(By.CSS_SELECTOR, '.product-details .name a').get_attribute('innerHTML')
-                    product["link"] = product_element.find_element(By.CSS_SELECTOR, '.product-details .name a').get_attribute('href')
-                    product["price"] = product_element.find_element(By.CSS_SELECTOR, '.product-details .price').text
-                    product["image"] = product_element.find_element(By.CSS_SELECTOR, '.product-thumb img').get_attribute('src')
-                except:
-                    continue
-                    
-                products.append(product)
+        Args:
+        - school: The school, as returned by `_scrape_stevensons_schools`.
+        """
+        return self._url_opencart_products(school)
 
-            school["products"] = products
+    def _scrape_stevensons_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Stevensons website.
 
-        pd.DataFrame(products).to_csv("stevensons_products.csv", index=False)
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_stevensons_schools`.
+        """
+        return self._scrape_opencart_products(driver, school)
 
-    def _scrape_alansantryschoolwear(self, driver, depth="schools"):
+    def _scrape_alansantryschoolwear_schools(self, driver):
         """
-        Scrapes data from the Alan Santry Schoolwear website.
+        Scrapes the schools from the Alan Santry Schoolwear website.
 
         Args:
         - driver: The Selenium WebDriver instance.
-        - depth: The depth to scrape data at. Can be "schools", "products" or "variants
         """
 
         driver.get('https://www.alansantryschoolwear.co.uk/')
@@ -666,59 +691,53 @@ class Scraper:
         product_categories_list = [li for li in product_categories_main.find_elements(By.TAG_NAME, 'li')]
         schools = []
         for li in product_categories_list:
-            school = {}
+            school = School()
 
             school_name = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('innerText')
             school_link = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
 
-            school['school_name'] = school_name
-            school['store_page'] = school_link
+            school.name = school_name
+            school.store_page = school_link
 
             schools.append(school)
 
-        pd.DataFrame(schools).to_csv("alansantryschoolwear_schools.csv", index=False)
+        return schools
 
-        products = []
-        product_id = 0
+    def _scrape_alansantryschoolwear_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Alan Santry Schoolwear website.
 
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}'
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_alansantryschoolwear_schools`.
+        """
+        driver.get(school.store_page)
 
-            driver.get(store_page_url)
+        main_element = driver.find_element(By.CSS_SELECTOR, '#productfilter_items')
+        product_elements = main_element.find_elements(By.CSS_SELECTOR, '.grid_3')
 
-            try:
-                main_element = driver.find_element(By.CSS_SELECTOR, '#productfilter_items')
-                product_elements = main_element.find_elements(By.CSS_SELECTOR, '.grid_3')
+        products = []
 
-                for product_element in product_elements:
-                    product = {}
-                    try:
-                        product["schoolsupplier_id"] = i
-                        product["id"] = product_id
-
-                        product_id += 1
-                        product["name"] = product_element.find_element(By.CSS_SELECTOR, 'h3 > a').get_attribute('innerText')
-                        product["link"] = product_element.find_element(By.CSS_SELECTOR, 'h3 > a').get_attribute('href')
-                        product["price"] = product_element.find_element(By.CSS_SELECTOR, '.currencyPrice').text
-                        product["image"] = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
-                    except:
-                        continue
-                    
-                    products.append(product)
-            
+        for product_element in product_elements:
+            product = Product()
+            try:
+                product.name = product_element.find_element(By.CSS_SELECTOR, 'h3 > a').get_attribute('innerText')
+                product.url = product_element.find_element(By.CSS_SELECTOR, 'h3 > a').get_attribute('href')
+                product.price = product_element.find_element(By.CSS_SELECTOR, '.currencyPrice').text
+                product.image = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
             except:
                 continue
 
+            products.append(product)
 
-            school["products"] = products
-
-        pd.DataFrame(products).to_csv("alansantryschoolwear_products.csv", index=False)
+        return products
 
-
-    def _scrape_aspireacademyglasgow(self, driver, depth="schools"):
+    def _scrape_aspireacademyglasgow_schools(self, driver):
         """
-        Scrapes data from the Aspire Academy Glasgow website.
+        Scrapes the schools from the Aspire Academy Glasgow website.
+
+        Args:
+        - driver: The Selenium WebDriver instance.
         """
 
         driver.get('https://aspireacademyglasgow.com/')
@@ -732,59 +751,54 @@ class Scraper:
         product_categories_list = [li for li in product_categories_main.find_elements(By.TAG_NAME, 'li')]
         schools = []
         for li in product_categories_list:
-            school = {}
+            school = School()
 
             school_name = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('innerText')
             school_link = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
 
-            school['school_name'] = school_name
-            school['store_page'] = school_link
+            school.name = school_name
+            school.store_page = school_link
 
             schools.append(school)
 
-        schools = schools[2:]
+        return schools[2:]
 
-        pd.DataFrame(schools).to_csv("aspireacademyglasgow_schools.csv", index=False)
+    def _scrape_aspireacademyglasgow_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Aspire Academy Glasgow website.
 
-        products = []
-        product_id = 0
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_aspireacademyglasgow_schools`.
+        """
+        driver.get(school.store_page)
 
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}'
+        main_element = driver.find_element(By.CSS_SELECTOR, '.jet-listing-grid__items')
+        product_elements = main_element.find_elements(By.CSS_SELECTOR, '.elementor-container')
 
-            driver.get(store_page_url)
+        products = []
 
+        for product_element in product_elements:
+            product = Product()
             try:
-                main_element = driver.find_element(By.CSS_SELECTOR, '.jet-listing-grid__items')
-                product_elements = main_element.find_elements(By.CSS_SELECTOR, '.elementor-container')
-
-                for product_element in product_elements:
-                    product = {}
-                    try:
-                        product["schoolsupplier_id"] = i
-                        product["id"] = product_id
-
-                        product_id += 1
-                        product["name"] = product_element.find_element(By.CSS_SELECTOR, 'h2 > a').get_attribute('innerText')
-                        product["link"] = product_element.find_element(By.CSS_SELECTOR, 'h2 > a').get_attribute('href')
-                        product["price"] = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-Price-amount.amount').text
-                        product["image"] = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
-                    except:
-                        continue
-                    
-                    products.append(product)
-            
+                product.name = product_element.find_element(By.CSS_SELECTOR, 'h2 > a').get_attribute('innerText')
+                product.url = product_element.find_element(By.CSS_SELECTOR, 'h2 > a').get_attribute('href')
+                product.price = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-Price-amount.amount').text
+                product.image = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
             except:
                 continue
 
+            products.append(product)
 
-            school["products"] = products
+        return products
 
-        pd.DataFrame(products).to_csv("aspireacademyglasgow_products.csv", index=False)
+    def _scrape_borderembroideries_schools(self, driver):
+        """
+        Scrapes the schools from the Border Embroideries website.
 
-    
-    def _scrape_borderembroideries(self, driver, depth="schools"):
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
 
         driver.get('https://www.border-embroideries.co.uk/school-search.html')
 
@@ -796,112 +810,83 @@ class Scraper:
         school_list = [elem for elem in school_list_main.find_elements(By.CSS_SELECTOR, '.school')]
         schools = []
         for li in school_list:
-            school = {}
+            school = School()
 
             school_name = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('innerText')
             school_link = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
 
-            school['school_name'] = school_name
-            school['store_page'] = school_link
+            school.name = school_name
+            school.store_page = school_link
 
             schools.append(school)
 
-        pd.DataFrame(schools).to_csv("borderembroideries_schools.csv", index=False)
+        return schools
 
-        products = []
-        product_id = 0
-
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}'
-
-            driver.get(store_page_url)
-
-            try:
-                try:
-                    show_more_button = driver.find_element(By.XPATH, '//div[@class="amscroll-load-button" and @amscroll_type="after"]')
-                    show_more_button.click()
-                except:
-                    pass
-
-                main_elements = driver.find_elements(By.CSS_SELECTOR, '.products.wrapper.grid.products-grid')
-                for main_element in main_elements:
-                    product_elements = main_element.find_elements(By.CSS_SELECTOR, '.item.product')
-
-                    for product_element in product_elements:
-                        product = {}
-                        try:
-                            product["schoolsupplier_id"] = i
-                            product["id"] = product_id
-
-                            product_id += 1
-                            product["name"] = product_element.find_element(By.CSS_SELECTOR, '.product-item-link').get_attribute('innerText')
-                            product["link"] = product_element.find_element(By.CSS_SELECTOR, '.product-item-link').get_attribute('href')
-                            product["price"] = product_element.find_element(By.CSS_SELECTOR, '.price').text
-                            product["image"] = product_element.find_element(By.CSS_SELECTOR, 'img.img-thumbnail').get_attribute('src')
-                        except:
-                            continue
-                        
-                        products.append(product)
-            
-            except:
-                continue
+    def _scrape_borderembroideries_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Border Embroideries website.
 
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_borderembroideries_schools`.
+        """
+        driver.get(school.store_page)
 
-            school["products"] = products
-        
-        product_df = pd.DataFrame(products)
-        product_df.to_csv("borderembroideries_products.csv", index=False)
+        # Keep clicking the amscroll button until every product is loaded
+        LoadMorePagination(
+            (By.XPATH, '//div[@class="amscroll-load-button" and @amscroll_type="after"]'),
+            '.products.wrapper.grid.products-grid .item.product',
+        ).load(driver)
 
-        variant_id = 0
-        variants = []
+        products = []
 
-        for product in tqdm(product_df.to_dict(orient="records")[:5]):
+        main_elements = driver.find_elements(By.CSS_SELECTOR, '.products.wrapper.grid.products-grid')
+        for main_element in main_elements:
+            product_elements = main_element.find_elements(By.CSS_SELECTOR, '.item.product')
 
-            driver.get(product["link"])
+            for product_element in product_elements:
+                product = Product()
+                try:
+                    product.name = product_element.find_element(By.CSS_SELECTOR, '.product-item-link').get_attribute('innerText')
+                    product.url = product_element.find_element(By.CSS_SELECTOR, '.product-item-link').get_attribute('href')
+                    product.price = product_element.find_element(By.CSS_SELECTOR, '.price').text
+                    product.image = product_element.find_element(By.CSS_SELECTOR, 'img.img-thumbnail').get_attribute('src')
+                except:
+                    continue
 
-            # Wait for the page to load
-            try:
-                WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.CSS_SELECTOR, '.swatch-select.size')))
-            except:
-                driver.save_screenshot(f'../data_dirty/error/error_{product["id"]}.png')
-                continue
+                products.append(product)
 
-            select_element = Select(driver.find_element(By.CSS_SELECTOR, '.swatch-select.size'))
-            options = select_element.options
+        return products
 
-            for option in options:
-                size = option.text
-                # Select the option
-                try:    
-                    select_element.select_by_visible_text(option.text)
-                    # Get the price
-                    price = driver.find_element(By.CSS_SELECTOR, '.price-wrapper ').text
+    def _scrape_borderembroideries_variants(self, driver, product):
+        """
+        Scrapes the variants of one product from the Border Embroideries website.
 
-                    description = driver.find_element(By.CSS_SELECTOR, '.value.std').text
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - product: The product, as returned by `_scrape_borderembroideries_products`.
+        """
+        driver.get(product.url)
 
-                    description_icons = np.nan
-                    
-                    variant = {}
-                    variant["id"] = variant_id
-                    variant_id += 1
-                    variant["product_id"] = product["id"]
-                    variant["size"] = size
-                    variant["price"] = price
-                    variant["description"] = description
+        # Wait for the page to load
+        try:
+            WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.CSS_SELECTOR, '.swatch-select.size')))
+        except:
+            return []
 
-                    variants.append(variant)
+        return enumerate_variants(driver, '.swatch-select.size', {
+            'price': field('.price-wrapper'),
+            'description': field('.value.std'),
+        })
 
-                except:
-                    variant = {}
-                    variants.append(variant)
-                    
-        variants_df = pd.DataFrame(variants)
+    def _scrape_directschoolwear_schools(self, driver):
+        """
+        Scrapes the schools from the Direct Schoolwear website.
 
-        variants_df.to_csv("borderembroideries_variants.csv", index=False)
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
 
-    def _scrape_directschoolwear(self, driver, depth="schools"):
-        
         schools = []
         school_categories = ['primary-schools', 'uk-secondary-schools', 'find-my-international-school']
 
@@ -912,58 +897,63 @@ class Scraper:
             school_list = [elem for elem in school_list_main.find_elements(By.CSS_SELECTOR, '.product-container')]
 
             for li in school_list:
-                school = {}
+                school = School()
 
                 school_name = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('innerText')
                 school_link = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
 
-                school['school_name'] = school_name
-                school['store_page'] = school_link
+                school.name = school_name
+                school.store_page = school_link
 
                 schools.append(school)
 
-        pd.DataFrame(schools).to_csv("directschoolwear_schools.csv", index=False)
+        return schools
 
-        products = []
-        product_id = 0
+    def _url_directschoolwear_products(self, school):
+        """
+        Returns the listing page of a Direct Schoolwear school, with all its products.
 
-        for i, school in enumerate(schools[:2]):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}?limit=100'
+        Args:
+        - school: The school, as returned by `_scrape_directschoolwear_schools`.
+        """
+        return add_query_params(school.store_page, limit=100)
 
-            driver.get(store_page_url)
+    def _scrape_directschoolwear_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Direct Schoolwear website.
 
-            try:
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_directschoolwear_schools`.
+        """
+        driver.get(self._url_directschoolwear_products(school))
 
-                main_element = driver.find_elements(By.CSS_SELECTOR, '.products-grid')
-                
-                product_elements = main_element.find_elements(By.CSS_SELECTOR, '.grid_3')
+        main_element = driver.find_element(By.CSS_SELECTOR, '.products-grid')
+        product_elements = main_element.find_elements(By.CSS_SELECTOR, '.grid_3')
 
-                for product_element in product_elements:
-                    product = {}
-                    try:
-                        product["schoolsupplier_id"] = i
-                        product["id"] = product_id
-
-                        product_id += 1
-                        product["name"] = product_element.find_element(By.CSS_SELECTOR, 'h2 > a').get_attribute('innerText')
-                        product["link"] = product_element.find_element(By.CSS_SELECTOR, 'h2 > a').get_attribute('href')
-                        product["price"] = product_element.find_element(By.CSS_SELECTOR, '.price').text
-                        product["image"] = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
-                    except:
-                        continue
-                    
-                    products.append(product)
-            
+        products = []
+
+        for product_element in product_elements:
+            product = Product()
+            try:
+                product.name = product_element.find_element(By.CSS_SELECTOR, 'h2 > a').get_attribute('innerText')
+                product.url = product_element.find_element(By.CSS_SELECTOR, 'h2 > a').get_attribute('href')
+                product.price = product_element.find_element(By.CSS_SELECTOR, '.price').text
+                product.image = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
             except:
                 continue
 
+            products.append(product)
 
-            school["products"] = products
+        return products
 
-        pd.DataFrame(products).to_csv("directschoolwear_products.csv", index=False)
+    def _scrape_macgregorschoolwear_schools(self, driver):
+        """
+        Scrapes the schools from the MacGregor Schoolwear website.
 
-    def _scrape_macgregorschoolwear(self, driver, depth="schools"):
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
 
         driver.get('https://macgregorschoolwear.co.uk/product-category/')
 
@@ -971,111 +961,108 @@ class Scraper:
         product_categories_lis = [li for li in product_categories_main.find_elements(By.TAG_NAME, 'li')]
         schools = []
         for li in product_categories_lis:
-            school = {}
+            school = School()
 
             school_name = li.find_element(By.CSS_SELECTOR, 'a').text
             school_link = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
 
-            school['school_name'] = school_name
-            school['store_page'] = school_link
+            school.name = school_name
+            school.store_page = school_link
 
             schools.append(school)
 
-        pd.DataFrame(schools).to_csv("macgregorschoolwear_schools.csv", index=False)
+        return schools
 
-        products = []
-        product_id = 0
+    def _scrape_macgregorschoolwear_products(self, driver, school):
+        """
+        Scrapes the products of one school from the MacGregor Schoolwear website.
 
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}'
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_macgregorschoolwear_schools`.
+        """
+        driver.get(school.store_page)
 
-            driver.get(store_page_url)
+        main_element = driver.find_element(By.CSS_SELECTOR, '.products.columns-3')
+        product_elements = main_element.find_elements(By.CSS_SELECTOR, 'li.product.type-product')
 
-            try:
-                main_element = driver.find_element(By.CSS_SELECTOR, '.products.columns-3')
-                product_elements = main_element.find_elements(By.CSS_SELECTOR, 'li.product.type-product')
+        products = []
 
-                for product_element in product_elements:
-                    product = {}
-                    try:
-                        product["schoolsupplier_id"] = i
-                        product["id"] = product_id
-
-                        product_id += 1
-                        product["name"] = product_element.find_element(By.CSS_SELECTOR, 'h2.woocommerce-loop-product__title').get_attribute('innerHTML')
-                        product["link"] = product_element.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
-                        product["price"] = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-Price-amount.amount').text
-                        product["image"] = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
-                    except:
-                        continue
-                    
-                    products.append(product)
-            
+        for product_element in product_elements:
+            product = Product()
+            try:
+                product.name = product_element.find_element(By.CSS_SELECTOR, 'h2.woocommerce-loop-product__title').get_attribute('innerHTML')
+                product.url = product_element.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
+                product.price = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-Price-amount.amount').text
+                product.image = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
             except:
                 continue
 
+            products.append(product)
 
-            school["products"] = products
+        return products
 
-        pd.DataFrame(products).to_csv("macgregorschoolwear_products.csv", index=False)
+    def _scrape_schooluniformscotland_schools(self, driver):
+        """
+        Scrapes the schools from the School Uniform Scotland website.
 
-    def _scrape_schooluniformscotland(self, driver, depth="schools"):
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
         driver.get('https://schooluniformscotland.com/product-category/schools/')
 
         product_categories_main = driver.find_element(By.CSS_SELECTOR, '.products.columns-5')
         product_categories_list = [li for li in product_categories_main.find_elements(By.TAG_NAME, 'li')]
         schools = []
         for li in product_categories_list:
-            school = {}
+            school = School()
 
             school_name = li.find_element(By.CSS_SELECTOR, 'h2').text
             school_link = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
 
-            school['school_name'] = school_name
-            school['store_page'] = school_link
+            school.name = school_name
+            school.store_page = school_link
 
             schools.append(school)
 
-        pd.DataFrame(schools).to_csv("schooluniformscotland_schools.csv", index=False)
+        return schools
 
-        products = []
-        product_id = 0
+    def _scrape_schooluniformscotland_products(self, driver, school):
+        """
+        Scrapes the products of one school from the School Uniform Scotland website.
 
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}'
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_schooluniformscotland_schools`.
+        """
+        driver.get(school.store_page)
 
-            driver.get(store_page_url)
+        main_element = driver.find_element(By.CSS_SELECTOR, '.products.columns-5')
+        product_elements = main_element.find_elements(By.CSS_SELECTOR, 'li.product.type-product')
 
-            try:
-                main_element = driver.find_element(By.CSS_SELECTOR, '.products.columns-5')
-                product_elements = main_element.find_elements(By.CSS_SELECTOR, 'li.product.type-product')
+        products = []
 
-                for product_element in product_elements:
-                    product = {}
-                    try:
-                        product["schoolsupplier_id"] = i
-                        product["id"] = product_id
-
-                        product_id += 1
-                        product["name"] = product_element.find_element(By.CSS_SELECTOR, 'h2.woocommerce-loop-product__title').get_attribute('innerHTML')
-                        product["link"] = product_element.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
-                        product["price"] = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-Price-amount.amount').text
-                        product["image"] = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
-                    except:
-                        continue
-                    
-                    products.append(product)
-            
+        for product_element in product_elements:
+            product = Product()
+            try:
+                product.name = product_element.find_element(By.CSS_SELECTOR, 'h2.woocommerce-loop-product__title').get_attribute('innerHTML')
+                product.url = product_element.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
+                product.price = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-Price-amount.amount').text
+                product.image = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
             except:
                 continue
 
-            school["products"] = products
+            products.append(product)
+
+        return products
 
-        pd.DataFrame(products).to_csv("schooluniformscotland_products.csv", index=False)
+    def _scrape_smartschoolwear_schools(self, driver):
+        """
+        Scrapes the schools from the Smart Schoolwear website.
 
-    def _scrape_smartschoolwear(self, driver, depth="schools"):
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
         driver.get('https://www.smartschoolwear.co.uk/')
 
         school_list_mains = driver.find_elements(By.CSS_SELECTOR, 'ul.level1')[:2]
@@ -1085,56 +1072,54 @@ class Scraper:
 
         schools = []
         for li in school_list:
-            school = {}
+            school = School()
 
             school_name = li.find_element(By.CSS_SELECTOR, 'a > span').get_attribute('innerHTML')
             school_link = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
 
-            school['school_name'] = school_name
-            school['store_page'] = school_link
+            school.name = school_name
+            school.store_page = school_link
 
             schools.append(school)
 
-        pd.DataFrame(schools).to_csv("smartschoolwear_schools.csv", index=False)
-        
-        products = []
-        product_id = 0
+        return schools
 
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}'
+    def _scrape_smartschoolwear_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Smart Schoolwear website.
 
-            driver.get(store_page_url)
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_smartschoolwear_schools`.
+        """
+        driver.get(school.store_page)
 
-            try:
-                main_element = driver.find_element(By.CSS_SELECTOR, '.products.columns-4')
-                product_elements = main_element.find_elements(By.CSS_SELECTOR, '.product')
+        main_element = driver.find_element(By.CSS_SELECTOR, '.products.columns-4')
+        product_elements = main_element.find_elements(By.CSS_SELECTOR, '.product')
 
-                for product_element in product_elements:
-                    product = {}
-                    try:
-                        product["schoolsupplier_id"] = i
-                        product["id"] = product_id
-
-                        product_id += 1
-                        product["name"] = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-loop-product__title').text
-                        product["link"] = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-LoopProduct-link').get_attribute('href')
-                        product["price"] = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-Price-amount.amount').text
-                        product["image"] = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
-                    except:
-                        continue
-                    
-                    products.append(product)
-            
+        products = []
+
+        for product_element in product_elements:
+            product = Product()
+            try:
+                product.name = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-loop-product__title').text
+                product.url = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-LoopProduct-link').get_attribute('href')
+                product.price = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-Price-amount.amount').text
+                product.image = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
             except:
                 continue
 
+            products.append(product)
 
-            school["products"] = products
+        return products
 
-        pd.DataFrame(products).to_csv("smartschoolwear_products.csv", index=False)
+    def _scrape_topformschoolwear_schools(self, driver):
+        """
+        Scrapes the schools from the Top Form Schoolwear website.
 
-    def _scrape_topformschoolwear(self, driver, depth="schools"):
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
 
         driver.get('https://www.top-form.co.uk/find-your-school/')
 
@@ -1142,57 +1127,54 @@ class Scraper:
         school_list = [elem for elem in school_list_main.find_elements(By.CSS_SELECTOR, '.product-category')]
         schools = []
         for li in school_list:
-            school = {}
+            school = School()
 
             school_name = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('innerText')
             school_link = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
 
-            school['school_name'] = school_name
-            school['store_page'] = school_link
+            school.name = school_name
+            school.store_page = school_link
 
             schools.append(school)
-        
-        pd.DataFrame(schools).to_csv("topformschoolwear_schools.csv", index=False)
 
-        products = []
-        product_id = 0
+        return schools
 
-        for i, school in enumerate(schools):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}'
+    def _scrape_topformschoolwear_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Top Form Schoolwear website.
 
-            driver.get(store_page_url)
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_topformschoolwear_schools`.
+        """
+        driver.get(school.store_page)
 
-            try:
-                main_element = driver.find_element(By.CSS_SELECTOR, '.products.columns-4')
-                product_elements = main_element.find_elements(By.CSS_SELECTOR, '.product')
+        main_element = driver.find_element(By.CSS_SELECTOR, '.products.columns-4')
+        product_elements = main_element.find_elements(By.CSS_SELECTOR, '.product')
 
-                for product_element in product_elements:
-                    product = {}
-                    try:
-                        product["schoolsupplier_id"] = i
-                        product["id"] = product_id
-
-                        product_id += 1
-                        product["name"] = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-loop-product__title').text
-                        product["link"] = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-LoopProduct-link').get_attribute('href')
-                        product["price"] = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-Price-amount.amount').text
-                        product["image"] = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
-                    except:
-                        continue
-                    
-                    products.append(product)
-            
+        products = []
+
+        for product_element in product_elements:
+            product = Product()
+            try:
+                product.name = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-loop-product__title').text
+                product.url = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-LoopProduct-link').get_attribute('href')
+                product.price = product_element.find_element(By.CSS_SELECTOR, '.woocommerce-Price-amount.amount').text
+                product.image = product_element.find_element(By.CSS_SELECTOR, 'img').get_attribute('src')
             except:
                 continue
 
+            products.append(product)
 
-            school["products"] = products
-        
-        pd.DataFrame(products).to_csv("topformschoolwear_products.csv", index=False)
+        return products
 
+    def _scrape_uniformdirect_schools(self, driver):
+        """
+        Scrapes the schools from the Uniform Direct website.
 
-    def _scrape_uniformdirect(self, driver, depth="schools"):
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
 
         schools = []
         school_categories = ['Primary_Schools', 'Secondary_Schools', 'Special_Schools']
@@ -1204,126 +1186,557 @@ class Scraper:
             school_list = [elem for elem in school_list_main.find_elements(By.CSS_SELECTOR, '.item')]
 
             for li in school_list:
-                school = {}
+                school = School()
 
                 school_name = li.find_element(By.CSS_SELECTOR, 'h2').text
                 school_link = li.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
 
-                school['school_name'] = school_name
-                school['store_page'] = school_link
+                school.name = school_name
+                school.store_page = school_link
 
                 schools.append(school)
-        
-        pd.DataFrame(schools).to_csv("uniformdirect_schools.csv", index=False)
 
-        products = []
-        product_id = 0
+        return schools
 
-        for i, school in enumerate(schools[:2]):
-            school["schoolsupplier_id"] = i
-            store_page_url = f'{school["store_page"]}'
+    def _scrape_uniformdirect_products(self, driver, school):
+        """
+        Scrapes the products of one school from the Uniform Direct website.
 
-            driver.get(store_page_url)
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The school, as returned by `_scrape_uniformdirect_schools`.
+        """
+        driver.get(school.store_page)
 
-            # try:
-            main_element = driver.find_element(By.CSS_SELECTOR, '#FilterResultElements')
-            
-            product_elements = main_element.find_elements(By.CSS_SELECTOR, '.std-product-details')
+        main_element = driver.find_element(By.CSS_SELECTOR, '#FilterResultElements')
 
-            for product_element in product_elements:
-                product = {}
-                # try:
-                product["schoolsupplier_id"] = i
-                product["id"] = product_id
-
-                product_id += 1
-                product["name"] = product_element.find_element(By.XPATH, '//div[@class="standardSearchText details"]/a/h2').text
-                product["link"] = product_element.find_element(By.CSS_SELECTOR, 'div.details > a').get_attribute('href')
-                product["price"] = product_element.find_element(By.CSS_SELECTOR, 'span.product-price').text
-                product["image"] = product_element.find_element(By.CSS_SELECTOR, 'div.image > div > a > img').get_attribute('src')
-                # except:
-                #     continue
-                
-                products.append(product)
+        product_elements = main_element.find_elements(By.CSS_SELECTOR, '.std-product-details')
 
-            # except:
-            #     continue
+        products = []
 
+        for product_element in product_elements:
+            product = Product()
+            product.name = product_element.find_element(By.XPATH, './/div[@class="standardSearchText details"]/a/h2').text
+            product.url = product_element.find_element(By.CSS_SELECTOR, 'div.details > a').get_attribute('href')
+            product.price = product_element.find_element(By.CSS_SELECTOR, 'span.product-price').text
+            product.image = product_element.find_element(By.CSS_SELECTOR, 'div.image > div > a > img').get_attribute('src')
 
-            school["products"] = products
+            products.append(product)
 
-        pd.DataFrame(products).to_csv("uniformdirect_products.csv", index=False)
+        return products
 
-    def _scrape_asda(self, driver, depth="schools"):
+    def _setup_asda(self, driver):
+        """
+        Opens the George at ASDA website and accepts the cookies.
 
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
         driver.get('https://direct.asda.com/george/school/boys-school-uniform/D10M1G1,default,sc.html')
 
         # Click this button .onetrust-accept-btn-handler
         driver.find_element(By.ID, 'onetrust-accept-btn-handler').click()
-        # If not at the bottom of the page, scroll infinitely to load all of the elements, if no added element stop the scrolling
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        while True:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            WebDriverWait(driver, 10).until(lambda driver: driver.execute_script("return document.body.scrollHeight") > last_height)
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
+
+    def _scrape_asda_schools(self, driver):
+        """
+        ASDA is a generic supplier, its school uniform catalogue is scraped as a single
+        "school".
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        """
+        return [School(
+            name="George school uniform",
+            store_page='https://direct.asda.com/george/school/boys-school-uniform/D10M1G1,default,sc.html',
+        )]
+
+    def _scrape_asda_products(self, driver, school):
+        """
+        Scrapes the products of the George at ASDA school uniform catalogue.
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - school: The catalogue, as returned by `_scrape_asda_schools`.
+        """
+        driver.get(school.store_page)
+
+        # Scroll until no more elements are added to the page
+        InfiniteScrollPagination().load(driver)
 
         # Get all of the .product-mini-outer-container elements
         product_elements = driver.find_elements(By.CLASS_NAME, 'product-mini-outer-container')
         products = []
         for product_element in product_elements:
             try:
-                product = {}
-                product['name'] = product_element.find_element(By.CSS_SELECTOR, 'a.title').text
-                product['price'] = product_element.find_element(By.CSS_SELECTOR, '.product__price-value').text
-                product['url'] = product_element.find_element(By.CSS_SELECTOR, 'a.title').get_attribute('href')
-                product['image'] = product_element.find_element(By.CSS_SELECTOR, 'img.primary-image').get_attribute('src')
+                product = Product()
+                product.name = product_element.find_element(By.CSS_SELECTOR, 'a.title').text
+                product.price = product_element.find_element(By.CSS_SELECTOR, '.product__price-value').text
+                product.url = product_element.find_element(By.CSS_SELECTOR, 'a.title').get_attribute('href')
+                product.image = product_element.find_element(By.CSS_SELECTOR, 'img.primary-image').get_attribute('src')
                 products.append(product)
             except:
                 pass
-        products_df = pd.DataFrame(products)
 
-        products_df.to_csv("asda_products.csv", index=False)
+        return products
 
+    def _stage(self, supplier, depth):
+        """
+        Returns the method scraping the given depth of a supplier, or None if the supplier
+        isn't scraped at that depth.
 
-    def scrape(self, supplier):
+        Args:
+        - supplier: The supplier to scrape data from.
+        - depth: "schools", "products" or "variants".
         """
-        Main method to scrape data from the specified supplier.
-        
+        return getattr(self, f"_scrape_{supplier}_{depth}", None)
+
+    def _first_url(self, supplier, depth, item):
+        """
+        Returns the URL the stage of a supplier loads first for a school or a product: the
+        store page of the school or the page of the product, unless the supplier has a
+        `_url_<supplier>_<depth>` method.
+
+        Args:
+        - supplier: The supplier to scrape data from.
+        - depth: "products" or "variants".
+        - item: The school or the product to scrape.
+        """
+        url = getattr(self, f"_url_{supplier}_{depth}", None)
+        if url is not None:
+            return url(item)
+        return item.store_page if depth == "products" else item.url
+
+    def _setup(self, driver, supplier):
+        """
+        Runs the login or cookie banner step of a supplier, if it has one. On the scraper's
+        own driver it runs once per supplier, as the banners it dismisses are gone the
+        second time, e.g. for a crawl after its pre-flight check.
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - supplier: The supplier to scrape data from.
+        """
+        own = driver is self.driver or unwrap(driver) is self.driver
+        if own and supplier in self._ready:
+            return
+
+        setup = getattr(self, f"_setup_{supplier}", None)
+        if setup is not None:
+            setup(driver)
+
+            # Keep the login around in case the browser has to be restarted
+            if hasattr(driver, "save_cookies"):
+                driver.save_cookies()
+
+        if own:
+            self._ready.add(supplier)
+
+    def _run_stage(self, driver, supplier, depth, item, retries=1):
+        """
+        Scrapes one school (products) or one product (variants), returns an empty list if
+        the page couldn't be scraped.
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - supplier: The supplier to scrape data from.
+        - depth: "products" or "variants".
+        - item: The school or the product to scrape.
+        - retries: How many times the page is scraped again if the browser died.
+        """
+        try:
+            return self._stage(supplier, depth)(driver, item)
+        except Exception as e:
+            # The browser died halfway through the page, scrape it again in a new one
+            if retries and hasattr(driver, "restart") and not driver.is_alive():
+                driver.restart()
+                return self._run_stage(driver, supplier, depth, item, retries - 1)
+
+            print(f"Failed to scrape {depth} of {getattr(item, 'store_page', None) or item.url}: {e}")
+            return []
+
+    def _scrape_items(self, driver, supplier, depth, items, tabs=1):
+        """
+        Scrapes the products of each school or the variants of each product, yields
+        `(item, records)` in the order of `items`.
+
+        Args:
+        - driver: The Selenium WebDriver instance.
+        - supplier: The supplier to scrape data from.
+        - depth: "products" or "variants".
+        - items: The schools or the products to scrape.
+        - tabs: The number of pages loaded at once, each in its own tab of the browser.
+        """
+        if tabs <= 1:
+            for item in items:
+                if hasattr(driver, "recycle_if_needed"):
+                    driver.recycle_if_needed()
+                yield item, self._run_stage(driver, supplier, depth, item)
+            return
+
+        # Tabs preload the page the stage loads first, which it then finds already loaded
+        url = lambda item: self._first_url(supplier, depth, item)
+        extract = lambda tab, item: self._run_stage(tab, supplier, depth, item)
+
+        yield from TabPool(driver, size=tabs).map(items, url, extract)
+
+    def _publish(self, supplier, products=None, variants=None, history=None, store=None, complete=True, output_dir="."):
+        """
+        Records the prices of a completed crawl into the history and publishes its CSV
+        files into the query store, for those that were given.
+
+        Args:
+        - supplier: The supplier that was scraped.
+        - products: The `Product` records of the crawl, if it went down to products.
+        - variants: The `Variant` records of the crawl, if it went down to variants.
+        - history: Optional `PriceHistory` the prices of the crawl are recorded into.
+        - store: Optional `QueryStore` the crawl is published into.
+        - complete: Whether the crawl covered all the schools of the supplier.
+        - output_dir: The directory of the CSV files of the crawl.
+        """
+        if history is not None and products is not None:
+            history.record_crawl(supplier, products, variants, complete=complete)
+
+        if store is not None:
+            store.publish(supplier, input_dir=output_dir)
+
+    def _write(self, supplier, depth, frame, output_dir="."):
+        """
+        Writes the rows of a depth to `<supplier>_<depth>.csv` and returns them. The texts
+        repeated by variants go to dictionary tables, see `write_variants`.
+
+        Args:
+        - supplier: The supplier that was scraped.
+        - depth: "schools", "products" or "variants".
+        - frame: The rows to write.
+        - output_dir: The directory to write the file to, None to only return the rows.
+        """
+        if output_dir is None:
+            return frame
+
+        if depth == "variants":
+            write_variants(frame, supplier, output_dir)
+        else:
+            frame.to_csv(os.path.join(output_dir, f"{supplier}_{depth}.csv"), index=False)
+
+        return frame
+
+    def _finish(self, supplier, frames, run, validator=None, complete=True, output_dir="."):
+        """
+        Writes the quality stats and the metrics of a crawl, returns its `ScrapeResult`.
+
+        Args:
+        - supplier: The supplier that was scraped.
+        - frames: Dict of depth to the rows written, for the depths scraped.
+        - run: Dict of the metrics of the crawl, see `RUN_COLUMNS`.
+        - validator: Optional `Validator` the rows were checked with.
+        - complete: Whether the crawl covered all the schools of the supplier.
+        - output_dir: The directory of the files of the crawl, None if they aren't written.
+        """
+        if validator is not None:
+            validator.write_stats()
+
+        if output_dir is not None:
+            record_run(supplier, run, output_dir)
+
+        depths = list(frames)
+        scraped = depths[0] if len(depths) == 1 else f"{', '.join(depths[:-1])} and {depths[-1]}"
+        print(f"Successfully scraped {scraped}.")
+
+        return ScrapeResult(
+            supplier,
+            depths[-1],
+            frames,
+            complete=complete,
+            quality=validator.summary() if validator is not None else None,
+            quarantine=validator.quarantine() if validator is not None else None,
+            run=run,
+            output_dir=output_dir,
+        )
+
+    def _scrape_supplier(self, driver, supplier, depth="schools", history=None, tabs=1, discovery="pages", since=None,
+                         store=None, workers=None, validate=True, selection=None, output_dir="."):
+        """
+        Scrapes a supplier down to the given depth, writes `<supplier>_<depth>.csv` files
+        and returns the rows as a `ScrapeResult`.
+
         Args:
+        - driver: The Selenium WebDriver instance.
         - supplier: The supplier to scrape data from.
+        - depth: The depth to scrape data at. Can be "schools", "products" or "variants".
+          Suppliers are never scraped deeper than their deepest stage.
+        - history: Optional `PriceHistory` the prices of the crawl are recorded into.
+        - tabs: The number of pages loaded at once, each in its own tab of the browser.
+        - discovery: How the schools are found, "pages" walks the supplier's school pages
+          and "sitemap" reads its XML sitemap.
+        - since: ISO date, with sitemap discovery only the schools modified since are scraped.
+          The crawl is then partial, like a crawl of selected schools.
+        - store: Optional `QueryStore` the crawl is published into once it completed.
+        - workers: Optional dict of the number of browsers per stage, e.g.
+          `{"products": 2, "variants": 4}`, to run the stages as a pipeline.
+        - validate: Whether to check the rows as they are written, and quarantine the invalid ones.
+        - selection: Optional `Selection` of the schools to scrape, instead of all of them.
+        - output_dir: The directory to write the CSV files to, None to only return the rows.
         """
-        if supplier == "monkhouse":
-            self._scrape_monkhouse(self.driver)
-        elif supplier == "pinderschoolwear":
-            self._scrape_pinderschoolwear(self.driver)
-        elif supplier == "schoolwearmadeeasy":
-            self._scrape_schoolwearmadeeasy(self.driver)
-        elif supplier == "scotcrestschool":
-            self._scrape_scotcrestschool(self.driver)
-        elif supplier == "stevensons":
-            self._scrape_stevensons(self.driver)
-        elif supplier == "alansantryschoolwear":
-            self._scrape_alansantryschoolwear(self.driver)
-        elif supplier == "aspireacademyglasgow":
-            self._scrape_aspireacademyglasgow(self.driver)
-        elif supplier == "borderembroideries":
-            self._scrape_borderembroideries(self.driver)
-        elif supplier == "directschoolwear":
-            self._scrape_directschoolwear(self.driver)
-        elif supplier == "macgregorschoolwear":
-            self._scrape_macgregorschoolwear(self.driver)
-        elif supplier == "schooluniformscotland":
-            self._scrape_schooluniformscotland(self.driver)
-        elif supplier == "smartschoolwear":
-            self._scrape_smartschoolwear(self.driver)
-        elif supplier == "topformschoolwear":
-            self._scrape_topformschoolwear(self.driver)
-        elif supplier == "uniformdirect":
-            self._scrape_uniformdirect(self.driver)
-        elif supplier == "asda":
-            self._scrape_asda(self.driver)
+        if depth not in DEPTHS:
+            raise ValueError("Invalid depth.")
+
+        # Crawls of some of the schools must not mark the products of the others as gone
+        complete = not selection and since is None
+        if store is not None and not complete:
+            raise ValueError("A crawl of selected or recently modified schools can't be published into the store.")
+        if store is not None and output_dir is None:
+            raise ValueError("The store is published from the CSV files, they need an output directory.")
+
+        validator = Validator(supplier, output_dir) if validate else None
+
+        # The metrics of the run, which the crawl planner estimates the next runs from
+        started = time.time()
+        run = {"run": pd.Timestamp.now(tz="UTC").isoformat(timespec="seconds"), "depth": depth, "tabs": tabs}
+
+        self._setup(driver, supplier)
+
+        if selection and not selection.needs_discovery:
+            schools = selection.schools()
+        elif discovery == "sitemap":
+            schools = sitemap_schools(supplier, since=since)
+        else:
+            schools = self._stage(supplier, "schools")(driver)
+
+        # Explicit store pages don't load the school list, and a sitemap crawl since a date
+        # only lists the modified schools: the size of the school list stays unknown
+        partial_sitemap = discovery == "sitemap" and since is not None
+        known = (not selection or selection.needs_discovery) and not partial_sitemap
+        run["discovered"] = len(schools) if known else None
+
+        if selection:
+            schools = selection.apply(schools)
+
+        run["schools"] = len(schools)
+        run["schools_seconds"] = time.time() - started
+
+        assign_ids(supplier, schools)
+
+        # Rows are checked as they are scraped, so that invalid schools don't have their
+        # products scraped, nor invalid products their variants
+        check = validator.check_records if validator is not None else lambda records, depth: records
+
+        schools = check(schools, "schools")
+        frames = {"schools": self._write(supplier, "schools", to_frame(schools, School), output_dir)}
+
+        if depth == "schools" or self._stage(supplier, "products") is None:
+            self._publish(supplier, store=store, output_dir=output_dir)
+            return self._finish(supplier, frames, dict(run, seconds=time.time() - started), validator, complete, output_dir)
+
+        scrape_variants = depth == "variants" and self._stage(supplier, "variants") is not None
+
+        if workers:
+            pipeline = Pipeline(
+                self,
+                supplier,
+                product_workers=workers.get("products", 1),
+                variant_workers=workers.get("variants", 1) if scrape_variants else 0,
+                tabs=tabs,
+                validator=validator,
+            )
+            products, variants = pipeline.run(schools)
+
+            run.update(
+                product_workers=pipeline.product_workers,
+                variant_workers=pipeline.variant_workers,
+                products_seconds=pipeline.stage_seconds["products"],
+                variants_seconds=pipeline.stage_seconds["variants"] if scrape_variants else None,
+            )
         else:
-            raise ValueError("Invalid supplier name.") 
+            products = []
+            stage_started = time.time()
+
+            for school, school_products in tqdm(self._scrape_items(driver, supplier, "products", schools, tabs), total=len(schools)):
+                products += check(assign_ids(supplier, school_products, school), "products")
+
+            run.update(product_workers=1, variant_workers=1, products_seconds=time.time() - stage_started)
+
+        run["products"] = len(products)
+        run["unique_products"] = len({product.id for product in products})
+
+        # The flat file builder joins products sorted by id with variants sorted by product id
+        products_frame = to_frame(products, Product).sort_values(["id", "schoolsupplier_id"], kind="stable")
+        frames["products"] = self._write(supplier, "products", products_frame, output_dir)
+
+        if not scrape_variants:
+            self._publish(supplier, products, history=history, store=store, complete=complete, output_dir=output_dir)
+            return self._finish(supplier, frames, dict(run, seconds=time.time() - started), validator, complete, output_dir)
+
+        if not workers:
+            # Products sold to several schools have the same id, their variants are scraped once
+            unique_products = list({product.id: product for product in products}.values())
+            variants = []
+            texts = {}
+            stage_started = time.time()
+
+            for product, product_variants in tqdm(self._scrape_items(driver, supplier, "variants", unique_products, tabs), total=len(unique_products)):
+                variants += intern_fields(check(assign_ids(supplier, product_variants, product), "variants"), texts)
+
+            run["variants_seconds"] = time.time() - stage_started
+
+        run["variants"] = len(variants)
+
+        variants_frame = to_frame(variants, Variant).sort_values(["product_id", "id"], kind="stable")
+        frames["variants"] = self._write(supplier, "variants", variants_frame, output_dir)
+
+        self._publish(supplier, products, variants, history=history, store=store, complete=complete, output_dir=output_dir)
+        return self._finish(supplier, frames, dict(run, seconds=time.time() - started), validator, complete, output_dir)
+
+    def revisit(self, plan, history, tabs=1):
+        """
+        Crawls the pages of a revisit plan and records their prices into the history, as
+        partial crawls. The CSV files of the suppliers are left as they are.
+
+        Args:
+        - plan: The pages to crawl, as returned by `RevisitScheduler.plan`.
+        - history: The `PriceHistory` the prices are recorded into.
+        - tabs: The number of pages loaded at once, each in its own tab of the browser.
+        """
+        for (supplier, depth), pages in plan.groupby(["supplier", "depth"]):
+            if supplier not in SUPPLIERS:
+                raise ValueError("Invalid supplier name.")
+
+            self._setup(self.driver, supplier)
+
+            if depth == "variants":
+                products = [Product(url=url, id=product_id(supplier, url)) for url in pages["url"]]
+                variants = []
+                for product, product_variants in tqdm(self._scrape_items(self.driver, supplier, "variants", products, tabs), total=len(products)):
+                    variants += assign_ids(supplier, product_variants, product)
+
+                changes = history.record_crawl(supplier, products, variants, complete=False)
+            else:
+                schools = assign_ids(supplier, [School(store_page=url) for url in pages["url"]])
+                products = []
+                for school, school_products in tqdm(self._scrape_items(self.driver, supplier, "products", schools, tabs), total=len(schools)):
+                    products += assign_ids(supplier, school_products, school)
+
+                changes = history.record_crawl(supplier, products, complete=False)
+
+            print(f"Revisited {len(pages)} {supplier} pages, {changes} prices changed.")
+
+    def preflight(self, supplier, sample=2, depth="schools"):
+        """
+        Scrapes a small sample of the schools and products of a supplier and checks that
+        its selectors still match and its fields are filled in, returns a `PreflightReport`.
+
+        Args:
+        - supplier: The supplier to check.
+        - sample: The number of schools (and of products) to scrape.
+        - depth: The deepest depth to check.
+        """
+        if supplier not in SUPPLIERS:
+            raise ValueError("Invalid supplier name.")
+
+        return run_preflight(self, supplier, sample=sample, depth=depth)
+
+    def _deepest(self, supplier):
+        """
+        Returns the deepest depth a supplier is scraped at.
+
+        Args:
+        - supplier: The supplier.
+        """
+        return [depth for depth in DEPTHS if self._stage(supplier, depth) is not None][-1]
+
+    def plan(self, suppliers, deadline, max_browsers=4, tabs=1, input_dir="."):
+        """
+        Returns the depth, the number of schools and the browsers per stage of the crawl of
+        every supplier that fit a deadline, estimated from the metrics of their past runs
+        (see `CrawlPlanner`). Each row can be passed on to `scrape`, e.g.
+        `scrape(row.supplier, row.depth, sample=row.sample, workers=row.workers)`.
+
+        Args:
+        - suppliers: The suppliers to crawl, one after another.
+        - deadline: The time the crawls have to be done by (a datetime), or their budget in seconds.
+        - max_browsers: The largest number of browsers of a crawl.
+        - tabs: The number of tabs per browser.
+        - input_dir: The directory of the `<supplier>_runs.csv` files.
+        """
+        for supplier in suppliers:
+            if supplier not in SUPPLIERS:
+                raise ValueError("Invalid supplier name.")
+
+        deepest = {supplier: self._deepest(supplier) for supplier in suppliers}
+        return CrawlPlanner(input_dir).plan(suppliers, deadline, max_browsers=max_browsers, tabs=tabs, deepest=deepest)
+
+    def scrape(self, supplier, depth="schools", history=None, tabs=1, preflight=False, discovery="pages", since=None,
+               store=None, workers=None, validate=True, urns=None, names=None, store_pages=None, sample=None,
+               dry_run=False, output_dir="."):
+        """
+        Main method to scrape data from the specified supplier, returns the rows as a
+        `ScrapeResult`. They are also written to `<supplier>_<depth>.csv` files in
+        `output_dir`, unless it is None.
+
+        The whole school list is scraped, unless schools are selected by `urns`, `names`,
+        `store_pages` or `sample` (see `Selection`), e.g. to refresh one school in seconds.
+        The CSV files then hold the selected schools only, and the prices are recorded
+        into the history as a partial crawl.
+
+        Args:
+        - supplier: The supplier to scrape data from.
+        - depth: The depth to scrape data at. Can be "schools", "products" or "variants".
+        - history: Optional `PriceHistory` the prices of the crawl are recorded into.
+        - tabs: The number of school or product pages loaded at once, each in its own tab
+          of the browser. Gives most of the throughput of several browsers for the memory
+          of one.
+        - preflight: Whether to check a sample of pages first, and give up before the full
+          crawl if the supplier's extractors look broken.
+        - discovery: How the schools are found, "pages" walks the supplier's school pages
+          and "sitemap" reads its XML sitemap (a handful of requests for the whole catalogue).
+        - since: ISO date, with sitemap discovery only the schools modified since are scraped.
+          The crawl is then partial, like a crawl of selected schools.
+        - store: Optional `QueryStore` the crawl is published into once it completed, e.g.
+          for the price comparison website.
+        - workers: Optional dict of the number of browsers per stage, e.g.
+          `{"products": 2, "variants": 4}`. The stages then run as a pipeline: variants
+          are scraped while the products of the next schools are still being listed.
+        - validate: Whether to check the rows (required fields, prices, URL domains and
+          duplicate keys) as they are written. Invalid rows go to `<supplier>_quarantine.csv`
+          instead, and the counts of every run to `<supplier>_quality.csv`.
+        - urns: Only scrape the schools with these URNs, for suppliers that show them.
+        - names: Regular expression (or list of them), only scrape the schools whose name matches.
+        - store_pages: Only scrape the school pages at these URLs, without loading the school list.
+        - sample: Only scrape this many schools, picked at random among the selected ones.
+        - dry_run: Whether to only return the estimate of the crawl (its pages, rows and
+          wall time, from the metrics of past runs) without loading any page.
+        - output_dir: The directory to write the CSV files, the quarantine and quality files
+          and the metrics of the run to. None keeps the rows in memory only, e.g. for
+          services using the returned frames.
+        """
+        if supplier not in SUPPLIERS:
+            raise ValueError("Invalid supplier name.")
+        # Checked before any page is loaded, by the pre-flight check or the setup
+        if discovery not in ("pages", "sitemap"):
+            raise ValueError("Invalid discovery.")
+        if discovery == "sitemap" and supplier not in SITEMAPS:
+            raise ValueError(f"No sitemap known for {supplier}.")
+
+        selection = Selection(urns=urns, names=names, store_pages=store_pages, sample=sample)
+
+        if dry_run:
+            # Name patterns select an unknown number of schools, estimated as all of them
+            selected = [len(items) for items in (urns, store_pages) if items is not None]
+            if sample is not None:
+                selected.append(sample)
+            estimate = CrawlPlanner(output_dir or ".").estimate(
+                supplier, depth, sample=min(selected) if selected else None,
+                browsers=sum(workers.values()) if workers else 1, tabs=tabs, deepest=self._deepest(supplier),
+            )
+            print(f"Estimated {estimate['pages']} pages of {supplier} in {estimate['seconds'] / 60:.0f} minutes.")
+            return estimate
+
+        if preflight:
+            report = self.preflight(supplier, depth=depth)
+            print(report)
+            if not report.ok:
+                raise RuntimeError(f"Pre-flight check of {supplier} failed, not scraping it.")
+
+        return self._scrape_supplier(
+            self.driver, supplier, depth, history=history, tabs=tabs, discovery=discovery, since=since, store=store,
+            workers=workers, validate=validate, selection=selection, output_dir=output_dir,
+        )
@@ -0,0 +1,76 @@
+import random
+import re
+
+from .sitemap import school_from_url
+
+
+class Selection:
+    """
+    The schools of a targeted crawl, e.g. to refresh one school after a complaint or to
+    check a fix on a few schools, instead of the supplier's whole school list.
+
+    The schools are chosen before any of their pages is loaded. Explicit store pages
+    don't even need the school list; URNs, name patterns and samples filter it.
+
+    Attributes:
+    - urns: The URNs of the schools to scrape, for suppliers that show them.
+    - names: Regular expressions, schools whose name matches one (ignoring case) are scraped.
+    - store_pages: The URLs of the school pages to scrape, the school list isn't loaded.
+    - sample: The number of schools picked at random among those selected by the other
+      criteria (or among all of them).
+    - seed: The seed of the random sample, for repeatable samples.
+    """
+
+    def __init__(self, urns=None, names=None, store_pages=None, sample=None, seed=None):
+        if isinstance(names, str):
+            names = [names]
+        if sample is not None and sample < 1:
+            raise ValueError("The sample must hold at least one school.")
+
+        self.urns = None if urns is None else {str(urn) for urn in urns}
+        self.names = None if names is None else [re.compile(name, re.IGNORECASE) for name in names]
+        self.store_pages = None if store_pages is None else list(store_pages)
+        self.sample = sample
+        self.seed = seed
+
+    def __bool__(self):
+        return any(value is not None for value in (self.urns, self.names, self.store_pages, self.sample))
+
+    @property
+    def needs_discovery(self):
+        """
+        Whether the school list has to be loaded to select the schools.
+        """
+        return self.store_pages is None
+
+    def schools(self):
+        """
+        Returns the schools of the explicit store pages, named after their URL.
+        """
+        return [school_from_url(store_page) for store_page in self.store_pages]
+
+    def apply(self, schools):
+        """
+        Returns the selected schools among those of the school list.
+
+        Args:
+        - schools: The schools of the supplier.
+        """
+        selected = schools
+
+        if self.urns is not None:
+            selected = [school for school in selected if school.urn is not None and str(school.urn) in self.urns]
+            if not any(school.urn for school in schools):
+                print("Selecting schools by URN, but the supplier doesn't show any.")
+
+        if self.names is not None:
+            selected = [
+                school for school in selected
+                if school.name and any(pattern.search(school.name) for pattern in self.names)
+            ]
+
+        if self.sample is not None and self.sample < len(selected):
+            selected = random.Random(self.seed).sample(selected, self.sample)
+
+        print(f"Selected {len(selected)} of {len(schools)} schools.")
+        return selected
@@ -0,0 +1,161 @@
+import gzip
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse, unquote
+from urllib.request import Request, urlopen
+
+from .records import School
+
+NAMESPACE = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+USER_AGENT = "Mozilla/5.0 (compatible; scrapplier)"
+
+# Sitemap and URL patterns of the suppliers that publish sitemaps. WooCommerce (Yoast)
+# and Shopify have fixed URL layouts, Magento serves its sitemap at /sitemap.xml.
+SITEMAPS = {
+    "macgregorschoolwear": {
+        "url": "https://macgregorschoolwear.co.uk/sitemap_index.xml",
+        "schools": r"/product-category/[^/]+/?$",
+        "products": r"/product/[^/]+/?$",
+    },
+    "schooluniformscotland": {
+        "url": "https://schooluniformscotland.com/sitemap_index.xml",
+        "schools": r"/product-category/schools/[^/]+/?$",
+        "products": r"/product/[^/]+/?$",
+    },
+    "smartschoolwear": {
+        "url": "https://www.smartschoolwear.co.uk/sitemap_index.xml",
+        "schools": r"/product-category/[^/]+/[^/]+/?$",
+        "products": r"/product/[^/]+/?$",
+    },
+    "topformschoolwear": {
+        "url": "https://www.top-form.co.uk/sitemap_index.xml",
+        "schools": r"/product-category/[^/]+/?$",
+        "products": r"/product/[^/]+/?$",
+    },
+    "aspireacademyglasgow": {
+        "url": "https://aspireacademyglasgow.com/sitemap_index.xml",
+        "schools": r"/product-category/[^/]+/?$",
+        "products": r"/product/[^/]+/?$",
+    },
+    "schoolwearmadeeasy": {
+        "url": "https://schoolwearmadeeasy.com/sitemap.xml",
+        "schools": r"/collections/[^/]+/?$",
+        "products": r"/products/[^/]+/?$",
+    },
+    "borderembroideries": {
+        "url": "https://www.border-embroideries.co.uk/sitemap.xml",
+        "schools": r"/schools/[^/]+\.html$",
+        # Product pages sit at the root, next to the CMS pages
+        "products": r"^/(?!school-search|customer-service|about-us|contact|delivery|returns|privacy|terms|faq|size-guide)[^/]+\.html$",
+    },
+}
+
+
+def _open(url):
+    response = urlopen(Request(url, headers={"User-Agent": USER_AGENT}), timeout=60)
+
+    # Gzipped sitemaps are decompressed while they are read
+    if url.endswith(".gz") or response.headers.get("Content-Type", "").endswith("gzip"):
+        return gzip.GzipFile(fileobj=response)
+    return response
+
+
+def iter_sitemap(url, open_url=_open):
+    """
+    Yields the `(loc, lastmod)` of every page of a sitemap, following sitemap indexes.
+
+    The XML is parsed as it is downloaded and every entry is removed from the tree once
+    yielded, so sitemaps of any size use constant memory.
+
+    Args:
+    - url: The URL of the sitemap or of the sitemap index.
+    - open_url: Function opening a URL as a file-like object.
+    """
+    children = []
+
+    with open_url(url) as stream:
+        events = ET.iterparse(stream, events=("start", "end"))
+        _, root = next(events)
+
+        for event, element in events:
+            if event != "end" or element.tag not in (f"{NAMESPACE}url", f"{NAMESPACE}sitemap"):
+                continue
+
+            loc = element.findtext(f"{NAMESPACE}loc")
+            lastmod = element.findtext(f"{NAMESPACE}lastmod")
+
+            if loc:
+                loc = loc.strip()
+                if element.tag == f"{NAMESPACE}sitemap":
+                    children.append(loc)
+                else:
+                    yield loc, lastmod and lastmod.strip()
+
+            # Clearing the entry alone would leave it empty in the root, drop every entry
+            root.clear()
+
+    for child in children:
+        yield from iter_sitemap(child, open_url=open_url)
+
+
+def discover(supplier, since=None, open_url=_open):
+    """
+    Classifies the pages of a supplier's sitemap into school and product pages, yields
+    `(depth, url, lastmod)` tuples.
+
+    Args:
+    - supplier: The supplier to discover.
+    - since: ISO date, pages whose `lastmod` is older are skipped.
+    - open_url: Function opening a URL as a file-like object.
+    """
+    if supplier not in SITEMAPS:
+        raise ValueError(f"No sitemap known for {supplier}.")
+
+    config = SITEMAPS[supplier]
+    patterns = [(depth, re.compile(config[depth])) for depth in ["schools", "products"]]
+
+    for url, lastmod in iter_sitemap(config["url"], open_url=open_url):
+        if since is not None and lastmod is not None and lastmod < since:
+            continue
+
+        path = urlparse(url).path
+        for depth, pattern in patterns:
+            if pattern.search(path):
+                yield depth, url, lastmod
+                break
+
+
+def school_from_url(url):
+    """
+    Returns the school of a school page URL, named after the last segment of its path.
+
+    Args:
+    - url: The URL of the school page.
+    """
+    slug = unquote(urlparse(url).path.rstrip("/").rsplit("/", 1)[-1]).rsplit(".", 1)[0]
+    return School(name=slug.replace("-", " ").title(), store_page=url)
+
+
+def sitemap_schools(supplier, since=None, open_url=_open):
+    """
+    Returns the schools of a supplier found in its sitemap. The name of each school is
+    taken from its URL, as sitemaps don't carry titles.
+
+    The product pages of the sitemap aren't returned: a product page doesn't tell which
+    schools it is sold to, so products are still listed from the school pages.
+
+    Args:
+    - supplier: The supplier to discover.
+    - since: ISO date, schools whose page wasn't modified since are skipped.
+    - open_url: Function opening a URL as a file-like object.
+    """
+    schools = []
+
+    for depth, url, lastmod in discover(supplier, since=since, open_url=open_url):
+        if depth != "schools":
+            continue
+
+        schools.append(school_from_url(url))
+
+    return schools
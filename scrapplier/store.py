@@ -0,0 +1,274 @@
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from .aggregates import (
+    GENERIC_SUPPLIERS, SCHOOL_KEY, affected_schools, create_aggregates, refresh_all_schools, refresh_generic,
+    refresh_schools,
+)
+from .flatfile import iter_flat_chunks
+
+# Checked in order, so that e.g. "polo shirt" is a polo and "sweatshirt" a jumper
+CATEGORIES = [
+    ("blazer", ["blazer"]),
+    ("polo", ["polo"]),
+    ("jumper", ["jumper", "cardigan", "sweatshirt", "pullover", "v-neck", "hoodie"]),
+    ("coat", ["coat", "jacket", "fleece", "waterproof", "softshell"]),
+    ("pe", ["pe", "sports", "games", "gym", "leggings", "shorts", "skort", "rugby", "hockey"]),
+    ("shirt", ["shirt", "blouse"]),
+    ("trousers", ["trousers", "trouser"]),
+    ("skirt", ["skirt", "pinafore", "kilt"]),
+    ("dress", ["dress", "gingham"]),
+    ("tie", ["tie", "clip-on"]),
+    ("bag", ["bag", "rucksack", "backpack"]),
+    ("accessories", ["hat", "cap", "scarf", "gloves", "socks", "tights", "badge"]),
+]
+
+CATEGORY_PATTERNS = [
+    (category, re.compile(r"\b(" + "|".join(re.escape(word) for word in words) + r")s?\b", re.IGNORECASE))
+    for category, words in CATEGORIES
+]
+
+STORE_COLUMNS = [
+    "supplier", "urn", "school_name", "store_page", "product_url", "product_name",
+    "category", "size", "price_text", "price", "image", "label",
+]
+
+
+def categorise(name):
+    """
+    Returns the category of a product from its name, "other" if no keyword matches.
+
+    Args:
+    - name: The name of the product.
+    """
+    if not isinstance(name, str):
+        return "other"
+
+    for category, pattern in CATEGORY_PATTERNS:
+        if pattern.search(name):
+            return category
+    return "other"
+
+
+def parse_prices(prices):
+    """
+    Returns the first amount of each price text (e.g. "£12.50" or "From £9.99") as a float,
+    NaN where there is none.
+
+    Args:
+    - prices: Series of price texts.
+    """
+    amounts = prices.astype("string").str.replace(",", "", regex=False).str.extract(r"(\d+(?:\.\d+)?)")[0]
+    return pd.to_numeric(amounts, errors="coerce")
+
+
+def _store_rows(chunk):
+    # Products scraped without variants keep their own price
+    price_text = chunk["variant_price"].where(chunk["variant_price"].notna(), chunk["product_price"])
+
+    urn = chunk["urn"].astype("string").str.replace(r"\.0$", "", regex=True)
+
+    rows = pd.DataFrame({
+        "supplier": chunk["supplier"],
+        "urn": urn,
+        "school_name": chunk["school_name"],
+        "store_page": chunk["store_page"],
+        "product_url": chunk["product_url"],
+        "product_name": chunk["product_name"],
+        "category": chunk["product_name"].map(categorise),
+        "size": chunk["size"],
+        "price_text": price_text,
+        "price": parse_prices(price_text),
+        "image": chunk["image"],
+        "label": chunk["label"],
+    })
+    return rows.astype(object).where(rows.notna(), None)
+
+
+def _create_schema(connection):
+    connection.execute(f"CREATE TABLE IF NOT EXISTS items ({', '.join(STORE_COLUMNS)})")
+    connection.execute("CREATE INDEX IF NOT EXISTS items_urn ON items (urn)")
+    connection.execute("CREATE INDEX IF NOT EXISTS items_supplier ON items (supplier)")
+    connection.execute("CREATE INDEX IF NOT EXISTS items_category ON items (category, supplier, price)")
+    connection.execute("CREATE INDEX IF NOT EXISTS items_product ON items (product_url)")
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS crawls (
+            supplier TEXT PRIMARY KEY,
+            published_at TEXT NOT NULL,
+            rows INTEGER NOT NULL
+        )
+    """)
+
+
+class QueryStore:
+    """
+    Indexed SQLite copy of the latest crawl of every supplier, for the price comparison
+    website to query instead of reading the flat CSVs at request time.
+
+    Every row is a variant (or a product, for suppliers scraped down to products) with
+    its school, its category and its numeric price. Rows are indexed by school (its URN, or
+    its store page for suppliers that don't show URNs), supplier, category and product URL.
+
+    A crawl is published into a copy of the store, which then replaces the store with a
+    single rename. Readers never see a half published crawl, and queries made after the
+    rename read the new data. Publishing isn't meant to run from several processes at once.
+
+    The store also holds the price comparison aggregates (min, median and max price per
+    school, category and supplier, and the difference with the generic suppliers). They
+    are refreshed by `publish` for the schools of the published supplier only.
+
+    Attributes:
+    - path: Path of the SQLite database.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+        self._version = None
+
+    def _connect(self):
+        # Reconnect when the store was replaced, the open connection still reads the old file
+        stat = os.stat(self.path)
+        version = (stat.st_ino, stat.st_mtime_ns)
+
+        if self._connection is None or version != self._version:
+            if self._connection is not None:
+                self._connection.close()
+            self._connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._version = version
+
+        return self._connection
+
+    def publish(self, supplier, input_dir=".", chunksize=50000):
+        """
+        Replaces the rows of a supplier with those of its `<supplier>_<depth>.csv` files,
+        returns the number of rows published.
+
+        Args:
+        - supplier: The supplier whose crawl is published.
+        - input_dir: The directory containing the scraped CSV files.
+        - chunksize: The number of rows read at once.
+        """
+        temporary_path = f"{self.path}.tmp"
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+        connection = sqlite3.connect(temporary_path)
+        rows = 0
+
+        try:
+            if os.path.exists(self.path):
+                source = sqlite3.connect(self.path)
+                source.backup(connection)
+                source.close()
+
+            with connection:
+                _create_schema(connection)
+                new_aggregates = create_aggregates(connection)
+
+                # The schools the supplier dropped need their aggregates refreshed too
+                schools = affected_schools(connection, supplier)
+                connection.execute("DELETE FROM items WHERE supplier = ?", (supplier,))
+
+                for chunk in iter_flat_chunks(supplier, input_dir=input_dir, chunksize=chunksize):
+                    connection.executemany(
+                        f"INSERT INTO items VALUES ({', '.join('?' * len(STORE_COLUMNS))})",
+                        _store_rows(chunk).itertuples(index=False, name=None),
+                    )
+                    rows += len(chunk)
+
+                if new_aggregates:
+                    refresh_all_schools(connection)
+                    refresh_generic(connection)
+                else:
+                    refresh_schools(connection, schools | affected_schools(connection, supplier))
+                    if supplier in GENERIC_SUPPLIERS:
+                        refresh_generic(connection)
+
+                connection.execute(
+                    "INSERT OR REPLACE INTO crawls VALUES (?, ?, ?)",
+                    (supplier, datetime.now(timezone.utc).isoformat(timespec="seconds"), rows),
+                )
+
+            connection.execute("ANALYZE")
+        finally:
+            connection.close()
+
+        os.replace(temporary_path, self.path)
+        return rows
+
+    def _query(self, sql, params=()):
+        return pd.read_sql_query(sql, self._connect(), params=params)
+
+    def products_for_school(self, school):
+        """
+        Returns every product (and variant) sold for a school, by every supplier.
+
+        Args:
+        - school: The URN of the school, or its store page for suppliers that don't show URNs.
+        """
+        return self._query(
+            f"SELECT * FROM items WHERE {SCHOOL_KEY} = ? ORDER BY category, supplier, product_name, price",
+            (str(school),),
+        )
+
+    def price_distribution(self, category):
+        """
+        Returns the distribution of the prices of a category at every supplier: the number
+        of priced rows, their minimum, quartiles, maximum and mean.
+
+        Args:
+        - category: The category, as returned by `categorise`.
+        """
+        prices = self._query(
+            "SELECT supplier, price FROM items WHERE category = ? AND price IS NOT NULL",
+            (category,),
+        )
+
+        grouped = prices.groupby("supplier")["price"]
+        distribution = pd.DataFrame({
+            "count": grouped.size(),
+            "min": grouped.min(),
+            "q1": grouped.quantile(0.25),
+            "median": grouped.median(),
+            "q3": grouped.quantile(0.75),
+            "max": grouped.max(),
+            "mean": grouped.mean(),
+        })
+        return distribution.sort_values("median")
+
+    def school_comparison(self, school):
+        """
+        Returns the min, median and max price of every category at every supplier of a
+        school, with the difference (`delta`) and ratio of the median price to the median
+        price of the generic suppliers.
+
+        Args:
+        - school: The URN of the school, or its store page for suppliers that don't show URNs.
+        """
+        return self._query(
+            "SELECT * FROM price_comparison WHERE school = ? ORDER BY category, supplier",
+            (str(school),),
+        )
+
+    def category_comparison(self, category):
+        """
+        Returns the comparison with the generic suppliers of a category at every school.
+
+        Args:
+        - category: The category, as returned by `categorise`.
+        """
+        return self._query(
+            "SELECT * FROM price_comparison WHERE category = ? ORDER BY delta DESC",
+            (category,),
+        )
+
+    def crawls(self):
+        """
+        Returns when the crawl of every supplier in the store was published, and its rows.
+        """
+        return self._query("SELECT * FROM crawls ORDER BY supplier")
@@ -0,0 +1,143 @@
+import time
+
+# Set on the page before navigating away, it is gone once the next document has loaded
+LOADED_SCRIPT = "return document.readyState === 'complete' && !window.__scrapplierLeaving;"
+NAVIGATE_SCRIPT = "window.__scrapplierLeaving = true; window.location.href = arguments[0];"
+
+
+class LoadedTab:
+    """
+    Wraps the driver while a tab whose page was preloaded by `TabPool` is being scraped.
+    The first `get` of the preloaded URL is skipped, everything else goes to the driver.
+
+    Attributes:
+    - driver: The Selenium WebDriver instance, switched to the tab.
+    - url: The URL loaded in the tab.
+    """
+
+    def __init__(self, driver, url):
+        self.driver = driver
+        self.url = url
+        self._first = True
+
+    def get(self, url):
+        first, self._first = self._first, False
+        if first and url == self.url:
+            return
+        self.driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+class TabPool:
+    """
+    Scrapes several pages at once with a single Chrome, one tab per page.
+
+    Navigations are started without waiting for them, and the pages are extracted in
+    whichever order they finish loading, while the next pages keep loading in the other
+    tabs. Tabs share the cookies (and so the login) of the browser.
+
+    With a `ManagedDriver`, every page loaded in a tab counts towards its page count and
+    latency and is reported to its egress pool, and the browser is recycled between two
+    extractions when it needs to be. If the browser is restarted, while a page is
+    extracted or when it is recycled, the tabs are opened again in the new browser and
+    the pages that were loading in them are loaded again.
+
+    Attributes:
+    - driver: The Selenium WebDriver instance.
+    - size: The number of tabs, i.e. of pages loading at once.
+    - timeout: Seconds after which a page is extracted even if it hasn't finished loading.
+    - poll_seconds: How long to wait between two checks of the tabs.
+    """
+
+    def __init__(self, driver, size=4, timeout=30, poll_seconds=0.05):
+        self.driver = driver
+        self.size = size
+        self.timeout = timeout
+        self.poll_seconds = poll_seconds
+
+    def _open_tabs(self):
+        handles = list(self.driver.window_handles[:1])
+        for _ in range(self.size - 1):
+            self.driver.switch_to.new_window("tab")
+            handles.append(self.driver.current_window_handle)
+        return handles
+
+    def _close_tabs(self, handles):
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+
+    def map(self, items, url, extract):
+        """
+        Scrapes every item in its own tab, yields `(item, result)` in the order of `items`.
+
+        Args:
+        - items: The items (e.g. schools or products) to scrape.
+        - url: Function returning the URL to load for an item.
+        - extract: Function taking the driver (switched to the loaded tab) and the item.
+        """
+        items = iter(items)
+        handles = self._open_tabs()
+        loading = {}  # handle -> (index, item, url, started)
+        reloads = []  # (index, item) of the pages lost by a restart
+        done = {}
+        next_index = 0
+        next_yield = 0
+
+        try:
+            while True:
+                # Start loading the next items in the idle tabs
+                for handle in handles:
+                    if handle in loading:
+                        continue
+                    if reloads:
+                        index, item = reloads.pop(0)
+                    else:
+                        item = next(items, None)
+                        if item is None:
+                            break
+                        index = next_index
+                        next_index += 1
+                    self.driver.switch_to.window(handle)
+                    self.driver.execute_script(NAVIGATE_SCRIPT, url(item))
+                    loading[handle] = (index, item, url(item), time.time())
+
+                if not loading:
+                    break
+
+                finished = False
+                for handle, (index, item, item_url, started) in list(loading.items()):
+                    self.driver.switch_to.window(handle)
+                    if not self.driver.execute_script(LOADED_SCRIPT) and time.time() - started < self.timeout:
+                        continue
+
+                    # The navigation didn't go through `ManagedDriver.get`, count it here
+                    if hasattr(self.driver, "record_navigation"):
+                        self.driver.record_navigation(time.time() - started)
+
+                    restarts = getattr(self.driver, "restarts", 0)
+                    done[index] = (item, extract(LoadedTab(self.driver, item_url), item))
+                    del loading[handle]
+                    finished = True
+
+                    if hasattr(self.driver, "recycle_if_needed"):
+                        self.driver.recycle_if_needed()
+
+                    if getattr(self.driver, "restarts", 0) != restarts:
+                        # The new browser has a single window, the other tabs and their pages are gone
+                        handles = self._open_tabs()
+                        reloads.extend((index, item) for index, item, _, _ in sorted(loading.values(), key=lambda page: page[0]))
+                        loading = {}
+                        break
+
+                while next_yield in done:
+                    yield done.pop(next_yield)
+                    next_yield += 1
+
+                if not finished:
+                    time.sleep(self.poll_seconds)
+        finally:
+            self._close_tabs(handles)
@@ -0,0 +1,190 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from .records import RECORD_TYPES, REQUIRED_FIELDS, to_frame
+from .store import parse_prices
+
+# The domain every scraped page URL of a supplier must belong to (subdomains included)
+SUPPLIER_DOMAINS = {
+    "monkhouse": "monkhouse.com",
+    "blossomsschoolwear": "blossomsschoolwear.com",
+    "pinderschoolwear": "pindersschoolwear.com",
+    "schoolwearmadeeasy": "schoolwearmadeeasy.com",
+    "scotcrestschool": "scotcrestschools.co.uk",
+    "stevensons": "stevensons.co.uk",
+    "alansantryschoolwear": "alansantryschoolwear.co.uk",
+    "aspireacademyglasgow": "aspireacademyglasgow.com",
+    "borderembroideries": "border-embroideries.co.uk",
+    "directschoolwear": "directschoolwear.co.uk",
+    "macgregorschoolwear": "macgregorschoolwear.co.uk",
+    "schooluniformscotland": "schooluniformscotland.com",
+    "smartschoolwear": "smartschoolwear.co.uk",
+    "topformschoolwear": "top-form.co.uk",
+    "uniformdirect": "uniform-direct.com",
+    "asda": "asda.com",
+}
+
+# The columns checked against the supplier's domain, and those identifying a row
+URL_FIELDS = {"schools": ["store_page"], "products": ["url"], "variants": []}
+KEY_FIELDS = {"schools": ["schoolsupplier_id"], "products": ["id", "schoolsupplier_id"], "variants": ["id"]}
+
+
+def _blank(column):
+    return column.isna() | column.astype("string").str.strip().eq("")
+
+
+class Validator:
+    """
+    Checks the rows of a crawl as they are scraped, one DataFrame per batch (the schools,
+    the products of a school, the variants of a product), and moves the rows that fail
+    to a quarantine file instead of the output.
+
+    The checks are vectorised over the whole batch:
+    - required fields are filled in,
+    - prices contain an amount,
+    - page URLs belong to the supplier's domain,
+    - keys aren't repeated, within the batch or with an earlier batch of the run.
+
+    Quarantined rows are appended to `<supplier>_quarantine.csv` with their depth, the
+    reasons they failed and the row as JSON. `write_stats` appends the counts of the run
+    to `<supplier>_quality.csv`. Without an output directory, nothing is written and the
+    quarantined rows are only kept in memory, see `quarantine`.
+
+    Attributes:
+    - supplier: The supplier whose rows are checked.
+    - output_dir: The directory of the quarantine and quality files, None to not write them.
+    - stats: Dict of `(depth, check)` to the number of rows failing it, with the rows
+      and the valid rows of every depth under `(depth, "rows")` and `(depth, "valid")`.
+    """
+
+    def __init__(self, supplier, output_dir="."):
+        self.supplier = supplier
+        self.output_dir = output_dir
+        self.stats = {}
+        self.quarantined = []
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        self._seen = {depth: set() for depth in KEY_FIELDS}
+        self._domain = SUPPLIER_DOMAINS.get(supplier)
+
+    def _checks(self, frame, depth):
+        checks = {}
+
+        for field in REQUIRED_FIELDS[depth]:
+            checks[f"missing {field}"] = _blank(frame[field])
+
+        if "price" in frame:
+            checks["unparseable price"] = frame["price"].notna() & parse_prices(frame["price"]).isna()
+
+        if self._domain is not None:
+            for field in URL_FIELDS[depth]:
+                hosts = frame[field].astype("string").str.extract(r"^https?://([^/:?#]+)", expand=False).str.lower()
+                foreign = ~(hosts.eq(self._domain) | hosts.str.endswith(f".{self._domain}")).fillna(False)
+                checks[f"{field} outside {self._domain}"] = frame[field].notna() & foreign
+
+        # Rows missing a key can't repeat one, they are left to the required fields checks
+        keys = KEY_FIELDS[depth]
+        complete = frame[keys].notna().all(axis=1)
+        key_values = pd.Series(list(zip(*(frame.loc[complete, key] for key in keys))), index=frame.index[complete], dtype=object)
+        duplicate = key_values.duplicated() | key_values.isin(self._seen[depth])
+        checks["duplicate key"] = duplicate.reindex(frame.index, fill_value=False)
+
+        return pd.DataFrame(checks, index=frame.index).astype(bool)
+
+    def check(self, frame, depth):
+        """
+        Returns the valid rows of a batch, and quarantines the others.
+
+        Args:
+        - frame: The batch, one column per field of the depth's records.
+        - depth: "schools", "products" or "variants".
+        """
+        checks = self._checks(frame, depth)
+        failed = checks.any(axis=1)
+
+        self.stats[(depth, "rows")] = self.stats.get((depth, "rows"), 0) + len(frame)
+        self.stats[(depth, "valid")] = self.stats.get((depth, "valid"), 0) + int((~failed).sum())
+        for check, count in checks.sum().items():
+            self.stats[(depth, check)] = self.stats.get((depth, check), 0) + int(count)
+
+        # Batches without invalid rows are returned as they are, without a copy
+        valid = frame[~failed] if failed.any() else frame
+        keys = KEY_FIELDS[depth]
+        complete = valid[keys].notna().all(axis=1)
+        self._seen[depth].update(zip(*(valid.loc[complete, key] for key in keys)))
+
+        if failed.any():
+            self._quarantine(frame[failed], checks[failed], depth)
+
+        return valid
+
+    def check_records(self, records, depth):
+        """
+        Returns the valid records of a batch, and quarantines the others. Batches are
+        checked as they are scraped, so that the products of invalid schools and the
+        variants of invalid products aren't scraped.
+
+        Args:
+        - records: The records of the batch, e.g. the products of one school.
+        - depth: "schools", "products" or "variants".
+        """
+        if not records:
+            return records
+
+        valid = self.check(to_frame(records, RECORD_TYPES[depth]), depth)
+        return [records[position] for position in valid.index]
+
+    def _quarantine(self, rows, checks, depth):
+        # The names of the failed checks of every row, e.g. "missing price; duplicate key"
+        reasons = checks.apply(lambda row: "; ".join(row.index[row]), axis=1)
+
+        quarantine = pd.DataFrame({
+            "run": self.started_at,
+            "depth": depth,
+            "reasons": reasons,
+            "record": [json.dumps(row, default=str, ensure_ascii=False) for row in rows.astype(object).where(rows.notna(), None).to_dict("records")],
+        })
+
+        self.quarantined.append(quarantine)
+
+        if self.output_dir is not None:
+            path = os.path.join(self.output_dir, f"{self.supplier}_quarantine.csv")
+            quarantine.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+    def quarantine(self):
+        """
+        Returns the rows quarantined during the run, one row per failed row.
+        """
+        if not self.quarantined:
+            return pd.DataFrame(columns=["run", "depth", "reasons", "record"])
+        return pd.concat(self.quarantined, ignore_index=True)
+
+    def summary(self):
+        """
+        Returns the quality stats of the run, one row per depth and check.
+        """
+        return pd.DataFrame(
+            [(depth, check, count) for (depth, check), count in self.stats.items()],
+            columns=["depth", "check", "count"],
+        )
+
+    def write_stats(self):
+        """
+        Appends the quality stats of the run to `<supplier>_quality.csv` (if there is an
+        output directory), and prints the number of quarantined rows.
+        """
+        if self.output_dir is not None:
+            summary = self.summary()
+            summary.insert(0, "run", self.started_at)
+
+            path = os.path.join(self.output_dir, f"{self.supplier}_quality.csv")
+            summary.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+        for depth in KEY_FIELDS:
+            rows = self.stats.get((depth, "rows"), 0)
+            quarantined = rows - self.stats.get((depth, "valid"), 0)
+            if quarantined:
+                print(f"Quarantined {quarantined} of {rows} {depth} of {self.supplier}.")
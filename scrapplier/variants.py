@@ -0,0 +1,142 @@
+from .records import Variant
+
+# Selects every option of a <select> in turn, waits for the page to react and reads the
+# variant's fields, all inside the page. The wait ends as soon as the price changes, or
+# once the page stopped changing for `settleMs` (some sizes cost the same as the last).
+ENUMERATE_SCRIPT = """
+const config = arguments[0];
+const done = arguments[arguments.length - 1];
+
+const select = document.querySelector(config.select);
+if (!select) {
+    done([]);
+    return;
+}
+
+const read = (field) => {
+    if (field.multiple) {
+        return Array.from(document.querySelectorAll(field.selector))
+            .map((element) => field.attribute ? element.getAttribute(field.attribute) : element.innerText.trim())
+            .filter((value) => value);
+    }
+    const element = document.querySelector(field.selector);
+    if (!element) {
+        return null;
+    }
+    return field.attribute ? element.getAttribute(field.attribute) : element.innerText.trim();
+};
+
+const priceText = () => {
+    const element = document.querySelector(config.fields.price.selector);
+    return element ? element.innerText : null;
+};
+
+const settle = (before) => new Promise((resolve) => {
+    let quiet;
+    const finish = () => {
+        observer.disconnect();
+        clearTimeout(quiet);
+        clearTimeout(deadline);
+        resolve();
+    };
+    const observer = new MutationObserver(() => {
+        if (priceText() !== before) {
+            finish();
+            return;
+        }
+        clearTimeout(quiet);
+        quiet = setTimeout(finish, config.settleMs);
+    });
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true, attributes: true});
+    quiet = setTimeout(finish, config.settleMs);
+    const deadline = setTimeout(finish, config.timeoutMs);
+});
+
+(async () => {
+    const variants = [];
+
+    for (const option of Array.from(select.options)) {
+        // Placeholders such as "Choose an option" aren't variants
+        if (!option.value || option.disabled) {
+            continue;
+        }
+
+        const before = priceText();
+        select.value = option.value;
+        select.dispatchEvent(new Event("input", {bubbles: true}));
+        select.dispatchEvent(new Event("change", {bubbles: true}));
+        await settle(before);
+
+        const variant = {
+            size: config.sizeAttribute ? option.getAttribute(config.sizeAttribute) : option.text.trim(),
+            option: option.value,
+        };
+        for (const [name, field] of Object.entries(config.fields)) {
+            variant[name] = read(field);
+        }
+        variants.push(variant);
+    }
+
+    done(variants);
+})().catch((error) => done({error: String(error)}));
+"""
+
+
+def field(selector, attribute=None, multiple=False):
+    """
+    Returns the description of a variant field for `enumerate_variants`.
+
+    Args:
+    - selector: CSS selector of the element holding the field.
+    - attribute: The attribute to read, the element's text if None.
+    - multiple: Whether to read every matching element into a tuple (empty values are dropped).
+    """
+    return {"selector": selector, "attribute": attribute, "multiple": multiple}
+
+
+def enumerate_variants(driver, select, fields, size_attribute=None, settle_ms=150, timeout_ms=3000,
+                       script_timeout=300):
+    """
+    Returns the variants of the product page loaded in the driver, one per option of a
+    size <select>, in a single call to the browser.
+
+    Every option is selected by an injected script, which fires the change event, waits
+    for the page to update the price (with a MutationObserver) and reads the fields of the
+    variant. This replaces a select, a sleep and several element lookups per option.
+
+    Args:
+    - driver: The Selenium WebDriver instance, on the product page.
+    - select: CSS selector of the size <select>.
+    - fields: Dict of `Variant` field names to `field(...)` descriptions, must include "price".
+    - size_attribute: The attribute of the options holding the size, the option's text if None.
+    - settle_ms: How long the page has to stay unchanged for an option to be read when
+      its price doesn't change.
+    - timeout_ms: The longest wait for the page to react to an option.
+    - script_timeout: Seconds after which the browser gives up on the whole product. The
+      driver's script timeout is set back once the variants are read.
+    """
+    if "price" not in fields:
+        raise ValueError("The price field is required, the script waits for it to change.")
+
+    config = {
+        "select": select,
+        "fields": fields,
+        "sizeAttribute": size_attribute,
+        "settleMs": settle_ms,
+        "timeoutMs": timeout_ms,
+    }
+
+    previous_timeout = driver.timeouts.script
+    driver.set_script_timeout(script_timeout)
+    try:
+        result = driver.execute_async_script(ENUMERATE_SCRIPT, config)
+    finally:
+        driver.set_script_timeout(previous_timeout)
+
+    if isinstance(result, dict):
+        raise RuntimeError(f"Variant enumeration failed: {result['error']}")
+
+    return [
+        Variant(**{name: tuple(value) if isinstance(value, list) else value for name, value in variant.items()})
+        for variant in result
+    ]
@@ -6,7 +6,12 @@ setup(
     packages=find_packages(),
     install_requires=[
         # List your package dependencies here
+        "cssselect",
+        "lxml",
+        "numpy",
         "pandas",
+        "selenium",
+        "tqdm",
         "undetected-chromedriver",
     ],
     author='Haries Ramdhani',
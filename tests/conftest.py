@@ -0,0 +1,29 @@
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from scrapplier import scraper
+from scrapplier.fakedriver import FakeDriver
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture_driver(supplier):
+    """
+    Returns a driver serving the saved pages of a supplier, raising on any other URL.
+    """
+    return FakeDriver.from_directory(os.path.join(FIXTURES, supplier), strict=True)
+
+
+@pytest.fixture(autouse=True)
+def quick_scraper(monkeypatch):
+    # tqdm.notebook needs a notebook, and the saved pages need no waiting for
+    monkeypatch.setattr(scraper, "tqdm", lambda iterable, **kwargs: iterable)
+    monkeypatch.setattr(scraper, "time", SimpleNamespace(time=time.time, sleep=lambda seconds: None))
+
+
+@pytest.fixture
+def monkhouse():
+    return fixture_driver("monkhouse")
@@ -0,0 +1,108 @@
+import pytest
+
+from scrapplier.lifecycle import ManagedDriver
+from scrapplier.scraper import Scraper
+
+from conftest import fixture_driver
+
+SCHOOL_LIST = "https://www.monkhouse.com/school"
+LOGIN = "https://www.monkhouse.com/customer/account/login"
+
+
+def record_loads(driver):
+    """
+    Returns the list the URLs loaded by a fake driver are appended to.
+    """
+    loads = []
+    get = driver.get
+
+    def recording_get(url):
+        loads.append(url)
+        return get(url)
+
+    driver.get = recording_get
+    return loads
+
+
+def test_scrape_down_to_variants(monkhouse, tmp_path):
+    result = Scraper("u", "p", driver=monkhouse).scrape("monkhouse", depth="variants", output_dir=tmp_path)
+
+    assert result.complete
+    assert len(result.schools) == 3
+    # The sweatshirt is listed by two schools
+    assert sorted(result.products["name"].value_counts().items()) == [
+        ("Abbey Park Book Bag", 1), ("Abbey Park Polo Shirt", 1), ("Abbey Park Sweatshirt", 2),
+    ]
+    assert len(result.variants) == 9
+    assert len(result.quarantine) == 0
+    assert (tmp_path / "monkhouse_variants.csv").exists()
+
+
+def test_preflight_sets_the_browser_up_once(monkhouse, monkeypatch):
+    scraper = Scraper("u", "p", driver=monkhouse)
+    logins = []
+    login = scraper._login_monkhouse
+    monkeypatch.setattr(scraper, "_login_monkhouse", lambda driver: logins.append(driver) or login(driver))
+
+    scraper.scrape("monkhouse", depth="products", preflight=True, output_dir=None)
+
+    assert len(logins) == 1
+
+
+def test_tabs_load_the_first_listing_page_once(monkhouse):
+    loads = record_loads(monkhouse)
+
+    tabbed = Scraper("u", "p", driver=monkhouse).scrape("monkhouse", depth="products", tabs=2, output_dir=None)
+
+    listing_loads = [url for url in loads if "product_list_limit" in url]
+    assert len(listing_loads) == len(set(listing_loads))
+    assert tabbed.products["url"].tolist() == Scraper("u", "p", driver=fixture_driver("monkhouse")).scrape(
+        "monkhouse", depth="products", output_dir=None,
+    ).products["url"].tolist()
+
+
+def test_pages_loaded_in_tabs_count_towards_recycling():
+    drivers = []
+
+    def factory():
+        drivers.append(fixture_driver("monkhouse"))
+        return drivers[-1]
+
+    scraper = Scraper("u", "p", driver_factory=factory, recycle_after=4)
+    loads = record_loads(drivers[0])
+
+    result = scraper.scrape("monkhouse", depth="products", tabs=2, output_dir=None)
+
+    assert isinstance(scraper.driver, ManagedDriver)
+    assert scraper.driver.restarts >= 1
+    assert len(drivers) == scraper.driver.restarts + 1
+    assert len(loads) >= 4
+    assert len(result.products) == 4
+
+
+def test_pipeline_workers_use_the_driver_factory():
+    drivers = []
+
+    def factory():
+        drivers.append(fixture_driver("monkhouse"))
+        return drivers[-1]
+
+    scraper = Scraper("u", "p", driver_factory=factory, profile=True)
+
+    result = scraper.scrape("monkhouse", depth="variants", workers={"products": 1, "variants": 2}, output_dir=None)
+
+    # The scraper's browser and one per worker
+    assert len(drivers) == 4
+    assert all(not driver.missing for driver in drivers)
+    assert len(result.variants) == 9
+    # The variants are only scraped by the workers, their commands are profiled too
+    assert "_scrape_monkhouse_variants" in set(scraper.driver.commands()["method"])
+
+
+def test_unknown_sitemap_is_rejected_before_loading_a_page(monkhouse):
+    loads = record_loads(monkhouse)
+
+    with pytest.raises(ValueError, match="No sitemap known for monkhouse"):
+        Scraper("u", "p", driver=monkhouse).scrape("monkhouse", discovery="sitemap", preflight=True, output_dir=None)
+
+    assert loads == []
@@ -0,0 +1,58 @@
+from scrapplier.ids import assign_ids
+from scrapplier.records import School
+from scrapplier.scraper import Scraper
+
+ABBEY_PARK = "https://www.monkhouse.com/school/abbey-park-primary"
+SWEATSHIRT = "https://www.monkhouse.com/abbey-park-sweatshirt"
+
+
+def test_setup_closes_the_banners_and_logs_in(monkhouse):
+    scraper = Scraper("parent@example.com", "secret", driver=monkhouse)
+
+    scraper._setup(monkhouse, "monkhouse")
+
+    assert monkhouse.find_element("name", "login[username]").get_attribute("value") == "parent@example.com"
+    assert monkhouse.find_elements("id", "lpclose") == []
+
+
+def test_schools_are_read_from_the_school_list(monkhouse):
+    schools = Scraper("u", "p", driver=monkhouse)._scrape_monkhouse_schools(monkhouse)
+
+    assert [school.name for school in schools] == [
+        "Abbey Park Primary (URN-100234)", "Beacon Hill Academy (URN-136789)", "St Mary's Nursery",
+    ]
+    assert [school.urn for school in schools] == ["100234", "136789", None]
+    assert schools[2].store_page == "https://www.monkhouse.com/school/st-marys-nursery"
+
+
+def test_products_are_collected_from_every_listing_page(monkhouse):
+    school = School(name="Abbey Park Primary", store_page=ABBEY_PARK)
+
+    products = Scraper("u", "p", driver=monkhouse)._scrape_monkhouse_products(monkhouse, school)
+
+    # The third page repeats the second, the walk stops there
+    assert [product.name for product in products] == ["Abbey Park Sweatshirt", "Abbey Park Polo Shirt", "Abbey Park Book Bag"]
+    assert [product.price for product in products] == ["£12.50", "£8.00", "£6.75"]
+    assert products[0].url == SWEATSHIRT
+    assert products[0].label == "Logo"
+    assert products[1].label is None
+    assert monkhouse.current_url.endswith("p=3")
+
+
+def test_variants_are_read_for_every_size_option(monkhouse):
+    school = assign_ids("monkhouse", [School(name="Abbey Park Primary", store_page=ABBEY_PARK)])[0]
+    product = assign_ids("monkhouse", Scraper("u", "p", driver=monkhouse)._scrape_monkhouse_products(monkhouse, school), school)[0]
+
+    variants = Scraper("u", "p", driver=monkhouse)._scrape_monkhouse_variants(monkhouse, product)
+    assign_ids("monkhouse", variants, product)
+
+    # The placeholder and the disabled option aren't variants
+    assert [(variant.size, variant.option, variant.price) for variant in variants] == [
+        ("Age 3-4", "5101", "£12.50"), ("Age 5-6", "5102", "£13.50"), ("Age 5-6", "5203", "£13.50"),
+    ]
+    assert variants[0].colors == ("Navy", "Royal Blue")
+    assert variants[0].description_icon_alts == ("Machine wash 40", "Made in the UK")
+    assert variants[0].description == "Embroidered sweatshirt in a cotton rich fleece."
+    # The two colours of a size have their own ids
+    assert len({variant.id for variant in variants}) == 3
+    assert monkhouse.timeouts.script == 30
@@ -0,0 +1,38 @@
+from scrapplier.history import PriceHistory
+from scrapplier.planner import CrawlPlanner
+from scrapplier.scheduler import RevisitScheduler
+from scrapplier.scraper import Scraper
+from scrapplier.selection import Selection
+
+
+def test_plan_samples_are_none_or_int(tmp_path):
+    planner = CrawlPlanner(tmp_path)
+
+    for budget in (600, 1800, 4 * 3600, 24 * 3600):
+        plan = planner.plan(["monkhouse", "asda"], budget)
+        for sample in plan["sample"]:
+            assert sample is None or type(sample) is int
+            # Crawls of all the schools are complete
+            assert bool(Selection(sample=sample)) == (sample is not None)
+
+
+def test_plan_samples_schools_when_the_budget_is_short(tmp_path):
+    # Too short to list the products of every school with the default metrics
+    plan = CrawlPlanner(tmp_path).plan(["monkhouse"], 300)
+
+    assert plan["depth"].tolist() == ["products"]
+    assert plan["sample"].tolist() == [100]
+    assert plan["coverage"].iloc[0] > 1 / 3
+
+
+def test_revisit_plan_loads_the_pages_at_their_crawled_url(monkhouse, tmp_path):
+    history = PriceHistory(str(tmp_path / "history.db"))
+    scraper = Scraper("u", "p", driver=monkhouse)
+    scraper.scrape("monkhouse", depth="variants", history=history, output_dir=None)
+
+    plan = RevisitScheduler(history, input_dir=tmp_path).plan(2, now="2100-01-01")
+
+    # The product keys drop the "www." the supplier redirects to
+    assert plan["url"].str.startswith("https://www.monkhouse.com/").all()
+    scraper.revisit(plan, history)
+    assert not monkhouse.missing